@@ -14,11 +14,14 @@ parser.add_argument('-b', '--benchmark_folder', type=str, default='blocks', help
 parser.add_argument('-l', '--loglevel', type=str, default='info', help='Log level')
 parser.add_argument('-o', '--output_file', type=str, default="", help='Output file')
 parser.add_argument('-t', '--timeout', type=int, default=60, help='Timeout in seconds')
+parser.add_argument('-c', '--cache_dir', type=str, default="", help='Directory for caching grounded tasks')
 # Parse arguments
 args = parser.parse_args()
 
 # Use parsed arguments in the pyperplan command
 pyperplan_command = f"pyperplan -H {args.heuristic} -s {args.search} -l {args.loglevel} -o {args.output_file} "
+if args.cache_dir:
+    pyperplan_command += f"--cache-dir {args.cache_dir} "
 domain_file = f"./benchmarks/{args.benchmark_folder}/domain.pddl"  # Your domain file
 gripper_folder = f"./benchmarks/{args.benchmark_folder}/"  # Folder with task files
 timeout_seconds = args.timeout  # 1 minutes in seconds
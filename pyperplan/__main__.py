@@ -21,19 +21,29 @@
 import argparse
 import logging
 import os
+import re
 import sys
 import csv
 
+from pyperplan import task_cache
+from pyperplan.grounding import STRATEGIES
+from pyperplan.heuristics.heuristic_cache import POLICIES
 from pyperplan.planner import (
     find_domain,
     HEURISTICS,
+    REPRESENTATIONS,
     search_plan,
+    search_plans,
     SEARCHES,
     validate_solution,
     write_solution,
 )
 
 
+# Problem files name their domain with "(:domain ...)", not "(domain ...)".
+DOMAIN_DEFINITION = re.compile(r"\(\s*define\s*\(\s*domain\b")
+
+
 def main():
     # Commandline parsing
     log_levels = ["debug", "info", "warning", "error", "benchmarks"]
@@ -50,8 +60,15 @@ def main():
     argparser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    argparser.add_argument(dest="domain", nargs="?")
-    argparser.add_argument(dest="problem")
+    argparser.add_argument(
+        dest="problem",
+        nargs="+",
+        metavar="[domain] problem",
+        help="An optional domain file followed by problem files or "
+        "directories with problem files. Without a domain file, the domain of "
+        "each problem is guessed from its name. Several problems of one "
+        "domain are solved back to back in one process",
+    )
     argparser.add_argument("-l", "--loglevel", choices=log_levels, default="info")
     argparser.add_argument(
         "-H",
@@ -67,6 +84,76 @@ def main():
         help=f"Select a search algorithm from {search_names}",
         default="bfs",
     )
+    argparser.add_argument(
+        "-r",
+        "--representation",
+        choices=REPRESENTATIONS.keys(),
+        help="Select the state representation used during search",
+        default="strips",
+    )
+    argparser.add_argument(
+        "--successors",
+        choices=["tree", "scan", "incremental", "codegen"],
+        help="Find applicable operators with a decision tree, by testing "
+        "all operators, by updating those of the parent state or with code "
+        "generated from the decision tree",
+        default="tree",
+    )
+    argparser.add_argument(
+        "--heuristic-processes",
+        type=int,
+        help="Evaluate batches of search nodes with the heuristic in this many "
+        "processes",
+        default=1,
+    )
+    argparser.add_argument(
+        "--heuristic-cache",
+        type=int,
+        help="Cache the heuristic values of at most this many states, 0 "
+        "disables the cache",
+        default=0,
+    )
+    argparser.add_argument(
+        "--heuristic-cache-policy",
+        choices=POLICIES.keys(),
+        help="Drop the least recently used state (lru) or approximate this "
+        "with reference bits (clock) when the heuristic cache is full",
+        default="lru",
+    )
+    argparser.add_argument(
+        "--grounding",
+        choices=STRATEGIES.keys(),
+        help="Instantiate all type-correct operators that satisfy the static "
+        "preconditions, filtering the product of the parameters' objects "
+        "(product) or joining the static preconditions (join), or only the "
+        "operators that are reachable when delete effects are ignored "
+        "(reachability)",
+        default="product",
+    )
+    argparser.add_argument(
+        "--grounding-processes",
+        type=int,
+        help="Ground the actions in this many processes (product grounding only)",
+        default=1,
+    )
+    argparser.add_argument(
+        "--simplify",
+        action="store_true",
+        help="Remove unreachable, irrelevant and duplicate operators and the "
+        "facts only they use after grounding",
+    )
+    argparser.add_argument(
+        "--cache-dir",
+        help="Cache grounded tasks in this directory and reuse them in later "
+        "runs with the same domain, problem and grounding",
+        default=None,
+    )
+    argparser.add_argument(
+        "--cache-size",
+        type=int,
+        help="Maximal size of the grounded task cache in megabytes",
+        default=task_cache.DEFAULT_MAX_SIZE // 2**20,
+    )
     argparser.add_argument(
         "-o", 
         "--output",
@@ -121,11 +208,89 @@ def main():
         argparser.print_help()
         sys.exit(2)
 
-    args.problem = os.path.abspath(args.problem)
-    if args.domain is None:
-        args.domain = find_domain(args.problem)
-    else:
-        args.domain = os.path.abspath(args.domain)
+    if args.search == "sat" and args.representation != "strips":
+        print(
+            "ERROR: sat only supports the strips representation\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    if args.successors == "codegen" and args.representation == "hashed":
+        print(
+            "ERROR: codegen does not support the hashed representation\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    if args.successors == "incremental" and args.representation != "strips":
+        print(
+            "ERROR: incremental successors only support the strips representation\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    if args.heuristic_processes < 1:
+        print(
+            "ERROR: the heuristic needs at least one process\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    if args.heuristic_cache < 0:
+        print(
+            "ERROR: the size of the heuristic cache must not be negative\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    if (
+        args.heuristic_processes > 1 or args.heuristic_cache > 0
+    ) and args.heuristic == "landmark":
+        print(
+            "ERROR: the landmark heuristic depends on the path to a node and "
+            "cannot be cached or evaluated in several processes\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    if args.grounding_processes > 1 and args.grounding != "product":
+        print(
+            "ERROR: only the product grounding can use several processes\n",
+            file=sys.stderr,
+        )
+        argparser.print_help()
+        sys.exit(2)
+
+    domain_file, paths = _split_domain(args.problem)
+    problems = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            problems.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith(".pddl") and "domain" not in name
+            )
+        else:
+            problems.append(path)
+    if not problems:
+        print("ERROR: no problem files found\n", file=sys.stderr)
+        argparser.print_help()
+        sys.exit(2)
+    # Problems are solved in groups that share their domain file.
+    domain_problems = {}
+    for problem in problems:
+        if domain_file is None:
+            domain = find_domain(problem)
+        else:
+            domain = os.path.abspath(domain_file)
+        domain_problems.setdefault(domain, []).append(problem)
 
     search = SEARCHES[args.search]
     heuristic = HEURISTICS[args.heuristic]
@@ -136,23 +301,58 @@ def main():
     logging.info("using search: %s" % search.__name__)
     logging.info("using heuristic: %s" % (heuristic.__name__ if heuristic else None))
     use_preferred_ops = args.heuristic == "hffpo"
-    solution = search_plan(
-        args.domain,
-        args.problem,
-        search,
-        heuristic,
+    options = dict(
         use_preferred_ops=use_preferred_ops,
+        representation=args.representation,
+        successor_generator=args.successors == "tree",
+        incremental_successors=args.successors == "incremental",
+        codegen=args.successors == "codegen",
+        heuristic_processes=args.heuristic_processes,
+        heuristic_cache_size=args.heuristic_cache,
+        heuristic_cache_policy=args.heuristic_cache_policy,
+        grounding_strategy=args.grounding,
+        grounding_processes=args.grounding_processes,
+        simplify_task=args.simplify,
+        cache_dir=args.cache_dir,
+        cache_size=args.cache_size * 2**20,
     )
+    for domain, group in domain_problems.items():
+        if len(group) == 1:
+            solutions = [search_plan(domain, group[0], search, heuristic, **options)]
+        else:
+            solutions = search_plans(domain, group, search, heuristic, **options)
+        for problem, solution in zip(group, solutions):
+            _handle_solution(domain, problem, solution)
+
+
+def _is_domain_file(path):
+    """Return whether "path" is a file with a PDDL domain definition."""
+    if not os.path.isfile(path):
+        return False
+    with open(path, encoding="utf-8", errors="replace") as file:
+        return DOMAIN_DEFINITION.search(file.read().lower()) is not None
+
+
+def _split_domain(paths):
+    """
+    Split the positional arguments into the domain file, or None if the first
+    argument is not a domain file, and the problem files and directories.
+    """
+    if len(paths) > 1 and _is_domain_file(paths[0]):
+        return paths[0], paths[1:]
+    return None, paths
+
 
+def _handle_solution(domain, problem, solution):
     if solution is None:
         # Commented for benchmarking
         # logging.warning("No solution could be found")
         pass
     else:
-        solution_file = args.problem + ".soln"
+        solution_file = problem + ".soln"
         logging.info("Plan length: %s" % len(solution))
         write_solution(solution, solution_file)
-        validate_solution(args.domain, args.problem, solution_file)
+        validate_solution(domain, problem, solution_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+Compiles a grounded task into generated Python code.
+
+The decision tree of the task's successor generator is unrolled into nested
+if statements whose conditions contain the tested facts (or bitmasks) as
+literals. Subtrees that would be nested deeper than Python allows are
+looked up by the successor generator itself. Together with assertion-free
+successor and goal functions, the source is compiled once with
+compile/exec. GeneratedTask offers the task interface on top of the
+generated functions, so the searches use it like any other task.
+"""
+
+import functools
+import logging
+
+from .task import BitsetTask, SASTask, Task
+
+
+# Python does not allow more nested blocks than this in one function.
+MAX_NESTING = 90
+
+
+def _get_kind(task):
+    # HashedTask is a Task subclass, but its successors have to be created
+    # with HashedTask.apply, so only these exact types are supported.
+    if type(task) is Task:
+        return "strips"
+    if type(task) is BitsetTask:
+        return "bitset"
+    if type(task) is SASTask:
+        return "sas"
+    raise ValueError(f"Code generation is not supported for {type(task).__name__}")
+
+
+def _condition(kind, fact):
+    if kind == "strips":
+        return f"{fact!r} in state"
+    if kind == "bitset":
+        return f"state & {fact:#x}"
+    mask, value = fact
+    return f"state & {mask:#x} == {value:#x}"
+
+
+def _generate_tree(kind, root, lines, subtrees):
+    """
+    Append the statements that collect the applicable operator indices of
+    the (sub)tree "root".
+
+    The chains of nodes whose "true" children would be nested deeper than
+    MAX_NESTING are appended to "subtrees" instead, and the statements pass
+    them to the successor generator.
+    """
+    # Stack of (node, depth) pairs of the chains that still have to be
+    # emitted. The true child of a node is emitted before the rest of its
+    # chain, so the statements appear in the order of a recursive traversal.
+    stack = [(root, 1)]
+    while stack:
+        node, depth = stack.pop()
+        indent = "    " * depth
+        if node.fact is not None and depth == MAX_NESTING:
+            lines.append(
+                f"{indent}EXTEND_SUBTREE(SUBTREES[{len(subtrees)}], state, applicable)"
+            )
+            subtrees.append(node)
+            continue
+        if node.operators:
+            if len(node.operators) == 1:
+                lines.append(f"{indent}append({node.operators[0]})")
+            else:
+                lines.append(f"{indent}extend({node.operators!r})")
+        if node.fact is not None:
+            lines.append(f"{indent}if {_condition(kind, node.fact)}:")
+            if node.dont_care_child is not None:
+                stack.append((node.dont_care_child, depth))
+            stack.append((node.true_child, depth + 1))
+        elif node.dont_care_child is not None:
+            stack.append((node.dont_care_child, depth))
+
+
+def generate_source(task):
+    """
+    @param task A Task, BitsetTask or SASTask
+    @return The Python source of the functions get_applicable_indices,
+            get_successor_states, iter_successor_states and goal_reached
+            for "task". The source expects the names defined by
+            GeneratedTask in its namespace.
+    """
+    return _generate(task)[0]
+
+
+def _generate(task):
+    """
+    @return A pair of the source of generate_source and the list of subtrees
+            of the successor generator that the source refers to as SUBTREES.
+    """
+    kind = _get_kind(task)
+    root = task.get_successor_generator().root
+    lines = [
+        "def get_applicable_indices(state):",
+        "    applicable = []",
+        "    append = applicable.append",
+        "    extend = applicable.extend",
+    ]
+    subtrees = []
+    _generate_tree(kind, root, lines, subtrees)
+    lines += [
+        "    applicable.sort()",
+        "    return applicable",
+        "",
+    ]
+    if kind == "strips":
+        successor = "(state - deletes) | adds"
+        goal = "GOALS <= state"
+    elif kind == "bitset":
+        successor = "(state & keep) | adds"
+        goal = f"state & {task.goals:#x} == {task.goals:#x}"
+    else:
+        successor = "op.apply(state)"
+        goal = "state & {0:#x} == {1:#x}".format(*task.goals)
+    lines += [
+        "def get_successor_states(state):",
+        "    return [",
+        f"        (op, {successor})",
+        "        for op, keep, deletes, adds in map(",
+        "            EFFECTS.__getitem__, get_applicable_indices(state)",
+        "        )",
+        "    ]",
+        "",
+        "def iter_successor_states(state):",
+        "    for index in get_applicable_indices(state):",
+        "        op, keep, deletes, adds = EFFECTS[index]",
+        f"        yield op, {successor}",
+        "",
+        "def goal_reached(state):",
+        f"    return {goal}",
+        "",
+    ]
+    return "\n".join(lines), subtrees
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_source(source):
+    return compile(source, "<pyperplan generated task>", "exec")
+
+
+class GeneratedTask:
+    """
+    A task whose successor and goal functions are generated Python code.
+
+    All other attributes, like initial_state, operators or decode_state, are
+    those of the wrapped task. Successors are computed without the
+    applicability assertion of task.Operator.apply, and plans are the same as
+    with the wrapped task.
+    """
+
+    def __init__(self, task):
+        """
+        @param task The Task, BitsetTask or SASTask to generate code for
+        """
+        self.task = task
+        source, subtrees = _generate(task)
+        logging.info(f"Generated {source.count(chr(10))} lines of code")
+        if subtrees:
+            logging.info(
+                f"{len(subtrees)} subtrees are too deep for generated code, "
+                "the successor generator looks them up"
+            )
+        generator = task.get_successor_generator()
+        operators = generator.operators
+        if type(task) is Task:
+            effects = [(op, None, op.del_effects, op.add_effects) for op in operators]
+        elif type(task) is BitsetTask:
+            effects = [(op, op.keep_mask, None, op.add_effects) for op in operators]
+        else:
+            effects = [(op, None, None, None) for op in operators]
+        namespace = {
+            "EFFECTS": effects,
+            "GOALS": task.goals,
+            "SUBTREES": subtrees,
+            "EXTEND_SUBTREE": generator.extend_applicable_indices,
+        }
+        exec(_compile_source(source), namespace)
+        self.get_applicable_indices = namespace["get_applicable_indices"]
+        self.get_successor_states = namespace["get_successor_states"]
+        self.iter_successor_states = namespace["iter_successor_states"]
+        self.goal_reached = namespace["goal_reached"]
+        self._operators = operators
+
+    def get_applicable_operators(self, state):
+        """
+        @return A list of the operators that are applicable in "state",
+        sorted by name.
+        """
+        operators = self._operators
+        return [operators[index] for index in self.get_applicable_indices(state)]
+
+    def __getattr__(self, name):
+        if name == "task":
+            raise AttributeError(name)
+        return getattr(self.task, name)
+
+    def __reduce__(self):
+        # The generated functions can not be pickled, they are generated anew.
+        return (GeneratedTask, (self.task,))
+
+    def __repr__(self):
+        return f"<GeneratedTask {self.task!r}>"
@@ -21,9 +21,11 @@ task.
 """
 
 from collections import defaultdict
+import functools
 import itertools
 import logging
-import re
+import multiprocessing
+import operator
 
 from .task import Operator, Task
 
@@ -31,9 +33,18 @@ from .task import Operator, Task
 # controls mass log output
 verbose_logging = False
 
+# Actions with more possible assignments than this are split into several
+# units of work when grounding in parallel.
+PARALLEL_CHUNK_SIZE = 20000
+
 
 def ground(
-    problem, remove_statics_from_initial_state=True, remove_irrelevant_operators=True
+    problem,
+    remove_statics_from_initial_state=True,
+    remove_irrelevant_operators=True,
+    strategy="product",
+    processes=1,
+    simplify=False,
 ):
     """
     This is the main method that grounds the PDDL task and returns an
@@ -42,6 +53,13 @@ def ground(
     @note Assumption: only PDDL problems with types at the moment.
 
     @param problem A pddl.Problem instance describing the parsed problem
+    @param strategy The name of the strategy for instantiating the actions,
+                    one of the keys of STRATEGIES
+    @param processes The number of processes used for grounding the actions,
+                     only the product strategy supports more than one
+    @param simplify Whether to remove unreachable, irrelevant and duplicate
+                    operators as well as the facts that only they use. This
+                    includes the relevance analysis.
     @return A task.Task instance with the grounded problem
     """
 
@@ -78,10 +96,55 @@ def ground(
         logging.debug("Initial state with statics:\n%s" % init)
 
     # Ground actions
-    operators = _ground_actions(actions, type_map, statics, init)
+    operators = _ground_operators(actions, type_map, statics, init, strategy, processes)
+
+    return _create_task(
+        problem,
+        operators,
+        init,
+        remove_statics_from_initial_state,
+        remove_irrelevant_operators,
+        simplify,
+    )
+
+
+def _ground_operators(actions, type_map, statics, init, strategy, processes):
+    """
+    Ground the actions with the given strategy and number of processes.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown grounding strategy: {strategy}")
+    if processes > 1:
+        if strategy != "product":
+            raise ValueError(f"The {strategy} strategy can not ground in parallel")
+        operators = _ground_actions_in_parallel(
+            actions, type_map, statics, init, processes
+        )
+    else:
+        operators = STRATEGIES[strategy](actions, type_map, statics, init)
     if verbose_logging:
         logging.debug("Operators:\n%s" % "\n".join(map(str, operators)))
+    return operators
+
 
+def _create_task(
+    problem,
+    operators,
+    init,
+    remove_statics_from_initial_state,
+    remove_irrelevant_operators,
+    simplify,
+    operator_facts=None,
+    modifiers=None,
+):
+    """
+    Create the task for the grounded operators of "problem" and its grounded
+    initial state "init". This grounds the goal, collects the facts and runs
+    the relevance analysis or simplification, which modify "operators".
+
+    @param operator_facts The result of _collect_facts for "operators"
+    @param modifiers The result of _get_modifiers for "operators"
+    """
     # Ground goal
     # TODO: Remove facts that can only become true and are true in the
     #       initial state
@@ -91,8 +154,14 @@ def ground(
     if verbose_logging:
         logging.debug("Goal:\n%s" % goals)
 
+    if simplify:
+        operators = _simplify_task(operators, init, goals)
+        operator_facts = modifiers = None
+
     # Collect facts from operators and include the ones from the goal
-    facts = _collect_facts(operators) | goals
+    if operator_facts is None:
+        operator_facts = _collect_facts(operators)
+    facts = operator_facts | goals
     if verbose_logging:
         logging.debug("All grounded facts:\n%s" % facts)
 
@@ -103,63 +172,431 @@ def ground(
             logging.debug("Initial state without statics:\n%s" % init)
 
     # perform relevance analysis
-    if remove_irrelevant_operators:
-        operators = _relevance_analysis(operators, goals)
+    if remove_irrelevant_operators and not simplify:
+        operators = _relevance_analysis(operators, goals, modifiers)
 
     name = problem.name
     return Task(name, facts, init, goals, operators)
 
 
-def _relevance_analysis(operators, goals):
+class GroundingSession:
+    """
+    Grounds a sequence of problems of one domain.
+
+    The static predicates are determined once per domain. Instantiating the
+    actions only depends on the domain, the objects and the static facts of
+    the initial state. The session keeps the operators grounded for the last
+    "max_entries" combinations of objects and static facts. For a further
+    problem with one of these combinations only the parts that depend on the
+    rest of the initial state and on the goal are computed again: the
+    relevance analysis (or simplification) and the collection of the facts.
+
+    A problem with the same objects as a kept combination, but other static
+    facts, starts from the operators of the combination with the fewest
+    differing static facts. Operators that require a removed static fact are
+    dropped, and only the assignments that use an added static fact are
+    grounded.
+
+    The operators of the reachability strategy depend on the whole initial
+    state, so with this strategy they are only reused for problems with the
+    same objects and initial state.
+    """
+
+    MAX_ENTRIES = 8
+
+    def __init__(
+        self,
+        remove_statics_from_initial_state=True,
+        remove_irrelevant_operators=True,
+        strategy="product",
+        processes=1,
+        simplify=False,
+        max_entries=MAX_ENTRIES,
+    ):
+        """
+        @param max_entries The number of combinations of objects and static
+                           facts whose operators are kept, 0 disables the
+                           reuse of operators
+        The other parameters are those of ground().
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown grounding strategy {strategy}")
+        self.remove_statics_from_initial_state = remove_statics_from_initial_state
+        self.remove_irrelevant_operators = remove_irrelevant_operators
+        self.strategy = strategy
+        self.processes = processes
+        self.simplify = simplify
+        self.max_entries = max_entries
+        self._domain = None
+        self._statics = None
+        # Maps (objects, static facts) to lists of the (name, preconditions,
+        # add effects, delete effects) tuples of the grounded operators, the
+        # facts of these operators, their _get_modifiers index and the static
+        # preconditions of each operator, which are computed on first use.
+        self._operators = {}
+
+    def ground(self, problem):
+        """
+        @param problem A pddl.Problem instance
+        @return A task.Task instance with the grounded problem, equal to the
+                one returned by ground() for the same options
+        """
+        domain = problem.domain
+        if domain is not self._domain:
+            # Problems are compared to the domain instance they were parsed
+            # with, so another domain instance invalidates the operators.
+            self._domain = domain
+            self._statics = _get_statics(
+                domain.predicates.values(), domain.actions.values()
+            )
+            self._operators.clear()
+        actions = domain.actions.values()
+
+        objects = problem.objects
+        objects.update(domain.constants)
+        statics = self._statics
+        init = _get_partial_state(problem.initial_state)
+        key = entry = similar_key = None
+        if self.max_entries > 0:
+            if self.strategy == "reachability":
+                static_facts = init
+            else:
+                static_names = set(statics)
+                static_facts = frozenset(
+                    fact for fact in init if fact.strip("()").split()[0] in static_names
+                )
+            key = (
+                frozenset((name, type.name) for name, type in objects.items()),
+                static_facts,
+            )
+            entry = self._operators.get(key)
+            if entry is None and self.strategy != "reachability":
+                similar_key = self._find_similar_key(key)
+
+        if entry is not None:
+            logging.info("Reusing the grounded operators of a previous problem")
+            # The relevance analysis modifies the operators, so the cached
+            # operators are never handed out.
+            operators = [Operator(*args) for args in entry[0]]
+            operator_facts, modifiers = entry[1:3]
+        else:
+            type_map = _create_type_map(objects)
+            if similar_key is not None:
+                logging.info("Grounding the changed static facts of a previous problem")
+                operators = self._ground_static_delta(
+                    actions, type_map, init, similar_key, key[1]
+                )
+            else:
+                operators = _ground_operators(
+                    actions, type_map, statics, init, self.strategy, self.processes
+                )
+            operator_facts = modifiers = None
+            if key is not None:
+                operator_facts = _collect_facts(operators)
+                modifiers = _get_modifiers(operators)
+                if len(self._operators) >= self.max_entries:
+                    # Drop the oldest entry.
+                    del self._operators[next(iter(self._operators))]
+                self._operators[key] = [
+                    [
+                        (op.name, op.preconditions, op.add_effects, op.del_effects)
+                        for op in operators
+                    ],
+                    operator_facts,
+                    modifiers,
+                    None,
+                ]
+
+        return _create_task(
+            problem,
+            operators,
+            init,
+            self.remove_statics_from_initial_state,
+            self.remove_irrelevant_operators,
+            self.simplify,
+            operator_facts=operator_facts,
+            modifiers=modifiers,
+        )
+
+    def _find_similar_key(self, key):
+        """
+        @return The key of the kept combination with the objects of "key"
+                and the fewest static facts that differ from those of "key",
+                or None
+        """
+        objects, static_facts = key
+        keys = [other for other in self._operators if other[0] == objects]
+        if not keys:
+            return None
+        return min(keys, key=lambda other: len(other[1] ^ static_facts))
+
+    def _ground_static_delta(self, actions, type_map, init, similar_key, static_facts):
+        """
+        Derive the operators for "static_facts" from those of the kept
+        combination "similar_key" with the same objects.
+
+        @return The operators in the order of _ground_actions
+        """
+        entry = self._operators[similar_key]
+        if entry[3] is None:
+            entry[3] = _get_static_preconditions(actions, self._statics, entry[0])
+        removed = similar_key[1] - static_facts
+        added = static_facts - similar_key[1]
+        operators = [
+            Operator(*args)
+            for args, static_preconditions in zip(entry[0], entry[3])
+            if removed.isdisjoint(static_preconditions)
+        ]
+        if added:
+            new_operators = _ground_actions_by_static_delta(
+                actions, type_map, self._statics, init, added
+            )
+            operators = _merge_operators(operators, new_operators, actions, type_map)
+        return operators
+
+
+def _get_action_name(operator_name):
+    return operator_name[1:-1].split(" ", 1)[0]
+
+
+def _get_static_preconditions(actions, statics, operators):
+    """
+    @param operators (name, preconditions, add effects, delete effects)
+                     tuples of grounded operators of "actions"
+    @return For each operator the tuple of its grounded preconditions with a
+            static predicate
+    """
+    # For each action the static preconditions as pairs of the predicate
+    # name and, for each argument, the position of the parameter in the
+    # operator name or the constant.
+    templates = {}
+    for action in actions:
+        positions = {param: i for i, (param, _) in enumerate(action.signature, 1)}
+        templates[action.name] = [
+            (pred.name, [positions.get(name, name) for name, _ in pred.signature])
+            for pred in action.precondition
+            if pred.name in statics
+        ]
+    result = []
+    for name, *_ in operators:
+        args = name[1:-1].split()
+        result.append(
+            tuple(
+                _get_grounded_string(
+                    pred_name,
+                    [arg if isinstance(arg, str) else args[arg] for arg in template],
+                )
+                for pred_name, template in templates[args[0]]
+            )
+        )
+    return result
+
+
+def _ground_actions_by_static_delta(actions, type_map, statics, init, added):
+    """
+    Ground only the operators that require at least one of the static facts
+    "added". These are the operators that are missing from the operators of
+    the static facts of "init" without "added".
+
+    @return A dictionary that maps the names of the actions to lists of
+            their new operators in the order of _ground_actions
+    """
+    statics = set(statics)
+    index = _FactIndex()
+    for fact in init:
+        pred_name, *args = fact.strip("()").split()
+        if pred_name in statics:
+            index.add(pred_name, tuple(args))
+    delta = defaultdict(list)
+    for fact in added:
+        pred_name, *args = fact.strip("()").split()
+        delta[pred_name].append(tuple(args))
+
+    operators = {}
+    for action in actions:
+        param_to_objects = _get_param_to_objects(action, type_map)
+        params = list(param_to_objects)
+        static_preconditions = _get_atoms(
+            pred for pred in action.precondition if pred.name in statics
+        )
+        # An assignment that uses several added facts is found once for each.
+        keys = set()
+        for assignment in _join_delta(
+            static_preconditions, delta, index, param_to_objects
+        ):
+            free = [param for param in params if param not in assignment]
+            for objects in itertools.product(
+                *[param_to_objects[param] for param in free]
+            ):
+                full = dict(assignment)
+                full.update(zip(free, objects))
+                keys.add(tuple(full[param] for param in params))
+        if keys:
+            operators[action.name] = _create_operators(
+                action, param_to_objects, keys, statics, init
+            )
+    return operators
+
+
+def _merge_operators(operators, new_operators, actions, type_map):
+    """
+    Merge "new_operators", the result of _ground_actions_by_static_delta,
+    into "operators", which are in the order of _ground_actions: by action,
+    and the operators of an action in the order of the product of the
+    parameters' object sets.
+    """
+    by_action = {
+        name: list(group)
+        for name, group in itertools.groupby(
+            operators, key=lambda op: _get_action_name(op.name)
+        )
+    }
+    merged = []
+    for action in actions:
+        kept = by_action.get(action.name, [])
+        if action.name not in new_operators:
+            merged.extend(kept)
+            continue
+        ranks = [
+            {obj: rank for rank, obj in enumerate(objects)}
+            for objects in _get_param_to_objects(action, type_map).values()
+        ]
+        merged.extend(
+            sorted(
+                kept + new_operators[action.name],
+                key=lambda op: [
+                    rank[obj] for rank, obj in zip(ranks, op.name[1:-1].split()[1:])
+                ],
+            )
+        )
+    return merged
+
+
+def _get_modifiers(operators):
+    """
+    @return A dictionary that maps every fact to the indices of the
+            operators that add or delete it
+    """
+    modifiers = defaultdict(list)
+    for index, op in enumerate(operators):
+        for fact in op.add_effects:
+            modifiers[fact].append(index)
+        for fact in op.del_effects:
+            modifiers[fact].append(index)
+    return modifiers
+
+
+def _relevance_analysis(operators, goals, modifiers=None):
     """This implements a relevance analysis of operators.
 
-    We start with all facts within the goal and iteratively compute
-    a fixpoint of all relevant effects.
+    We start with all facts within the goal and propagate relevance
+    backwards: the preconditions of an operator that adds or deletes a
+    relevant fact are relevant, too. An index from each fact to the
+    operators that add or delete it lets a worklist process every fact and
+    operator at most once.
     Relevant effects are those that contribute to a valid path to the goal.
+
+    @param modifiers The result of _get_modifiers for "operators", it is
+                     computed if it is not given
     """
     debug = True
-    debug_pruned_op = set()
-
-    relevant_facts = set()
-    old_relevant_facts = set()
-    changed = True
-    for goal in goals:
-        relevant_facts.add(goal)
-
-    while changed:
-        # set next relevant facts to current facts
-        # if we do not add anything in the following for loop
-        # we have already found a fixpoint
-        old_relevant_facts = relevant_facts.copy()
-        # compute cut of relevant facts with effects of all operators
-        for op in operators:
-            new_addlist = op.add_effects & relevant_facts
-            new_dellist = op.del_effects & relevant_facts
-            if new_addlist or new_dellist:
-                # add all preconditions to relevant facts
-                relevant_facts |= op.preconditions
-        changed = old_relevant_facts != relevant_facts
+
+    if modifiers is None:
+        modifiers = _get_modifiers(operators)
+
+    relevant_facts = set(goals)
+    queue = list(relevant_facts)
+    processed = [False] * len(operators)
+    while queue:
+        fact = queue.pop()
+        for index in modifiers.get(fact, ()):
+            if processed[index]:
+                continue
+            processed[index] = True
+            # add all preconditions to relevant facts
+            for precondition in operators[index].preconditions:
+                if precondition not in relevant_facts:
+                    relevant_facts.add(precondition)
+                    queue.append(precondition)
 
     # delete all irrellevant effects
-    del_operators = set()
+    relevant_operators = []
     for op in operators:
-        # calculate new effects
-        new_addlist = op.add_effects & relevant_facts
-        new_dellist = op.del_effects & relevant_facts
-        if debug:
-            debug_pruned_op |= op.add_effects - relevant_facts
-            debug_pruned_op |= op.del_effects - relevant_facts
-        # store new effects
-        op.add_effects = new_addlist
-        op.del_effects = new_dellist
-        if not new_addlist and not new_dellist:
-            if verbose_logging:
-                logging.debug("Relevance analysis removed oparator %s" % op.name)
-            del_operators.add(op)
+        # calculate and store new effects
+        op.add_effects = op.add_effects & relevant_facts
+        op.del_effects = op.del_effects & relevant_facts
+        if op.add_effects or op.del_effects:
+            relevant_operators.append(op)
+        elif verbose_logging:
+            logging.debug("Relevance analysis removed oparator %s" % op.name)
     if debug:
-        logging.info("Relevance analysis removed %d facts" % len(debug_pruned_op))
+        # All facts that are added or deleted by some operator are indexed.
+        pruned_facts = modifiers.keys() - relevant_facts
+        logging.info("Relevance analysis removed %d facts" % len(pruned_facts))
     # remove completely irrelevant operators
-    return [op for op in operators if not op in del_operators]
+    return relevant_operators
+
+
+def _remove_unreachable_operators(operators, init):
+    """
+    Remove the operators whose preconditions can not become true, even if
+    delete effects are ignored.
+
+    Every operator counts its preconditions that have not been reached yet.
+    Starting with the initial state, each newly reached fact decrements the
+    counters of the operators that require it, and operators whose counter
+    drops to zero add their effects to the reached facts.
+    """
+    required_by = defaultdict(list)
+    missing = []
+    reached = set(init)
+    for index, op in enumerate(operators):
+        for fact in op.preconditions:
+            required_by[fact].append(index)
+        missing.append(len(op.preconditions))
+        if not op.preconditions:
+            reached.update(op.add_effects)
+    queue = list(reached)
+    while queue:
+        fact = queue.pop()
+        for index in required_by.get(fact, ()):
+            missing[index] -= 1
+            if missing[index] == 0:
+                for effect in operators[index].add_effects:
+                    if effect not in reached:
+                        reached.add(effect)
+                        queue.append(effect)
+    reachable = [op for op, count in zip(operators, missing) if count == 0]
+    logging.info(
+        "Reachability analysis removed %d operators" % (len(operators) - len(reachable))
+    )
+    return reachable
+
+
+def _remove_duplicate_operators(operators):
+    """
+    Keep only the first of several operators with the same preconditions and
+    effects.
+    """
+    seen = set()
+    unique = []
+    for op in operators:
+        key = (op.preconditions, op.add_effects, op.del_effects)
+        if key not in seen:
+            seen.add(key)
+            unique.append(op)
+    logging.info("Removed %d duplicate operators" % (len(operators) - len(unique)))
+    return unique
+
+
+def _simplify_task(operators, init, goals):
+    """
+    Remove the operators that are unreachable from "init", the effects and
+    operators that are irrelevant for "goals" and duplicate operators.
+    """
+    operators = _remove_unreachable_operators(operators, init)
+    operators = _relevance_analysis(operators, goals)
+    return _remove_duplicate_operators(operators)
 
 
 def _get_statics(predicates, actions):
@@ -221,6 +658,45 @@ def _collect_facts(operators):
     return facts
 
 
+class _StaticIndex:
+    """
+    Index of the static facts of the initial state.
+
+    It is built once per problem and answers in constant time whether an
+    object occurs at some argument position of a static predicate and
+    whether a static fact is true.
+    """
+
+    def __init__(self, statics, init):
+        """
+        @param statics: Names of the static predicates
+        @param init: Grounded initial state
+        """
+        self.statics = set(statics)
+        # Maps predicate name -> argument position -> set of objects.
+        self.objects = defaultdict(lambda: defaultdict(set))
+        # The static facts as (predicate name, arg1, arg2, ...) tuples.
+        self.facts = set()
+        for fact in init:
+            name, *args = fact.strip("()").split()
+            if name not in self.statics:
+                continue
+            self.facts.add((name, *args))
+            positions = self.objects[name]
+            for position, arg in enumerate(args):
+                positions[position].add(arg)
+
+    def get_objects(self, pred_name, position):
+        """
+        @return The set of objects that occur at "position" in a static fact
+                with predicate "pred_name"
+        """
+        positions = self.objects.get(pred_name)
+        if positions is None:
+            return set()
+        return positions.get(position, set())
+
+
 def _ground_actions(actions, type_map, statics, init):
     """
     Ground a list of actions and return the resulting list of operators.
@@ -230,38 +706,35 @@ def _ground_actions(actions, type_map, statics, init):
     @param statics: Names of the static predicates
     @param init: Grounded initial state
     """
-    op_lists = [_ground_action(action, type_map, statics, init) for action in actions]
+    static_index = _StaticIndex(statics, init)
+    op_lists = [
+        _ground_action(action, type_map, statics, init, static_index)
+        for action in actions
+    ]
     operators = list(itertools.chain(*op_lists))
     return operators
 
 
-def _find_pred_in_init(pred_name, param, sig_pos, init):
+def _ground_action(action, type_map, statics, init, static_index=None):
     """
-    This method is used to check whether an instantiation of the predicate
-    denoted by pred_name with the parameter param at position sig_pos is
-    present in the initial condition.
+    Ground the action and return the resulting list of operators.
 
-    Useful to evaluate static preconditions efficiently.
+    @param static_index: _StaticIndex for "statics" and "init", it is built
+                         if it is not given
     """
-    match_init = None
-    if sig_pos == 0:
-        match_init = re.compile(rf"\({pred_name} {param}.*")
-    else:
-        reg_ex = r"\(%s\s+" % pred_name
-        reg_ex += r"[\w\d-]+\s+" * sig_pos
-        #        for i in xrange(sig_pos):
-        #            reg_ex += '[\w\d-]+\s+'
-        reg_ex += "%s.*" % param
-        match_init = re.compile(reg_ex)
-    assert match_init is not None
-    return any([match_init.match(string) for string in init])
+    logging.debug("Grounding %s" % action.name)
+    if static_index is None:
+        static_index = _StaticIndex(statics, init)
+    param_to_objects = _get_possible_objects(action, type_map, static_index)
+    return _instantiate_action(action, param_to_objects, statics, init, static_index)
 
 
-def _ground_action(action, type_map, statics, init):
+def _get_possible_objects(action, type_map, static_index):
     """
-    Ground the action and return the resulting list of operators.
+    @return A dictionary that maps the parameters of "action" to the sets of
+            objects of their types that occur in the static facts required
+            for them
     """
-    logging.debug("Grounding %s" % action.name)
     param_to_objects = {}
 
     for param_name, param_types in action.signature:
@@ -276,28 +749,34 @@ def _ground_action(action, type_map, statics, init):
     remove_debug = 0
     for param, objects in param_to_objects.items():
         for pred in action.precondition:
-            # if a static predicate is present in the precondition
-            if pred.name in statics:
-                sig_pos = -1
-                count = 0
-                # check if there is an instantiation with the current parameter
-                for var, _ in pred.signature:
-                    if var == param:
-                        sig_pos = count
-                    count += 1
-                if sig_pos != -1:
-                    # remove if no instantiation present in initial state
-                    obj_copy = objects.copy()
-                    for o in obj_copy:
-                        if not _find_pred_in_init(pred.name, o, sig_pos, init):
-                            if verbose_logging:
-                                remove_debug += 1
-                            objects.remove(o)
+            if pred.name not in static_index.statics:
+                continue
+            # check if there is an instantiation with the current parameter
+            for sig_pos, (var, _) in enumerate(pred.signature):
+                if var != param:
+                    continue
+                # remove if no instantiation present in initial state
+                invalid = objects - static_index.get_objects(pred.name, sig_pos)
+                if verbose_logging:
+                    remove_debug += len(invalid)
+                # Removing the objects one by one (unlike difference_update)
+                # never resizes the set, which keeps the iteration order and
+                # thus the order of the operators.
+                for obj in invalid:
+                    objects.remove(obj)
     if verbose_logging:
         logging.info(
             "Static precondition analysis removed %d possible objects" % remove_debug
         )
+    return param_to_objects
+
 
+def _instantiate_action(action, param_to_objects, statics, init, static_index):
+    """
+    Create the operators of "action" for all assignments in the product of
+    the parameters' objects, given as sets or lists in "param_to_objects",
+    whose static preconditions hold.
+    """
     # save a list of possible assignment tuples (param_name, object)
     domain_lists = [
         [(name, obj) for obj in objects] for name, objects in param_to_objects.items()
@@ -305,16 +784,92 @@ def _ground_action(action, type_map, statics, init):
     # Calculate all possible assignments
     assignments = itertools.product(*domain_lists)
 
-    # Create a new operator for each possible assignment of parameters
-    ops = [
-        _create_operator(action, dict(assign), statics, init) for assign in assignments
+    # Static preconditions are checked on tuples before any fact string of
+    # an assignment is built.
+    static_signatures = [
+        (pred.name, [name for name, _ in pred.signature])
+        for pred in action.precondition
+        if pred.name in static_index.statics
     ]
+    static_facts = static_index.facts
+
+    def holds(assignment):
+        for pred_name, names in static_signatures:
+            args = tuple(assignment.get(name, name) for name in names)
+            if (pred_name, *args) not in static_facts:
+                return False
+        return True
+
+    # Create a new operator for each possible assignment of parameters
+    ops = []
+    for assign in assignments:
+        assignment = dict(assign)
+        if holds(assignment):
+            ops.append(_create_operator(action, assignment, statics, init))
     # Filter out the None values
     ops = filter(bool, ops)
 
     return ops
 
 
+# The statics, initial state and _StaticIndex of a grounding worker process.
+_worker_state = None
+
+
+def _init_worker(statics, init):
+    global _worker_state
+    _worker_state = (statics, init, _StaticIndex(statics, init))
+
+
+def _ground_chunk(action, param_to_objects):
+    statics, init, static_index = _worker_state
+    return list(
+        _instantiate_action(action, param_to_objects, statics, init, static_index)
+    )
+
+
+def _ground_actions_in_parallel(actions, type_map, statics, init, processes):
+    """
+    Ground a list of actions like _ground_actions, but in "processes" worker
+    processes.
+
+    Every action is one unit of work, actions with more than
+    PARALLEL_CHUNK_SIZE possible assignments are split into several units.
+    The possible objects of the parameters are passed to the workers as
+    lists in the order of this process, so the operators are the same and
+    in the same order as with _ground_actions.
+    """
+    static_index = _StaticIndex(statics, init)
+    chunks = []
+    for action in actions:
+        param_to_objects = {
+            param: list(objects)
+            for param, objects in _get_possible_objects(
+                action, type_map, static_index
+            ).items()
+        }
+        size = _get_num_assignments(param_to_objects)
+        if size <= PARALLEL_CHUNK_SIZE:
+            chunks.append((action, param_to_objects))
+            continue
+        # The first parameter varies slowest in the product, so consecutive
+        # slices of its objects yield consecutive parts of the operators.
+        first_param = next(iter(param_to_objects))
+        first_objects = param_to_objects[first_param]
+        step = max(1, PARALLEL_CHUNK_SIZE * len(first_objects) // size)
+        for start in range(0, len(first_objects), step):
+            chunk = dict(param_to_objects)
+            chunk[first_param] = first_objects[start : start + step]
+            chunks.append((action, chunk))
+    if not chunks:
+        return []
+    logging.info(f"Grounding {len(chunks)} chunks in {processes} processes")
+    # ProcessPoolExecutor only accepts an initializer since Python 3.7.
+    with multiprocessing.Pool(processes, _init_worker, (statics, init)) as pool:
+        op_lists = pool.starmap(_ground_chunk, chunks)
+    return list(itertools.chain(*op_lists))
+
+
 def _create_operator(action, assignment, statics, init):
     """Create an operator for "action" and "assignment".
 
@@ -350,6 +905,292 @@ def _create_operator(action, assignment, statics, init):
     return Operator(name, precondition_facts, add_effects, del_effects)
 
 
+def _get_param_to_objects(action, type_map):
+    """
+    @return A dictionary that maps the parameters of "action", in the order
+            of its signature, to the sets of objects of their types
+    """
+    return {
+        name: set(itertools.chain(*[type_map[type] for type in types]))
+        for name, types in action.signature
+    }
+
+
+def _get_num_assignments(param_to_objects):
+    """
+    @return The number of assignments of the objects to the parameters
+    """
+    # math.prod needs Python 3.8.
+    return functools.reduce(
+        operator.mul, (len(objects) for objects in param_to_objects.values()), 1
+    )
+
+
+def _get_atoms(predicates):
+    """
+    @return The list of (predicate name, argument names) pairs of the atoms
+    """
+    return [(pred.name, [name for name, _ in pred.signature]) for pred in predicates]
+
+
+def _create_operators(action, param_to_objects, keys, statics, init):
+    """
+    Create the operators of "action" for the assignments "keys", tuples of
+    objects in the order of the parameters.
+
+    _ground_action enumerates the assignments as the product of the
+    parameters' object sets, so the operators are sorted in that order.
+    """
+    ranks = [
+        {obj: rank for rank, obj in enumerate(objects)}
+        for objects in param_to_objects.values()
+    ]
+    keys = sorted(keys, key=lambda key: [rank[obj] for rank, obj in zip(ranks, key)])
+    params = list(param_to_objects)
+    operators = []
+    for key in keys:
+        op = _create_operator(action, dict(zip(params, key)), statics, init)
+        if op is not None:
+            operators.append(op)
+    return operators
+
+
+class _FactIndex:
+    """
+    The facts reached so far as argument tuples, indexed by predicate and by
+    the object at each argument position.
+    """
+
+    def __init__(self):
+        self.facts = defaultdict(set)
+        self.by_arg = defaultdict(list)
+
+    def add(self, pred_name, args):
+        """
+        @return True if the fact has not been reached before
+        """
+        facts = self.facts[pred_name]
+        if args in facts:
+            return False
+        facts.add(args)
+        for position, arg in enumerate(args):
+            self.by_arg[(pred_name, position, arg)].append(args)
+        return True
+
+    def get_candidates(self, pred_name, names, assignment):
+        """
+        @return The argument tuples of the facts with predicate "pred_name"
+                that may match an atom with the argument names "names" under
+                "assignment"
+        """
+        candidates = self.facts.get(pred_name, ())
+        for position, name in enumerate(names):
+            obj = assignment.get(name)
+            if obj is not None:
+                matching = self.by_arg.get((pred_name, position, obj), ())
+                if len(matching) < len(candidates):
+                    candidates = matching
+        return candidates
+
+
+def _match(names, args, assignment, param_to_objects):
+    """
+    Match the argument names of an atom against the arguments of a fact.
+
+    @return The assignment extended by the parameters bound by the match, or
+            None if the fact does not match
+    """
+    extended = assignment
+    for name, obj in zip(names, args):
+        if name in param_to_objects:
+            bound = extended.get(name)
+            if bound is None:
+                if obj not in param_to_objects[name]:
+                    return None
+                if extended is assignment:
+                    extended = dict(assignment)
+                extended[name] = obj
+            elif bound != obj:
+                return None
+        elif name != obj:
+            # A constant
+            return None
+    return extended
+
+
+def _join(atoms, assignment, index, param_to_objects):
+    """
+    Yield all extensions of "assignment" under which all "atoms", given as
+    (predicate name, argument names) pairs, are reached facts.
+
+    The atom with the fewest candidate facts under the current assignment is
+    matched first.
+    """
+    if not atoms:
+        yield assignment
+        return
+    best = None
+    for position, (pred_name, names) in enumerate(atoms):
+        candidates = index.get_candidates(pred_name, names, assignment)
+        if best is None or len(candidates) < len(best[1]):
+            best = (position, candidates)
+    position, candidates = best
+    names = atoms[position][1]
+    rest = atoms[:position] + atoms[position + 1 :]
+    for args in candidates:
+        extended = _match(names, args, assignment, param_to_objects)
+        if extended is not None:
+            yield from _join(rest, extended, index, param_to_objects)
+
+
+def _join_delta(atoms, delta, index, param_to_objects):
+    """
+    Yield the assignments under which all "atoms" are reached facts and at
+    least one of them is a fact of "delta", a mapping from predicate names
+    to the argument tuples of the facts reached last.
+    """
+    for position, (pred_name, names) in enumerate(atoms):
+        rest = atoms[:position] + atoms[position + 1 :]
+        for args in delta.get(pred_name, ()):
+            assignment = _match(names, args, {}, param_to_objects)
+            if assignment is not None:
+                yield from _join(rest, assignment, index, param_to_objects)
+
+
+def _ground_actions_by_reachability(actions, type_map, statics, init):
+    """
+    Ground only the actions whose preconditions are reachable when delete
+    effects are ignored.
+
+    Starting with the initial state, the reachable facts and operators are
+    computed as a fixpoint. In each round every action is only matched with
+    assignments that use at least one fact reached in the previous round.
+    The operators are returned in the order of _ground_actions, which
+    additionally returns the unreachable operators.
+
+    @param actions: List of actions
+    @param type_map: Mapping from type to objects of that type
+    @param statics: Names of the static predicates
+    @param init: Grounded initial state
+    """
+    schemas = []
+    for action in actions:
+        param_to_objects = _get_param_to_objects(action, type_map)
+        preconditions = _get_atoms(action.precondition)
+        add_effects = _get_atoms(action.effect.addlist)
+        schemas.append((action, param_to_objects, preconditions, add_effects, set()))
+
+    index = _FactIndex()
+    new_facts = []
+    for fact in init:
+        pred_name, *args = fact.strip("()").split()
+        new_facts.append((pred_name, tuple(args)))
+
+    # The first round also runs for an empty initial state, since actions
+    # without preconditions are reachable in any case.
+    first_round = True
+    while new_facts or first_round:
+        delta = defaultdict(list)
+        for pred_name, args in new_facts:
+            if index.add(pred_name, args):
+                delta[pred_name].append(args)
+        new_facts = []
+        for action, param_to_objects, preconditions, add_effects, reached in schemas:
+            params = list(param_to_objects)
+            if preconditions:
+                assignments = _join_delta(preconditions, delta, index, param_to_objects)
+            else:
+                # Without preconditions an action is reachable right away.
+                assignments = [{}] if first_round else []
+            for assignment in assignments:
+                # Parameters that occur in no precondition take all objects.
+                free = [param for param in params if param not in assignment]
+                for objects in itertools.product(
+                    *[param_to_objects[param] for param in free]
+                ):
+                    full = dict(assignment)
+                    full.update(zip(free, objects))
+                    key = tuple(full[param] for param in params)
+                    if key in reached:
+                        continue
+                    reached.add(key)
+                    for pred_name, names in add_effects:
+                        args = tuple(full.get(name, name) for name in names)
+                        new_facts.append((pred_name, args))
+        first_round = False
+
+    operators = []
+    for action, param_to_objects, _, _, reached in schemas:
+        operators.extend(
+            _create_operators(action, param_to_objects, reached, statics, init)
+        )
+    return operators
+
+
+def _ground_actions_by_join(actions, type_map, statics, init):
+    """
+    Ground a list of actions by joining their static preconditions.
+
+    The static preconditions of an action form a conjunctive query over the
+    static facts of the initial state. Parameters are bound one precondition
+    at a time, always choosing the precondition with the fewest matching
+    facts under the current bindings, which are looked up in a hash index.
+    Combinations that violate a static precondition are never enumerated.
+    Fluent preconditions may become true later on, so they do not restrict
+    the bindings. The result is the same as that of _ground_actions.
+
+    @param actions: List of actions
+    @param type_map: Mapping from type to objects of that type
+    @param statics: Names of the static predicates
+    @param init: Grounded initial state
+    """
+    statics = set(statics)
+    index = _FactIndex()
+    for fact in init:
+        pred_name, *args = fact.strip("()").split()
+        if pred_name in statics:
+            index.add(pred_name, tuple(args))
+
+    operators = []
+    candidates = 0
+    enumerated = 0
+    for action in actions:
+        param_to_objects = _get_param_to_objects(action, type_map)
+        params = list(param_to_objects)
+        static_preconditions = _get_atoms(
+            pred for pred in action.precondition if pred.name in statics
+        )
+        keys = []
+        for assignment in _join(static_preconditions, {}, index, param_to_objects):
+            # Parameters that occur in no static precondition take all objects.
+            free = [param for param in params if param not in assignment]
+            for objects in itertools.product(
+                *[param_to_objects[param] for param in free]
+            ):
+                full = dict(assignment)
+                full.update(zip(free, objects))
+                keys.append(tuple(full[param] for param in params))
+        candidates += _get_num_assignments(param_to_objects)
+        enumerated += len(keys)
+        operators.extend(
+            _create_operators(action, param_to_objects, keys, statics, init)
+        )
+    logging.info(
+        "Join grounding avoided %d of %d candidate assignments"
+        % (candidates - enumerated, candidates)
+    )
+    return operators
+
+
+# Maps the names of the grounding strategies to functions that ground a list
+# of actions, see _ground_actions for their parameters.
+STRATEGIES = {
+    "product": _ground_actions,
+    "reachability": _ground_actions_by_reachability,
+    "join": _ground_actions_by_join,
+}
+
+
 def _get_grounded_string(name, args):
     """We use the lisp notation (e.g. "(unstack c e)")."""
     args_string = " " + " ".join(args) if args else ""
@@ -382,5 +1223,11 @@ def _get_fact(atom):
 
 
 def _get_partial_state(atoms):
-    """Return a set of the string representation of the grounded atoms."""
-    return frozenset(_get_fact(atom) for atom in atoms)
+    """
+    Return a set of the string representation of the grounded atoms.
+
+    @param atoms pddl.Predicate instances or fact strings, e.g. "(on a b)"
+    """
+    return frozenset(
+        atom if isinstance(atom, str) else _get_fact(atom) for atom in atoms
+    )
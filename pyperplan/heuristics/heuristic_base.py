@@ -15,11 +15,173 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 #
 
+import multiprocessing
+
+
+# Batches with fewer nodes than this per worker process are evaluated in the
+# main process, because sending them to the workers costs more than it saves.
+MIN_PARALLEL_BATCH_SIZE = 2
+
 
 class Heuristic:
+    # The number of nodes that searches which stop at the first good
+    # successor hand to evaluate_batch at once.
+    batch_size = 1
+
     def __call__(self, node):
         """
         This function should calculate the heuristic value based on the current
         state.
         """
         raise NotImplementedError
+
+    def evaluate_batch(self, nodes):
+        """
+        Calculate the heuristic values of several nodes at once and return
+        them as a list. Heuristics that can share work between the states
+        override this; by default, the nodes are evaluated one at a time.
+        """
+        return [self(node) for node in nodes]
+
+
+class _DecodedNode:
+    """
+    View of a search node for a compiled task (e.g. task.BitsetTask). It
+    exposes the fact names of the node's state and the original operator, as
+    expected by the heuristics. All other attributes are read from and written
+    to the wrapped node.
+    """
+
+    __slots__ = ("_node", "_task", "_state")
+
+    def __init__(self, node, task):
+        object.__setattr__(self, "_node", node)
+        object.__setattr__(self, "_task", task)
+        object.__setattr__(self, "_state", None)
+
+    @property
+    def state(self):
+        if self._state is None:
+            state = self._task.decode_state(self._node.state)
+            object.__setattr__(self, "_state", state)
+        return self._state
+
+    @property
+    def parent(self):
+        parent = self._node.parent
+        return None if parent is None else _DecodedNode(parent, self._task)
+
+    @property
+    def action(self):
+        action = self._node.action
+        return None if action is None else action.operator
+
+    def __getattr__(self, name):
+        return getattr(self._node, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._node, name, value)
+
+
+class CompiledStateAdapter(Heuristic):
+    """
+    Makes a heuristic that was created for a STRIPS task usable for searches
+    on a compiled version of the task, by translating the compiled states back
+    to fact names before evaluating them.
+    """
+
+    def __init__(self, heuristic, task):
+        """
+        @param heuristic The heuristic instance created for the STRIPS task
+        @param task The compiled task, providing decode_state
+        """
+        self.heuristic = heuristic
+        self.task = task
+
+    @property
+    def batch_size(self):
+        return self.heuristic.batch_size
+
+    def __call__(self, node):
+        return self.heuristic(_DecodedNode(node, self.task))
+
+    def calc_h_with_plan(self, node):
+        return self.heuristic.calc_h_with_plan(_DecodedNode(node, self.task))
+
+    def evaluate_batch(self, nodes):
+        return self.heuristic.evaluate_batch(
+            [_DecodedNode(node, self.task) for node in nodes]
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.heuristic, name)
+
+
+_worker_heuristic = None
+
+
+def _init_worker(heuristic_class, task):
+    global _worker_heuristic
+    _worker_heuristic = heuristic_class(task)
+
+
+def _evaluate_states(states):
+    # Imported here, because the search package imports the heuristics.
+    from ..search.searchspace import make_root_node
+
+    return [_worker_heuristic(make_root_node(state)) for state in states]
+
+
+class ProcessPoolAdapter(Heuristic):
+    """
+    Evaluates batches of nodes in worker processes that each hold their own
+    instance of a heuristic. Single nodes are evaluated by the wrapped
+    heuristic in this process.
+
+    Only the states of the nodes are sent to the workers, so the heuristic
+    value must only depend on the state (unlike for LandmarkHeuristic, which
+    uses the path to the node).
+    """
+
+    def __init__(self, heuristic, task, processes):
+        """
+        @param heuristic The heuristic instance for this process, the workers
+                         create their instances with its class and "task"
+        @param task The task the heuristic was created for
+        @param processes The number of worker processes
+        """
+        self.heuristic = heuristic
+        self.processes = processes
+        self.batch_size = 4 * processes
+        # ProcessPoolExecutor only accepts an initializer since Python 3.7.
+        self._pool = multiprocessing.Pool(
+            processes, _init_worker, (type(heuristic), task)
+        )
+
+    def __call__(self, node):
+        return self.heuristic(node)
+
+    def calc_h_with_plan(self, node):
+        return self.heuristic.calc_h_with_plan(node)
+
+    def evaluate_batch(self, nodes):
+        if len(nodes) < MIN_PARALLEL_BATCH_SIZE * self.processes:
+            return self.heuristic.evaluate_batch(nodes)
+        # One consecutive chunk of the states for each worker.
+        step = -(-len(nodes) // self.processes)
+        chunks = [
+            [node.state for node in nodes[start : start + step]]
+            for start in range(0, len(nodes), step)
+        ]
+        h_values = []
+        for values in self._pool.map(_evaluate_states, chunks):
+            h_values.extend(values)
+        return h_values
+
+    def close(self):
+        """Stop the worker processes."""
+        self._pool.close()
+        self._pool.join()
+
+    def __getattr__(self, name):
+        return getattr(self.heuristic, name)
@@ -0,0 +1,197 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A bounded cache of heuristic values that can be put in front of any
+heuristic.
+
+The cache maps states to heuristic values and holds at most "max_entries"
+states. Which state is dropped when it is full is decided by the eviction
+policy: LRUCache drops the least recently used state, ClockCache
+approximates this with one reference bit per state, which makes hits
+cheaper because the entries are never reordered.
+"""
+
+from collections import OrderedDict
+
+from .heuristic_base import Heuristic
+
+
+DEFAULT_MAX_ENTRIES = 2**20
+
+
+class LRUCache:
+    """Keeps the "max_entries" most recently used entries."""
+
+    def __init__(self, max_entries):
+        if max_entries < 1:
+            raise ValueError("A cache needs room for at least one entry")
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return the value stored for "key" or None."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Store "value" for "key", which must not be in the cache."""
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ClockCache:
+    """
+    Keeps at most "max_entries" entries in a ring of slots. A hit sets the
+    reference bit of the slot. To make room, the clock hand moves over the
+    slots, clears the bits that are set and replaces the first entry whose
+    bit is not set.
+    """
+
+    def __init__(self, max_entries):
+        if max_entries < 1:
+            raise ValueError("A cache needs room for at least one entry")
+        self.max_entries = max_entries
+        # Maps the keys to their slots.
+        self._slots = {}
+        self._keys = []
+        self._values = []
+        self._referenced = bytearray()
+        self._hand = 0
+
+    def get(self, key):
+        """Return the value stored for "key" or None."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        self._referenced[slot] = 1
+        return self._values[slot]
+
+    def put(self, key, value):
+        """Store "value" for "key", which must not be in the cache."""
+        if len(self._keys) < self.max_entries:
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._referenced.append(0)
+            return
+        referenced = self._referenced
+        hand = self._hand
+        while referenced[hand]:
+            referenced[hand] = 0
+            hand = (hand + 1) % self.max_entries
+        del self._slots[self._keys[hand]]
+        self._slots[key] = hand
+        self._keys[hand] = key
+        self._values[hand] = value
+        self._hand = (hand + 1) % self.max_entries
+
+    def __len__(self):
+        return len(self._keys)
+
+
+POLICIES = {"lru": LRUCache, "clock": ClockCache}
+
+
+class CachingAdapter(Heuristic):
+    """
+    Looks up the values of a heuristic in a bounded cache before computing
+    them, and counts the hits and misses.
+
+    The value of a node is also stored in its attribute "h", and a node whose
+    "h" is set is not evaluated again. Searches can set "h" themselves for
+    nodes whose value they already know. Such nodes do not touch the cache
+    and are counted in "stored" instead of "hits".
+
+    The states are the keys of the cache, so the heuristic value must only
+    depend on the state (unlike for LandmarkHeuristic, which uses the path to
+    the node).
+    """
+
+    def __init__(self, heuristic, max_entries=DEFAULT_MAX_ENTRIES, policy="lru"):
+        """
+        @param heuristic The heuristic whose values are cached
+        @param max_entries The maximal number of states in the cache
+        @param policy The eviction policy, one of the keys of POLICIES
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy {policy}")
+        self.heuristic = heuristic
+        self.cache = POLICIES[policy](max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    @property
+    def batch_size(self):
+        return self.heuristic.batch_size
+
+    def _lookup(self, node):
+        h = node.h
+        if h is not None:
+            self.stored += 1
+            return h
+        h = self.cache.get(node.state)
+        if h is None:
+            return None
+        node.h = h
+        self.hits += 1
+        return h
+
+    def __call__(self, node):
+        h = self._lookup(node)
+        if h is None:
+            self.misses += 1
+            h = node.h = self.heuristic(node)
+            self.cache.put(node.state, h)
+        return h
+
+    def evaluate_batch(self, nodes):
+        h_values = [self._lookup(node) for node in nodes]
+        # A state can occur several times in a batch, it is evaluated once.
+        missing = {}
+        num_missing_nodes = 0
+        for node, h in zip(nodes, h_values):
+            if h is None:
+                missing.setdefault(node.state, node)
+                num_missing_nodes += 1
+        if missing:
+            self.misses += len(missing)
+            # The repeated states are looked up in the cache after their
+            # first occurrence has been put there.
+            self.hits += num_missing_nodes - len(missing)
+            new_values = dict(
+                zip(missing, self.heuristic.evaluate_batch(list(missing.values())))
+            )
+            for state, h in new_values.items():
+                self.cache.put(state, h)
+            for i, node in enumerate(nodes):
+                if h_values[i] is None:
+                    h_values[i] = node.h = new_values[node.state]
+        return h_values
+
+    def calc_h_with_plan(self, node):
+        return self.heuristic.calc_h_with_plan(node)
+
+    def __getattr__(self, name):
+        return getattr(self.heuristic, name)
@@ -22,7 +22,22 @@ from ..task import Operator, Task
 from .heuristic_base import Heuristic
 
 
-""" This module contains the relaxation heuristics hAdd, hMax, hSA and hFF. """
+"""
+This module contains the relaxation heuristics hAdd, hMax, hSA and hFF.
+
+All four share one exploration of the relaxed planning graph. Facts and
+operators are numbered, and the per-evaluation values (distances, precondition
+counters, ...) are stored in lists indexed by these numbers. Each entry is
+stamped with the number of the evaluation that wrote it, so entries from
+earlier evaluations count as unset and nothing has to be reset between
+evaluations. Facts are expanded in the order of their distance from a queue
+of buckets, one FIFO list per distance.
+
+The distances are always computed from scratch. Repairing the distances of
+the parent state instead is not faster: the facts that differ between a
+state and its parent usually change the distances of most reachable facts,
+and the exploration stops as soon as the goals are reached.
+"""
 
 
 class RelaxedFact:
@@ -38,20 +53,9 @@ class RelaxedFact:
         name -- the name of the relaxed fact.
         precondition_of -- a list that contains all operators, this fact is a
                            precondition of.
-        expanded -- stores whether this fact has been expanded during the
-                    Dijkstra forward pass.
-        distance -- stores the heuristic distance value
-        sa_set -- stores a set of operators that have been applied to make this
-                  fact True (only for hSA).
-        cheapest_achiever -- stores the cheapest operator that was applied to
-                             reach this fact (only for hFF).
         """
         self.name = name
         self.precondition_of = []
-        self.expanded = False
-        self.sa_set = None
-        self.cheapest_achiever = None
-        self.distance = float("inf")
 
 
 class RelaxedOperator:
@@ -68,8 +72,6 @@ class RelaxedOperator:
         Member variables:
         name -- the name of the relaxed operator.
         preconditions -- the preconditions of this operator
-        counter -- alternative method to check whether all preconditions are
-                True
         add_effects -- the add effects of this operator
         cost -- the cost for applying this operator
         """
@@ -77,7 +79,6 @@ class RelaxedOperator:
         self.preconditions = preconditions
         self.add_effects = add_effects
         self.cost = 1
-        self.counter = len(preconditions)
 
 
 class _RelaxationHeuristic(Heuristic):
@@ -87,6 +88,11 @@ class _RelaxationHeuristic(Heuristic):
     implementation of the hAdd heuristic.
     """
 
+    # How the cost of an operator is computed from its preconditions: "add"
+    # (sum of their distances), "max" (maximum) or "sa" (size of the union of
+    # their sets of achieving operators).
+    combine = "add"
+
     def __init__(self, task):
         """Construct a instance of _RelaxationHeuristic.
 
@@ -98,22 +104,19 @@ class _RelaxationHeuristic(Heuristic):
         operators -- a list of operators
         init -- the set of facts that define the initial state
         goals -- the set of facts that define the goal state
-        tie_breaker -- a tie breaker needed for qeueing
-        eval -- a function that is used to evaluate the cost of applying an
-                operator
         """
         self.facts = dict()
         self.operators = []
         self.goals = task.goals
         self.init = task.initial_state
-        self.tie_breaker = 0
-        self.start_state = RelaxedFact("start")
         self.call_counter = 0
 
         # Create relaxed facts for all facts in the task description.
         for fact in task.facts:
             self.facts[fact] = RelaxedFact(fact)
 
+        # Operators without preconditions are applicable in every state.
+        self._start_operators = []
         for op in task.operators:
             # Relax operators and add them to operator list.
             ro = RelaxedOperator(op.name, op.preconditions, op.add_effects)
@@ -123,12 +126,40 @@ class _RelaxationHeuristic(Heuristic):
             for var in op.preconditions:
                 self.facts[var].precondition_of.append(ro)
 
-            # Handle operators that have no preconditions.
             if not op.preconditions:
-                # We add this operator to the precondtion_of list of the start
-                # state. This way it can be applied to the start state. This
-                # helps also when the initial state is empty.
-                self.start_state.precondition_of.append(ro)
+                self._start_operators.append(len(self.operators) - 1)
+
+        # Number the facts and operators. The lists keep the iteration order
+        # of the operators' fact sets, which decides between equally cheap
+        # achievers.
+        self._fact_ids = {fact: i for i, fact in enumerate(self.facts)}
+        op_ids = {id(ro): i for i, ro in enumerate(self.operators)}
+        self._precondition_of = [
+            [op_ids[id(ro)] for ro in fact.precondition_of]
+            for fact in self.facts.values()
+        ]
+        self._op_preconditions = [
+            [self._fact_ids[pre] for pre in ro.preconditions] for ro in self.operators
+        ]
+        self._op_add_effects = [
+            [self._fact_ids[add] for add in ro.add_effects] for ro in self.operators
+        ]
+        self._op_num_preconditions = [len(ro.preconditions) for ro in self.operators]
+        self._goal_ids = [self._fact_ids[fact] for fact in self.goals]
+
+        # Values of the current evaluation, valid where the corresponding
+        # stamp equals self._generation.
+        num_facts = len(self.facts)
+        num_ops = len(self.operators)
+        self._generation = 0
+        self._fact_stamp = [0] * num_facts
+        self._distance = [0] * num_facts
+        self._expanded = [0] * num_facts
+        self._sa_set = [None] * num_facts
+        self._achiever = [None] * num_facts
+        self._op_stamp = [0] * num_ops
+        self._counter = [0] * num_ops
+        self._op_cost = [0] * num_ops
 
     def __call__(self, node):
         """This function is called whenever the heuristic needs to be computed.
@@ -137,146 +168,130 @@ class _RelaxationHeuristic(Heuristic):
         node -- the current state
         """
         self.call_counter += 1
+        self._explore(node.state, True)
+        return self.calc_goal_h()
 
-        state = node.state
-        state = set(state)
-
-        # Reset distance and set to default values.
-        self.init_distance(state)
-
-        # Construct the priority queue.
-        heap = []
-        # Add a dedicated start state, to cope with operators without
-        # preconditions and empty initial state.
-        heapq.heappush(heap, (0, self.tie_breaker, self.start_state))
-        self.tie_breaker += 1
-
-        for fact in state:
-            # Its order is determined by the distance the facts.
-            # As a tie breaker we use a simple counter.
-            heapq.heappush(
-                heap, (self.facts[fact].distance, self.tie_breaker, self.facts[fact])
-            )
-            self.tie_breaker += 1
+    def _get_distance(self, fact_id):
+        if self._fact_stamp[fact_id] == self._generation:
+            return self._distance[fact_id]
+        return float("inf")
 
-        # Call the Dijkstra search that performs the forward pass.
-        self.dijkstra(heap)
+    def _explore(self, state, apply_start_operators):
+        """Compute the distances of the facts from "state".
 
-        # Extract the goal heuristic.
-        h_value = self.calc_goal_h()
-
-        return h_value
-
-    def init_distance(self, state):
-        """
-        This function resets all member variables that store information that
-        needs to be recomputed for each call of the heuristic.
-        """
-
-        def reset_fact(fact):
-            fact.expanded = False
-            fact.cheapest_achiever = None
-            if fact.name in state:
-                fact.distance = 0
-                fact.sa_set = set()
-            else:
-                fact.sa_set = None
-                fact.distance = float("inf")
+        This is a Dijkstra search on the relaxed planning graph. It stops as
+        soon as all goal facts have been expanded, since the values of
+        expanded facts do not change anymore.
 
-        # Reset start state
-        reset_fact(self.start_state)
-
-        # Reset facts.
-        for fact in self.facts.values():
-            reset_fact(fact)
-
-        # Reset operators.
-        for operator in self.operators:
-            operator.counter = len(operator.preconditions)
-
-    def get_cost(self, operator, pre):
-        """This function calculated the cost of applying an operator.
-
-        For hMax and hAdd this nothing has to be changed here, but to use
-        different functions for eval. hFF and hSA overwrite this function.
+        Keyword arguments:
+        state -- the current state
+        apply_start_operators -- whether operators without preconditions are
+                                 applied in "state"
         """
-
-        if operator.preconditions:
-            # If this operator has preconditions, we sum / maximize over the
-            # heuristic values of all preconditions.
-            cost = self.eval(
-                [self.facts[pre].distance for pre in operator.preconditions]
-            )
-        else:
-            # If there are no preconditions for this operator, its cost is 0.
-            cost = 0
-
-        # The return value is a tuple, because in hSA instead of None, the
-        # unioned set is returned.
-        return None, cost + operator.cost
+        self._generation += 1
+        generation = self._generation
+        fact_ids = self._fact_ids
+        fact_stamp = self._fact_stamp
+        distance = self._distance
+        expanded = self._expanded
+        sa_set = self._sa_set
+        achiever = self._achiever
+        precondition_of = self._precondition_of
+        op_preconditions = self._op_preconditions
+        op_add_effects = self._op_add_effects
+        op_num_preconditions = self._op_num_preconditions
+        op_stamp = self._op_stamp
+        counter = self._counter
+        op_cost = self._op_cost
+        combine = self.combine
+        names = self.operators
+
+        # Bucket queue: the FIFO list of facts for each distance and a heap
+        # of the distances that have a bucket.
+        buckets = {}
+        distances = []
+
+        def reach(op, cost, sa):
+            for fact_id in op_add_effects[op]:
+                if fact_stamp[fact_id] != generation or cost < distance[fact_id]:
+                    fact_stamp[fact_id] = generation
+                    distance[fact_id] = cost
+                    sa_set[fact_id] = sa
+                    achiever[fact_id] = op
+                    bucket = buckets.get(cost)
+                    if bucket is None:
+                        buckets[cost] = bucket = []
+                        heapq.heappush(distances, cost)
+                    bucket.append(fact_id)
+
+        start = []
+        for fact in set(state):
+            fact_id = fact_ids[fact]
+            fact_stamp[fact_id] = generation
+            distance[fact_id] = 0
+            sa_set[fact_id] = frozenset()
+            achiever[fact_id] = None
+            start.append(fact_id)
+        if apply_start_operators:
+            for op in self._start_operators:
+                if combine == "sa":
+                    reach(op, 1, frozenset([names[op].name]))
+                else:
+                    reach(op, 1, None)
+        # The facts of the state come after the facts reached by the operators
+        # without preconditions, because the latter are applied first.
+        buckets[0] = start
+        heapq.heappush(distances, 0)
+
+        goal_ids = set(self._goal_ids)
+        remaining_goals = len(goal_ids)
+        while distances:
+            dist = heapq.heappop(distances)
+            for fact_id in buckets.pop(dist):
+                if expanded[fact_id] == generation:
+                    continue
+                expanded[fact_id] = generation
+                for op in precondition_of[fact_id]:
+                    if op_stamp[op] != generation:
+                        op_stamp[op] = generation
+                        counter[op] = op_num_preconditions[op] - 1
+                        op_cost[op] = dist
+                    else:
+                        counter[op] -= 1
+                        if combine == "add":
+                            op_cost[op] += dist
+                    if counter[op]:
+                        continue
+                    # All preconditions are expanded, so their values are
+                    # final. For hMax, the last one has the largest distance.
+                    if combine == "sa":
+                        union = set().union(
+                            *[sa_set[pre] for pre in op_preconditions[op]]
+                        )
+                        cost = len(union) + 1
+                        union.add(names[op].name)
+                        reach(op, cost, union)
+                    elif combine == "max":
+                        reach(op, dist + 1, None)
+                    else:
+                        reach(op, op_cost[op] + 1, None)
+                if fact_id in goal_ids:
+                    remaining_goals -= 1
+                    if not remaining_goals:
+                        return
 
     def calc_goal_h(self):
         """This function calculates the heuristic value of the whole goal.
 
-        As get_cost, it is makes use of the eval function, and has to be
-        overwritten for hSA and hFF.
+        It makes use of the eval function, and has to be overwritten for
+        hSA and hFF.
         If the goal is empty: Return 0
         """
         if self.goals:
-            return self.eval([self.facts[fact].distance for fact in self.goals])
+            return self.eval([self._get_distance(fact) for fact in self._goal_ids])
         else:
             return 0
 
-    def finished(self, achieved_goals, queue):
-        """
-        This function is used as a stopping criterion for the Dijkstra search,
-        which differs for different heuristics.
-        """
-        return achieved_goals == self.goals or not queue
-
-    def dijkstra(self, queue):
-        """This function is an implementation of a Dijkstra search.
-
-        For efficiency reasons, it is used instead of an explicit graph
-        representation of the problem.
-        """
-        # Stores the achieved subgoals. Needed for abortion criterion of hMax.
-        achieved_goals = set()
-        while not self.finished(achieved_goals, queue):
-            # Get the fact with the lowest heuristic value.
-            (_dist, _tie, fact) = heapq.heappop(queue)
-            # If this node is part of the goal, we add to the goal set, which
-            # is used as an abort criterion.
-            if fact.name in self.goals:
-                achieved_goals.add(fact.name)
-            # Check whether we already expanded this fact.
-            if not fact.expanded:
-                # Iterate over all operators this fact is a precondition of.
-                for operator in fact.precondition_of:
-                    # Decrease the precondition counter.
-                    operator.counter -= 1
-                    # Check whether all preconditions are True and we can apply
-                    # this operator.
-                    if operator.counter <= 0:
-                        for n in operator.add_effects:
-                            neighbor = self.facts[n]
-                            # Calculate the cost of applying this operator.
-                            (unioned_sets, tmp_dist) = self.get_cost(operator, fact)
-                            if tmp_dist < neighbor.distance:
-                                # If the new costs are cheaper, then the old
-                                # costs, we change the neighbors heuristic
-                                # values.
-                                neighbor.distance = tmp_dist
-                                neighbor.sa_set = unioned_sets
-                                neighbor.cheapest_achiever = operator
-                                # And push it on the queue.
-                                heapq.heappush(
-                                    queue, (tmp_dist, self.tie_breaker, neighbor)
-                                )
-                                self.tie_breaker += 1
-                # Finally the fact is marked as expanded.
-                fact.expanded = True
-
     def get_call_counter(self):
         """This function returns the number of times the heuristic was called."""
         return self.call_counter
@@ -288,6 +303,14 @@ class hAddHeuristic(_RelaxationHeuristic):
     It derives from the _RelaxationHeuristic class.
     """
 
+    # The number of bits per state in the packed distances of evaluate_batch
+    # and the distance of unreached facts. Sums of up to 2**23 distances fit
+    # into a lane, and hAdd values of 2**40 or more count as infinite.
+    LANE_BITS = 64
+    UNREACHED = 2**40
+    # Smaller batches are evaluated node by node.
+    MIN_BATCH_SIZE = 8
+
     def __init__(self, task):
         """
         To make this class an implementation of hADD, apart from deriving from
@@ -297,6 +320,86 @@ class hAddHeuristic(_RelaxationHeuristic):
         self.eval = sum
         self.name = "hadd"
 
+    def evaluate_batch(self, nodes):
+        """Compute the hAdd values of all nodes in one fixpoint iteration.
+
+        The distances of a fact in all states are packed into one integer,
+        with the distance in the i-th state in the i-th lane of LANE_BITS
+        bits, so that adding and comparing the distances of all states takes
+        a few integer operations. Facts that are not reached have the
+        distance UNREACHED in their lane. The costs of an operator are the
+        sums of the distances of its preconditions plus one, and they lower
+        the distances of its add effects in the lanes where they are smaller.
+        Only operators with a precondition whose distances changed are
+        applied again, until no distance changes anymore.
+
+        For fewer than MIN_BATCH_SIZE nodes, the nodes are evaluated one by
+        one, which is faster.
+        """
+        if len(nodes) < self.MIN_BATCH_SIZE:
+            return super().evaluate_batch(nodes)
+        self.call_counter += len(nodes)
+        fact_ids = self._fact_ids
+        precondition_of = self._precondition_of
+        op_preconditions = self._op_preconditions
+        op_add_effects = self._op_add_effects
+        lane_bits = self.LANE_BITS
+        lane_mask = (1 << lane_bits) - 1
+        # The value 1 (the highest bit, all bits) in every lane.
+        ones = sum(1 << (lane_bits * i) for i in range(len(nodes)))
+        high_bits = ones << (lane_bits - 1)
+        all_bits = ones * lane_mask
+
+        # The facts of a state have the distance 0 in the state's lane.
+        state_lanes = {}
+        for i, node in enumerate(nodes):
+            lane = self.UNREACHED << (lane_bits * i)
+            for fact in node.state:
+                fact_id = fact_ids[fact]
+                state_lanes[fact_id] = state_lanes.get(fact_id, 0) + lane
+        distances = [self.UNREACHED * ones] * len(self.facts)
+        for fact_id, lanes in state_lanes.items():
+            distances[fact_id] -= lanes
+
+        changed = set(state_lanes)
+        ops = set(self._start_operators)
+        while True:
+            for fact_id in changed:
+                ops.update(precondition_of[fact_id])
+            if not ops:
+                break
+            changed = set()
+            for op in ops:
+                # The distances are at most UNREACHED, so the sums do not
+                # overflow into the next lane.
+                costs = ones
+                for fact_id in op_preconditions[op]:
+                    costs += distances[fact_id]
+                for fact_id in op_add_effects[op]:
+                    old = distances[fact_id]
+                    # The highest bit of a lane stays set in the difference
+                    # if the old distance is not smaller than the cost.
+                    not_smaller = (
+                        ((old | high_bits) - costs) >> (lane_bits - 1)
+                    ) & ones
+                    if not not_smaller:
+                        continue
+                    mask = not_smaller * lane_mask
+                    new = (costs & mask) | (old & (all_bits ^ mask))
+                    if new != old:
+                        distances[fact_id] = new
+                        changed.add(fact_id)
+            ops = set()
+
+        if not self.goals:
+            return [0] * len(nodes)
+        total = sum(distances[fact_id] for fact_id in self._goal_ids)
+        h_values = []
+        for i in range(len(nodes)):
+            h = (total >> (lane_bits * i)) & lane_mask
+            h_values.append(h if h < self.UNREACHED else float("inf"))
+        return h_values
+
 
 class hMaxHeuristic(_RelaxationHeuristic):
     """This class is an implementation of the hMax heuristic.
@@ -304,61 +407,91 @@ class hMaxHeuristic(_RelaxationHeuristic):
     It derives from the _RelaxationHeuristic class.
     """
 
+    combine = "max"
+
     def __init__(self, task):
         """
-        To make this class an implementation of hADD, apart from deriving from
-        _RelaxationHeuristic, we only need to set eval to max().
+        To make this class an implementation of hMax, apart from deriving from
+        _RelaxationHeuristic, we only need to set eval to max() and combine
+        the precondition distances with max.
         """
         super().__init__(task)
         self.eval = max
         self.name = "hmax"
 
+    def evaluate_batch(self, nodes):
+        """Compute the hMax values of all nodes in one layered exploration.
+
+        With unit costs, the hMax distance of a fact is the first layer of the
+        relaxed planning graph that contains it. The layers are built for all
+        states at once: the entry of a fact (operator) is an integer whose
+        bit i is set if the fact is reached (the operator is applicable) in
+        the current layer for the i-th state.
+        """
+        self.call_counter += len(nodes)
+        fact_ids = self._fact_ids
+        op_preconditions = self._op_preconditions
+        op_add_effects = self._op_add_effects
+        goal_ids = self._goal_ids
+        all_states = (1 << len(nodes)) - 1
+
+        reached = [0] * len(self.facts)
+        for i, node in enumerate(nodes):
+            bit = 1 << i
+            for fact in node.state:
+                reached[fact_ids[fact]] |= bit
+
+        h_values = [float("inf")] * len(nodes)
+        # States whose goals have not been reached yet.
+        pending = all_states
+        layer = 0
+        while True:
+            at_goal = pending
+            for fact_id in goal_ids:
+                at_goal &= reached[fact_id]
+            pending &= ~at_goal
+            while at_goal:
+                bit = at_goal & -at_goal
+                h_values[bit.bit_length() - 1] = layer
+                at_goal ^= bit
+            if not pending:
+                break
+
+            # Apply all applicable operators to build the next layer.
+            next_reached = list(reached)
+            for op, preconditions in enumerate(op_preconditions):
+                applicable = all_states
+                for fact_id in preconditions:
+                    applicable &= reached[fact_id]
+                    if not applicable:
+                        break
+                else:
+                    for fact_id in op_add_effects[op]:
+                        next_reached[fact_id] |= applicable
+            if next_reached == reached:
+                break
+            reached = next_reached
+            layer += 1
+        return h_values
+
 
 class hSAHeuristic(_RelaxationHeuristic):
     """This class is an implementation of the hSA heuristic.
 
     It derives from the _RelaxationHeuristic class.
     """
+
+    combine = "sa"
+
     def __init__(self, task):
         """
         To make this class an implementation of hSA, apart from deriving from
-        _RelaxationHeuristic, we need to overwrite get_cost and calc_goal_h.
+        _RelaxationHeuristic, we need to combine the sets of applied operators
+        and overwrite calc_goal_h.
         """
         super().__init__(task)
         self.name = "hsa"
 
-    def get_cost(self, operator, pre):
-        """
-        This function has to be overwritten, because the hSA heuristic not
-        only relies on a real valued distance, but also on a set of operators
-        that have been applied.
-        """
-        # Initialize.
-        cost = 0
-        if pre.sa_set is None:
-            unioned_sets = set()
-        else:
-            unioned_sets = pre.sa_set
-
-        if operator.preconditions:
-            # Collect the sa-sets from all preconditions in a list.
-            l = [
-                self.facts[pre].sa_set
-                for pre in operator.preconditions
-                if self.facts[pre].sa_set is not None
-            ]
-            if l:
-                # Union all these sets.
-                unioned_sets = set.union(*l)
-                # The heuristic value equals the cardinality of the unioned
-                # sets.
-                cost = len(unioned_sets)
-
-        # Add the current operator to the set and return it together with the
-        # heuristic value.
-        unioned_sets.add(operator.name)
-        return (unioned_sets, cost + operator.cost)
-
     def calc_goal_h(self):
         """
         This function has to be overwritten, because the hSA heuristic not only
@@ -368,17 +501,18 @@ class hSAHeuristic(_RelaxationHeuristic):
         Return 0 if the goal is empty
         """
         if self.goals:
+            generation = self._generation
             # Collect the sa-sets of all facts that are part of the goal.
             l = [
-                self.facts[fact].sa_set
-                for fact in self.goals
-                if self.facts[fact].sa_set is not None
+                self._sa_set[fact]
+                for fact in self._goal_ids
+                if self._fact_stamp[fact] == generation
             ]
             # Check whether all subgoals are fulfilled.
-            if len(l) == len(self.goals):
+            if len(l) == len(self._goal_ids):
                 # Union all these sets and take the length of the union as
                 # heuristic value.
-                h_value = len(set.union(*l))
+                h_value = len(set().union(*l))
             else:
                 # Ff not, return infinty.
                 h_value = float("inf")
@@ -407,30 +541,9 @@ class hFFHeuristic(_RelaxationHeuristic):
         Helper method to calculate hFF value together with a relaxed plan.
         """
         self.call_counter += 1
-        state = node.state
-        state = set(state)
-        # Reset distance and set to default values.
-        self.init_distance(state)
-        # reset dead end status
-
-        # Construct the priority queue.
-        heap = []
-        for fact in state:
-            # Its order is determined by the distance the facts.
-            # As a tiebreaker we use a simple counter.
-            heapq.heappush(
-                heap, (self.facts[fact].distance, self.tie_breaker, self.facts[fact])
-            )
-            self.tie_breaker += 1
-
-        # Call the Dijkstra search that performs the forward pass.
-        self.dijkstra(heap)
-        h_value = self.calc_goal_h(True)
-
-        if type(h_value) is tuple:
-            return h_value[0], h_value[1]
-        else:
-            return h_value
+        # Unlike __call__, operators without preconditions are not applied.
+        self._explore(node.state, False)
+        return self.calc_goal_h(True)
 
     def calc_goal_h(self, return_relaxed_plan=False):
         """
@@ -439,32 +552,27 @@ class hFFHeuristic(_RelaxationHeuristic):
         """
         relaxed_plan = set()
         # Check whether we achieved all subgoals.
-        hAdd_value = self.eval([self.facts[fact].distance for fact in self.goals])
+        hAdd_value = self.eval([self._get_distance(fact) for fact in self._goal_ids])
 
         if hAdd_value < float("inf"):
+            achiever = self._achiever
+            op_preconditions = self._op_preconditions
             # Initialize a queue and push all goal nodes.
-            q = []
-            closed_list = set()
-            for g in self.goals:
-                q.append(self.facts[g])
-                closed_list.add(g)
+            q = list(self._goal_ids)
+            closed_list = set(q)
 
             # Do backward pass.
             while q:
-                fact = q.pop()
-                # Check whether this fact has a cheapest achiever and that it
-                # is not already expanded
-                if (
-                    fact.cheapest_achiever is not None
-                    and not fact.cheapest_achiever in relaxed_plan
-                ):
+                op = achiever[q.pop()]
+                # Check whether this fact has a cheapest achiever.
+                if op is not None:
                     # Add all preconditions of the cheapest achiever to the
                     # queue.
-                    for pre in fact.cheapest_achiever.preconditions:
+                    for pre in op_preconditions[op]:
                         if pre not in closed_list:
-                            q.append(self.facts[pre])
+                            q.append(pre)
                             closed_list.add(pre)
-                    relaxed_plan.add(fact.cheapest_achiever.name)
+                    relaxed_plan.add(self.operators[op].name)
 
             # Extract FF value.
             if return_relaxed_plan:
@@ -0,0 +1,136 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+Detection of mutex groups in grounded STRIPS tasks.
+
+A mutex group is a set of facts of which at most one is true in every
+reachable state, e.g. all facts (at truck1 ?loc). The groups are found on
+the grounded task: candidates are built from the structure of the fact
+names and then proven to be invariant.
+
+A set of facts G is an invariant if at most one fact of G is true in the
+initial state and every operator that adds a fact g of G either requires g
+already or requires and deletes another fact of G. In the latter case this
+fact is the only true fact of G, so the number of true facts stays at most
+one.
+"""
+
+from collections import defaultdict
+from itertools import combinations
+import logging
+
+
+# Up to this many candidates with the same key, all their unions are tested.
+# For more candidates only unions of pairs are tested.
+MAX_CANDIDATES_PER_KEY = 6
+
+
+def _split_fact(fact):
+    """
+    @param fact A fact name like "(at truck1 loc1)"
+    @return The list of the predicate name and the arguments
+    """
+    return fact.strip("()").split()
+
+
+class _InvariantChecker:
+    def __init__(self, task):
+        self.initial_state = task.initial_state
+        # For each fact the operators that add it.
+        self.adders = defaultdict(list)
+        for op in task.operators:
+            for fact in op.add_effects:
+                self.adders[fact].append(op)
+
+    def is_invariant(self, group):
+        """
+        @param group A set of facts
+        @return True if at most one fact of "group" is true in every
+                reachable state
+        """
+        if len(self.initial_state & group) > 1:
+            return False
+        checked = set()
+        for fact in group:
+            for op in self.adders[fact]:
+                if op in checked:
+                    continue
+                checked.add(op)
+                added = op.add_effects & group
+                if len(added) > 1:
+                    return False
+                if added <= op.preconditions:
+                    continue
+                if not (op.preconditions & op.del_effects & group):
+                    return False
+        return True
+
+
+def _get_candidates(facts):
+    """
+    Group the facts with the same predicate that differ only in the argument
+    at one position, e.g. all facts (at truck1 ?loc) for position 1 of "at".
+    Every fact is also a candidate on its own, with all its arguments as key,
+    so that e.g. (holding a) can be combined with (on a ?x).
+
+    @return A dictionary that maps the remaining arguments of the candidates
+            to the list of candidates (sets of facts) with these arguments
+    """
+    candidates = defaultdict(set)
+    for fact in facts:
+        predicate, *args = _split_fact(fact)
+        candidates[(predicate, -1, tuple(args))].add(fact)
+        for position in range(len(args)):
+            key = tuple(args[:position] + args[position + 1 :])
+            candidates[(predicate, position, key)].add(fact)
+    by_key = defaultdict(list)
+    for (_, _, key), group in sorted(candidates.items()):
+        by_key[key].append(frozenset(group))
+    return by_key
+
+
+def find_mutex_groups(task):
+    """
+    Find mutex groups of the task.
+
+    Candidates with the same remaining arguments, like (at pkg1 ?loc) and
+    (in pkg1 ?truck), may only be invariant together, so for each such key
+    the largest union of candidates that is an invariant is used.
+
+    @param task A task.Task instance
+    @return A list of mutex groups, each given as a frozenset of at least two
+            facts. The groups may overlap.
+    """
+    checker = _InvariantChecker(task)
+    groups = []
+    for key, candidates in sorted(_get_candidates(task.facts).items()):
+        if len(candidates) <= MAX_CANDIDATES_PER_KEY:
+            sizes = range(len(candidates), 0, -1)
+        else:
+            sizes = (2, 1)
+        found = []
+        for size in sizes:
+            for subset in combinations(candidates, size):
+                group = frozenset().union(*subset)
+                if len(group) < 2 or any(group <= other for other in found):
+                    continue
+                if checker.is_invariant(group):
+                    found.append(group)
+        groups.extend(found)
+    logging.info(f"{len(groups)} mutex groups found")
+    return groups
@@ -10,6 +10,7 @@ class LeastFailedFirst():
         Initializes the LFF heuristic with the given planning task.
         The failure weight for each operator in the task is initially set to 0.
         """
+        self.planning_task = planning_task
         self.failure_weight = {op: 0 for op in planning_task.operators}
 
     def calculate_action_failure_weight(self, initial_h_val, operator, successor_h_val):
@@ -37,8 +38,9 @@ class LeastFailedFirst():
     def get_applicable_operators(self, state):
         """
         Returns a list of operators that are applicable in the given state.
+        The task's successor generator is used to find them.
         """
-        return [op for op in self.failure_weight if op.applicable(state)]
+        return self.planning_task.get_applicable_operators(state)
     
     def successor_generator(self, state):
         """
@@ -48,7 +50,7 @@ class LeastFailedFirst():
         applicable_operators = self.get_applicable_operators(state)
         sorted_operators = sorted(applicable_operators, key=lambda x: (self.failure_weight[x], x.name), reverse=True)
         for op in sorted_operators:
-            yield (op, op.apply(state))
+            yield (op, self.planning_task.apply(op, state))
 
     def successor_generator_no_ordering(self, state):
         """
@@ -57,4 +59,4 @@ class LeastFailedFirst():
         """
         applicable_operators = self.get_applicable_operators(state)
         for op in applicable_operators:
-            yield (op, op.apply(state))
\ No newline at end of file
+            yield (op, self.planning_task.apply(op, state))
\ No newline at end of file
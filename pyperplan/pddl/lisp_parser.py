@@ -17,42 +17,100 @@
 
 """Basic functions for parsing simple Lisp files."""
 
+import mmap
+import re
 
 from .errors import ParseError
 from .lisp_iterators import LispIterator
 
 
+_COMMENT_RE = re.compile(r";[^\n]*")
+# str.isascii() needs Python 3.7.
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+
 def parse_lisp_iterator(input):
     return LispIterator(parse_nested_list(input))
 
 
-def parse_nested_list(input_file):
-    tokens = _tokenize(input_file)
-    next_token = next(tokens)
-    if next_token != "(":
-        raise ParseError("Expected '(', got %s." % next_token)
-    result = list(_parse_list_aux(tokens))
-    for tok in tokens:  # Check that generator is exhausted.
-        raise ParseError("Unexpected token: %s." % tok)
-    return result
+def parse_lisp_file(filename):
+    """
+    Parse the file "filename", which is read through a memory map.
+
+    @return The LispIterator for the contents of the file
+    """
+    with open(filename, "rb") as file:
+        # Empty files can not be mapped.
+        if not file.seek(0, 2):
+            return parse_lisp_iterator(b"")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return parse_lisp_iterator(buffer)
 
 
-def _tokenize(input_file):
-    for line in input_file:
-        line = line.partition(";")[0]  # Strip comments.
-        line = line.replace("(", " ( ").replace(")", " ) ").replace("?", " ?")
-        for token in line.split():
-            yield token.lower()
+def parse_nested_list(input):
+    """
+    @param input The whole input as a string or as a bytes-like object with
+                 UTF-8 text, a file-like object from which such an input
+                 is read, or an iterable of lines
+    @return The nested list of the lower-case tokens of the input
+    """
+    return _build_nested_list(_tokenize(input))
 
 
-def _parse_list_aux(tokenstream):
-    # Invariant: leading "(" has already been swallowed.
-    for token in tokenstream:
-        if token == ")":  # List is closed.
-            return
-        elif token == "(":  # Recursive call.
-            yield list(_parse_list_aux(tokenstream))
+def _tokenize(input):
+    if hasattr(input, "read"):
+        input = input.read()
+    if isinstance(input, str):
+        text = input
+    elif isinstance(input, (bytes, bytearray, memoryview, mmap.mmap)):
+        text = str(input, "utf-8")
+        # Use the same line endings as files opened in text mode.
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+    else:
+        # A comment ends with the line, even if the line contains newlines.
+        text = "\n".join(line.partition(";")[0] for line in input)
+    if ";" in text:
+        text = _COMMENT_RE.sub("", text)
+    # Splitting the whole text at once is much faster than matching the
+    # tokens with a regular expression.
+    text = text.replace("(", " ( ").replace(")", " ) ").replace("?", " ?")
+    if not _NON_ASCII_RE.search(text):
+        return text.lower().split()
+    # Lowering non-ASCII text can depend on the neighbouring characters, so
+    # every token is lowered on its own.
+    return [token.lower() for token in text.split()]
+
+
+def _build_nested_list(tokens):
+    """
+    Build the nested list for "tokens" iteratively, so deeply nested input
+    does not hit the recursion limit.
+    """
+    if not tokens:
+        raise ParseError("Expected '(', got end of input.")
+    if tokens[0] != "(":
+        raise ParseError("Expected '(', got %s." % tokens[0])
+    result = []
+    # The lists that contain the list that is currently filled.
+    stack = []
+    current = result
+    tokens = iter(tokens)
+    next(tokens)
+    for token in tokens:
+        if token == "(":
+            stack.append(current)
+            current.append([])
+            current = current[-1]
+        elif token == ")":
+            if not stack:
+                break
+            current = stack.pop()
         else:
-            yield token
-    # If we exhausted the stream, the list is unbalanced.
-    raise ParseError("missing closing parenthesis")
+            current.append(token)
+    else:
+        # If we exhausted the stream, the list is unbalanced.
+        raise ParseError("missing closing parenthesis")
+    for tok in tokens:  # Check that all tokens have been used.
+        raise ParseError("Unexpected token: %s." % tok)
+    return result
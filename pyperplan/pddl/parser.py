@@ -17,7 +17,7 @@
 #
 
 from .errors import *
-from .lisp_parser import parse_lisp_iterator
+from .lisp_parser import parse_lisp_file, parse_lisp_iterator
 from .parser_common import *
 from .tree_visitor import TraversePDDLDomain, TraversePDDLProblem, Visitable
 
@@ -749,7 +749,20 @@ def parse_init_stmt(iter):
     """
     if not iter.try_match(":init"):
         raise ValueError("Error found invalid keyword when parsing InitStmt")
-    preds = parse_predicate_instance_list(iter)
+    # Initial states can contain many thousands of atoms, so they are read
+    # directly from the nested lists instead of through LispIterators.
+    preds = []
+    for atom in iter.contents[iter.position :]:
+        if not isinstance(atom, list):
+            raise ParseError("not a structure: %r" % atom)
+        if not atom or not isinstance(atom[0], str):
+            raise ValueError("Error domain predicate statement must contain a name!")
+        params = atom[1:]
+        for param in params:
+            if not isinstance(param, str):
+                raise ParseError("not a word: %r" % param)
+        preds.append(PredicateInstance(atom[0], params))
+    iter.position = len(iter.contents)
     return InitStmt(preds)
 
 
@@ -804,11 +817,24 @@ class Parser:
                           or directly from the input string
         """
         if read_from_file:
-            with open(self.domFile, encoding="utf-8") as file:
-                self.domInput = self._read_input(file)
+            self.domInput = parse_lisp_file(self.domFile)
         else:
             input = self.domInput.split("\n")
             self.domInput = self._read_input(input)
+        return self._parse_domain_ast()
+
+    def parse_domain_input(self, input):
+        """
+        Parse a domain that is given in memory instead of as a file.
+
+        Keyword arguments:
+        input -- the domain as a string, as a bytes-like object with UTF-8
+                 text or as a file-like object from which these are read
+        """
+        self.domInput = self._read_input(input)
+        return self._parse_domain_ast()
+
+    def _parse_domain_ast(self):
         domAST = parse_domain_def(self.domInput)
         # initialize the translation visitor
         visitor = TraversePDDLDomain()
@@ -827,11 +853,25 @@ class Parser:
                           or directly from the input string
         """
         if read_from_file:
-            with open(self.probFile, encoding="utf-8") as file:
-                self.probInput = self._read_input(file)
+            self.probInput = parse_lisp_file(self.probFile)
         else:
             input = self.probInput.split("\n")
             self.probInput = self._read_input(input)
+        return self._parse_problem_ast(dom)
+
+    def parse_problem_input(self, dom, input):
+        """
+        Parse a problem that is given in memory instead of as a file.
+
+        Keyword arguments:
+        dom -- the pddl.Domain of the problem
+        input -- the problem as a string, as a bytes-like object with UTF-8
+                 text or as a file-like object from which these are read
+        """
+        self.probInput = self._read_input(input)
+        return self._parse_problem_ast(dom)
+
+    def _parse_problem_ast(self, dom):
         probAST = parse_problem_def(self.probInput)
         # initialize the translation visitor
         visitor = TraversePDDLProblem(dom)
@@ -134,6 +134,8 @@ class Problem:
         objects: A dict name->type of objects that are used in the problem
         init: A list of predicates describing the initial state
         goal: A list of predicates describing the goal state
+        The parser stores the atoms of init and goal as fact strings in the
+        notation of grounded tasks, e.g. "(on a b)".
         """
         self.name = name
         self.domain = domain
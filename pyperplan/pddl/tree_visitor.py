@@ -38,6 +38,11 @@ class SemanticError(Exception):
         return repr(self.value)
 
 
+def _get_fact(name, args):
+    """Return the fact string of a ground atom, e.g. "(on a b)"."""
+    return "(%s)" % " ".join([name] + args)
+
+
 class Visitable:
     """
     The Visitable class is part of the Visitor Pattern. Every AST node created
@@ -557,13 +562,25 @@ class TraversePDDLProblem(PDDLVisitor):
         self._objects[node.name] = type_def
 
     def visit_init_stmt(self, node):
-        """Visits a PDDL-problem initial state statement."""
+        """Visits a PDDL-problem initial state statement.
+
+        Initial states can be large, so instead of pddl.Predicate instances
+        the ground atoms are stored as the fact strings of grounded tasks,
+        e.g. "(on a b)".
+        """
+        objects = self._objects
+        constants = self._domain.constants
         initList = list()
-        # Apply to all predicates in the statement.
         for p in node.predicates:
-            p.accept(self)
-            pred = self.get_in(p)
-            initList.append(pred)
+            for o in p.parameters:
+                # Check whether object was introduced in objects or domain
+                # constants.
+                if not (o in objects or o in constants):
+                    raise SemanticError(
+                        "Error: object " + o + " referenced in "
+                        "problem definition - but not defined"
+                    )
+            initList.append(_get_fact(p.name, p.parameters))
         self.set_in(node, initList)
 
     def add_goal(self, goal, c):
@@ -580,19 +597,14 @@ class TraversePDDLProblem(PDDLVisitor):
             )
         # Get predicate from the domain data structure.
         predDef = self._domain.predicates[c.key]
-        signature = list()
-        count = 0
         # Check whether the predicate uses the correct signature.
         if len(c.children) != len(predDef.signature):
             raise SemanticError(
                 "Error: wrong number of arguments for "
                 "predicate " + c.key + " in goal"
             )
-        for v in c.children:
-            signature.append((v.key, predDef.signature[count][1]))
-            count += 1
-        # Add the predicate to the goal.
-        goal.append(pddl.Predicate(c.key, signature))
+        # Add the fact to the goal.
+        goal.append(_get_fact(c.key, [v.key for v in c.children]))
 
     def visit_goal_stmt(self, node):
         """Visits a PDDL-problem goal state statement."""
@@ -23,8 +23,13 @@ import subprocess
 import sys
 import time
 
-from . import grounding, heuristics, search, tools
+from . import grounding, heuristics, search, task_cache, tools
+from .codegen import GeneratedTask
+from .heuristics.heuristic_base import CompiledStateAdapter, ProcessPoolAdapter
+from .heuristics.heuristic_cache import CachingAdapter
+from .heuristics.landmarks import LandmarkHeuristic
 from .pddl.parser import Parser
+from .task import BitsetTask, HashedTask, SASTask
 
 
 SEARCHES = {
@@ -43,6 +48,14 @@ SEARCHES = {
 }
 
 
+REPRESENTATIONS = {
+    "strips": None,
+    "bitset": BitsetTask,
+    "hashed": HashedTask,
+    "sas": SASTask,
+}
+
+
 NUMBER = re.compile(r"\d+")
 
 def get_heuristics():
@@ -111,34 +124,69 @@ def find_domain(problem):
     return domain
 
 
-def _parse(domain_file, problem_file):
-    # Parsing
-    parser = Parser(domain_file, problem_file)
-    logging.info(f"Parsing Domain {domain_file}")
+def _parse_domain(parser):
+    logging.info(f"Parsing Domain {parser.domFile}")
     domain = parser.parse_domain()
-    logging.info(f"Parsing Problem {problem_file}")
-    problem = parser.parse_problem(domain)
     logging.debug(domain)
     logging.info("{} Predicates parsed".format(len(domain.predicates)))
     logging.info("{} Actions parsed".format(len(domain.actions)))
-    logging.info("{} Objects parsed".format(len(problem.objects)))
     logging.info("{} Constants parsed".format(len(domain.constants)))
+    return domain
+
+
+def _parse_problem(parser, domain):
+    logging.info(f"Parsing Problem {parser.probFile}")
+    problem = parser.parse_problem(domain)
+    logging.info("{} Objects parsed".format(len(problem.objects)))
     return problem
 
 
+def _parse(domain_file, problem_file):
+    # Parsing
+    parser = Parser(domain_file, problem_file)
+    domain = _parse_domain(parser)
+    return _parse_problem(parser, domain)
+
+
 def _ground(
-    problem, remove_statics_from_initial_state=True, remove_irrelevant_operators=True
+    problem,
+    remove_statics_from_initial_state=True,
+    remove_irrelevant_operators=True,
+    strategy="product",
+    processes=1,
+    simplify=False,
+    session=None,
 ):
+    """
+    @param session A grounding.GroundingSession that grounds the problem
+                   with its own options instead of the given ones, or None
+    """
     logging.info(f"Grounding start: {problem.name}")
-    task = grounding.ground(
-        problem, remove_statics_from_initial_state, remove_irrelevant_operators
-    )
+    if session is None:
+        task = grounding.ground(
+            problem,
+            remove_statics_from_initial_state,
+            remove_irrelevant_operators,
+            strategy=strategy,
+            processes=processes,
+            simplify=simplify,
+        )
+    else:
+        task = session.ground(problem)
     logging.info(f"Grounding end: {problem.name}")
     logging.info("{} Variables created".format(len(task.facts)))
     logging.info("{} Operators created".format(len(task.operators)))
     return task
 
 
+def _compile(task, representation):
+    compiler = REPRESENTATIONS[representation]
+    if compiler is None:
+        return task
+    logging.info(f"Compiling task to {representation} representation")
+    return compiler(task)
+
+
 def _search(task, search, heuristic, use_preferred_ops=False):
     logging.info(f"Search start: {task.name}")
     if heuristic:
@@ -159,8 +207,54 @@ def write_solution(solution, filename):
             print(op.name, file=file)
 
 
+def ground_pddl(
+    domain_input,
+    problem_input,
+    grounding_strategy="product",
+    grounding_processes=1,
+    simplify_task=False,
+):
+    """
+    Parses a domain and a problem that are given in memory and grounds them.
+
+    @param domain_input  The domain as a string, as a bytes-like object with
+                         UTF-8 text or as a file-like object from which these
+                         are read
+    @param problem_input The problem in one of the forms of domain_input
+    The other parameters are those of search_plan().
+    @return The grounded task.Task
+    """
+    parser = Parser(None)
+    logging.info("Parsing Domain")
+    domain = parser.parse_domain_input(domain_input)
+    logging.info("Parsing Problem")
+    problem = parser.parse_problem_input(domain, problem_input)
+    return _ground(
+        problem,
+        strategy=grounding_strategy,
+        processes=grounding_processes,
+        simplify=simplify_task,
+    )
+
+
 def search_plan(
-    domain_file, problem_file, search, heuristic_class, use_preferred_ops=False
+    domain_file,
+    problem_file,
+    search,
+    heuristic_class,
+    use_preferred_ops=False,
+    representation="strips",
+    successor_generator=True,
+    incremental_successors=False,
+    codegen=False,
+    heuristic_processes=1,
+    heuristic_cache_size=0,
+    heuristic_cache_policy="lru",
+    grounding_strategy="product",
+    grounding_processes=1,
+    simplify_task=False,
+    cache_dir=None,
+    cache_size=task_cache.DEFAULT_MAX_SIZE,
 ):
     """
     Parses the given input files to a specific planner task and then tries to
@@ -173,18 +267,254 @@ def search_plan(
                             search space
     @param heuristic_class  A class implementing the heuristic_base.Heuristic
                             interface
+    @param representation   The state representation used during search, one
+                            of the keys of REPRESENTATIONS
+    @param successor_generator  Whether to find applicable operators with the
+                                successor generator instead of testing all
+                                operators
+    @param incremental_successors  Whether to derive the applicable operators
+                                   of a state from those of its parent, only
+                                   for the strips representation
+    @param codegen  Whether to search with generated code for the successor
+                    and goal functions of the task, see codegen.GeneratedTask
+    @param heuristic_processes  The number of worker processes that evaluate
+                                batches of nodes with the heuristic, see
+                                heuristic_base.ProcessPoolAdapter
+    @param heuristic_cache_size  The maximal number of states whose heuristic
+                                 values are cached, 0 disables the cache
+    @param heuristic_cache_policy  The eviction policy of the heuristic cache,
+                                   one of the keys of heuristic_cache.POLICIES
+    @param grounding_strategy  The strategy for instantiating the actions, one
+                               of the keys of grounding.STRATEGIES
+    @param grounding_processes  The number of processes used for grounding
+    @param simplify_task  Whether to remove unreachable, irrelevant and
+                          duplicate operators after grounding
+    @param cache_dir  A directory in which grounded tasks are cached between
+                      runs, None disables the cache
+    @param cache_size  The maximal size of the cache directory in bytes
     @return A list of actions that solve the problem
     """
-    problem = _parse(domain_file, problem_file)
-    task = _ground(problem)
+    loader = _TaskLoader(
+        domain_file,
+        grounding_strategy,
+        grounding_processes,
+        simplify_task,
+        cache_dir,
+        cache_size,
+        reuse=False,
+    )
+    task = loader.get_task(problem_file)
+    return solve_task(
+        task,
+        search,
+        heuristic_class,
+        use_preferred_ops,
+        representation,
+        successor_generator,
+        incremental_successors,
+        codegen,
+        heuristic_processes,
+        heuristic_cache_size,
+        heuristic_cache_policy,
+    )
+
+
+def search_plans(
+    domain_file,
+    problem_files,
+    search,
+    heuristic_class,
+    use_preferred_ops=False,
+    representation="strips",
+    successor_generator=True,
+    incremental_successors=False,
+    codegen=False,
+    heuristic_processes=1,
+    heuristic_cache_size=0,
+    heuristic_cache_policy="lru",
+    grounding_strategy="product",
+    grounding_processes=1,
+    simplify_task=False,
+    cache_dir=None,
+    cache_size=task_cache.DEFAULT_MAX_SIZE,
+):
+    """
+    Solves several problems of one domain back to back. The domain is parsed
+    only once and the problems are grounded with one
+    grounding.GroundingSession, which analyses the domain only once and
+    reuses the grounded operators for problems with the same objects and
+    static facts as an earlier one.
+
+    @param problem_files    The paths to problem files in the domain given by
+                            domain_file
+    The other parameters are those of search_plan().
+    @return An iterator over the solutions of the problems in the order of
+            problem_files, None for the problems without a solution
+    """
+    loader = _TaskLoader(
+        domain_file,
+        grounding_strategy,
+        grounding_processes,
+        simplify_task,
+        cache_dir,
+        cache_size,
+        reuse=True,
+    )
+    for problem_file in problem_files:
+        task = loader.get_task(problem_file)
+        yield solve_task(
+            task,
+            search,
+            heuristic_class,
+            use_preferred_ops,
+            representation,
+            successor_generator,
+            incremental_successors,
+            codegen,
+            heuristic_processes,
+            heuristic_cache_size,
+            heuristic_cache_policy,
+        )
+
+
+class _TaskLoader:
+    """
+    Creates the grounded tasks for the problems of one domain, either by
+    loading them from the task cache or by parsing and grounding them.
+    """
+
+    def __init__(
+        self,
+        domain_file,
+        grounding_strategy,
+        grounding_processes,
+        simplify_task,
+        cache_dir,
+        cache_size,
+        reuse,
+    ):
+        """
+        @param reuse  Whether the domain and the grounding session are kept
+                      for several problems
+        """
+        self.domain_file = domain_file
+        self.grounding_strategy = grounding_strategy
+        self.grounding_processes = grounding_processes
+        self.simplify_task = simplify_task
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = task_cache.TaskCache(cache_dir, cache_size)
+        self.parser = Parser(domain_file)
+        self.domain = None
+        self.grounding_session = None
+        if reuse:
+            # Problems with the same objects and static facts as an earlier
+            # problem of the batch reuse its grounded operators.
+            self.grounding_session = grounding.GroundingSession(
+                strategy=grounding_strategy,
+                processes=grounding_processes,
+                simplify=simplify_task,
+            )
+
+    def get_task(self, problem_file):
+        task = None
+        if self.cache is not None:
+            # The number of processes does not change the grounded task.
+            cache_key = task_cache.get_cache_key(
+                self.domain_file,
+                problem_file,
+                strategy=self.grounding_strategy,
+                simplify=self.simplify_task,
+            )
+            task = self.cache.load(cache_key)
+        if task is None:
+            if self.domain is None:
+                self.domain = _parse_domain(self.parser)
+            self.parser.set_prob_file(problem_file)
+            problem = _parse_problem(self.parser, self.domain)
+            task = _ground(
+                problem,
+                strategy=self.grounding_strategy,
+                processes=self.grounding_processes,
+                simplify=self.simplify_task,
+                session=self.grounding_session,
+            )
+            if self.cache is not None:
+                self.cache.store(cache_key, task)
+        return task
+
+
+def solve_task(
+    task,
+    search,
+    heuristic_class,
+    use_preferred_ops=False,
+    representation="strips",
+    successor_generator=True,
+    incremental_successors=False,
+    codegen=False,
+    heuristic_processes=1,
+    heuristic_cache_size=0,
+    heuristic_cache_policy="lru",
+):
+    """
+    Tries to find a solution for a grounded task.
+
+    @param task  A task.Task instance, e.g. from ground_pddl()
+    The other parameters are those of search_plan().
+    @return A list of actions that solve the task or None
+    """
+    if (
+        heuristic_class is not None
+        and issubclass(heuristic_class, LandmarkHeuristic)
+        and (heuristic_processes > 1 or heuristic_cache_size > 0)
+    ):
+        # Its values depend on the path to a node, not only on the state.
+        raise ValueError(
+            "the landmark heuristic cannot be cached or evaluated in several "
+            "processes"
+        )
+    search_task = _compile(task, representation)
+    search_task.use_successor_generator = successor_generator
+    if incremental_successors:
+        if search_task is not task:
+            raise ValueError("incremental successors require the strips representation")
+        search_task.use_incremental_successors = True
+    if codegen:
+        search_task = GeneratedTask(search_task)
     heuristic = None
     if not heuristic_class is None:
         heuristic = heuristic_class(task)
+    preferred_ops = use_preferred_ops and isinstance(
+        heuristic, heuristics.hFFHeuristic
+    )
+    pool = None
+    if heuristic is not None and heuristic_processes > 1:
+        pool = heuristic = ProcessPoolAdapter(heuristic, task, heuristic_processes)
+    if heuristic is not None and hasattr(search_task, "decode_state"):
+        # Heuristics work on fact names, so they get the decoded states.
+        heuristic = CompiledStateAdapter(heuristic, search_task)
+    cache = None
+    if heuristic is not None and heuristic_cache_size > 0:
+        # The cache is keyed by the states of the search, which are cheaper
+        # to hash than the decoded ones.
+        cache = heuristic = CachingAdapter(
+            heuristic, heuristic_cache_size, heuristic_cache_policy
+        )
     search_start_time = time.process_time()
-    if use_preferred_ops and isinstance(heuristic, heuristics.hFFHeuristic):
-        solution = _search(task, search, heuristic, use_preferred_ops=True)
-    else:
-        solution = _search(task, search, heuristic)
+    try:
+        if preferred_ops:
+            solution = _search(search_task, search, heuristic, use_preferred_ops=True)
+        else:
+            solution = _search(search_task, search, heuristic)
+    finally:
+        if pool is not None:
+            pool.close()
+    if cache is not None:
+        logging.info(
+            f"Heuristic cache: {cache.hits} hits, {cache.misses} misses, "
+            f"{cache.stored} stored values, {len(cache.cache)} entries"
+        )
     logging.info("Search time: {:.2}".format(time.process_time() - search_start_time))
     return solution
 
@@ -20,7 +20,7 @@ from .breadth_first_search import breadth_first_search
 from .enforced_hillclimbing_search import enforced_hillclimbing_search
 from .iterative_deepening_search import iterative_deepening_search
 from .sat import sat_solve
-from .searchspace import make_child_node, make_root_node
+from .searchspace import SearchSpace, make_child_node, make_root_node
 
 # Tom Hurford
 from .enforced_hill_climbing import enforced_hill_climbing
@@ -19,10 +19,12 @@
 Implements the A* (a-star) and weighted A* search algorithm.
 """
 
+from array import array
 import heapq
 import logging
 
 from . import searchspace
+from .state_registry import StateRegistry
 
 
 def ordered_node_astar(node, h, node_tiebreaker):
@@ -127,8 +129,14 @@ def astar_search(
                            meanings.
     """
     open = []
-    state_cost = {task.initial_state: 0}
+    # The lowest known cost of each state, indexed by the registry's state ids.
+    registry = StateRegistry(task)
+    registry.insert_state(task.initial_state)
+    state_cost = array("q", [0])
     node_tiebreaker = 0
+    # The state id of every open entry, indexed by its tiebreaker, so popped
+    # states need not be looked up in the registry again.
+    entry_state_ids = array("q", [0])
 
     root = searchspace.make_root_node(task.initial_state)
     init_h = heuristic(root)
@@ -140,7 +148,7 @@ def astar_search(
     expansions = 0
 
     while open:
-        (f, h, _tie, pop_node) = heapq.heappop(open)
+        (f, h, tie, pop_node) = heapq.heappop(open)
         if h < besth:
             besth = h
             logging.debug("Found new best h: %d after %d expansions" % (besth, counter))
@@ -149,7 +157,7 @@ def astar_search(
         # Only expand the node if its associated cost (g value) is the lowest
         # cost known for this state. Otherwise we already found a cheaper
         # path after creating this node and hence can disregard it.
-        if state_cost[pop_state] == pop_node.g:
+        if state_cost[entry_state_ids[tie]] == pop_node.g:
             expansions += 1
 
             if task.goal_reached(pop_state):
@@ -163,6 +171,7 @@ def astar_search(
                 )
                 logging.debug("relaxed plan %s " % rplan)
 
+            succ_nodes = []
             for op, succ_state in task.get_successor_states(pop_state):
                 if use_relaxed_plan:
                     if rplan and not op.name in rplan:
@@ -176,18 +185,25 @@ def astar_search(
                     else:
                         logging.debug("keeping operator %s" % op.name)
 
-                succ_node = searchspace.make_child_node(pop_node, op, succ_state)
-                h = heuristic(succ_node)
+                succ_nodes.append(searchspace.make_child_node(pop_node, op, succ_state))
+
+            # All successors are evaluated at once, so heuristics can share
+            # the work between them.
+            for succ_node, h in zip(succ_nodes, heuristic.evaluate_batch(succ_nodes)):
+                succ_state = succ_node.state
                 if h == float("inf"):
                     # don't bother with states that can't reach the goal anyway
                     continue
-                old_succ_g = state_cost.get(succ_state, float("inf"))
-                if succ_node.g < old_succ_g:
+                succ_id, is_new = registry.insert_state(succ_state)
+                if is_new:
+                    state_cost.append(succ_node.g)
+                if is_new or succ_node.g < state_cost[succ_id]:
                     # We either never saw succ_state before, or we found a
                     # cheaper path to succ_state than previously.
                     node_tiebreaker += 1
+                    entry_state_ids.append(succ_id)
                     heapq.heappush(open, make_open_entry(succ_node, h, node_tiebreaker))
-                    state_cost[succ_state] = succ_node.g
+                    state_cost[succ_id] = succ_node.g
 
         counter += 1
     logging.info("No operators left. Task unsolvable.")
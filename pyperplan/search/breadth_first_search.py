@@ -36,11 +36,12 @@ def breadth_first_search(planning_task):
     """
     # counts the number of loops (only for printing)
     iteration = 0
-    # fifo-queue storing the nodes which are next to explore
+    # compact store of all generated nodes, its state registry is used for
+    # duplicate detection
+    space = searchspace.SearchSpace(planning_task)
+    # fifo-queue storing the indices of the nodes which are next to explore
     queue = deque()
-    queue.append(searchspace.make_root_node(planning_task.initial_state))
-    # set storing the explored nodes, used for duplicate detection
-    closed = {planning_task.initial_state}
+    queue.append(space.make_root_node(planning_task.initial_state))
     while queue:
         iteration += 1
         logging.debug(
@@ -49,19 +50,17 @@ def breadth_first_search(planning_task):
         )
         # get the next node to explore
         node = queue.popleft()
+        state = space.get_state(node)
         # exploring the node or if it is a goal node extracting the plan
-        if planning_task.goal_reached(node.state):
+        if planning_task.goal_reached(state):
             logging.info("Goal reached. Start extraction of solution.")
             logging.info("%d Nodes expanded" % iteration)
-            return node.extract_solution()
-        for operator, successor_state in planning_task.get_successor_states(node.state):
-            # duplicate detection
-            if successor_state not in closed:
-                queue.append(
-                    searchspace.make_child_node(node, operator, successor_state)
-                )
-                # remember the successor state
-                closed.add(successor_state)
+            return space.extract_solution(node)
+        for operator, successor_state in planning_task.get_successor_states(state):
+            # duplicate detection, the state is registered with the new node
+            successor = space.make_new_child_node(node, operator, successor_state)
+            if successor is not None:
+                queue.append(successor)
     logging.info("No operators left. Task unsolvable.")
     logging.info("%d Nodes expanded" % iteration)
     return None
@@ -27,19 +27,21 @@ def enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=False):
         while queue:
             node = queue.popleft()
 
-            # Get the successors of the current node
-            successors = planning_task.get_successor_states(node.state)
-
-            # Loop through the successors
-            for operator, successor in successors:
-                # Increment the expansion count
+            # Lazily generate the successor nodes of the current node
+            successor_nodes = (
+                searchspace.make_child_node(node, operator, successor)
+                for operator, successor in planning_task.iter_successor_states(
+                    node.state
+                )
+            )
+
+            # Loop through the successors, evaluated in batches of the
+            # heuristic's batch size
+            for successor_node, successor_h_value in searchspace.evaluate_nodes(
+                heuristic, successor_nodes
+            ):
+                # Increment the expansion count and heuristic calls
                 expansion_count += 1
-
-                # Create a new node for the successor
-                successor_node = searchspace.make_child_node(node, operator, successor)
-
-                # Calculate the heuristic value of the successor node
-                successor_h_value = heuristic(successor_node)
                 heuristic_calls += 1
 
                 # If the heuristic value is infinity, skip the successor
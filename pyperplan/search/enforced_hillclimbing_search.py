@@ -24,6 +24,7 @@ import logging
 
 from . import searchspace
 from . import breadth_first_search
+from .state_registry import StateRegistry
 
 
 def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=False):
@@ -44,16 +45,17 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
     queue.append(initial_node)
     best_heuristic_value = heuristic(initial_node)
     logging.info("Initial h value: %f" % best_heuristic_value)
-    # set storing the explored nodes, used for duplicate detection
+    # registry of all visited states, and the ids of the explored states,
+    # used for duplicate detection
+    visited = StateRegistry(planning_task)
     closed = set()
-    visited = set()
     while queue:
         iteration += 1
         # get the next node to explore
         node = queue.popleft()
         # remember the successor state
-        closed.add(node.state)
-        visited.add(node.state)
+        state_id, _ = visited.insert_state(node.state)
+        closed.add(state_id)
         # exploring the node or if it is a goal node extracting the plan
         if planning_task.goal_reached(node.state):
             logging.info("Goal reached. Start extraction of solution.")
@@ -66,48 +68,53 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
             (rh, rplan) = heuristic.calc_h_with_plan(node)
             logging.debug("relaxed plan %s " % rplan)
 
-        for operator, successor_state in planning_task.get_successor_states(node.state):
+        def successor_nodes():
+            for operator, successor_state in planning_task.iter_successor_states(
+                node.state
+            ):
 
-            # for the preferred operator version ignore all non preferred
-            # operators
-            if use_preferred_ops:
-                if rplan and not operator.name in rplan:
-                    # ignore this operator if we use the relaxed plan criterion
-                    logging.debug(
-                        "removing operator %s << not a preferred "
-                        "operator" % operator.name
-                    )
-                    continue
-                else:
-                    logging.debug("keeping operator %s" % operator.name)
+                # for the preferred operator version ignore all non preferred
+                # operators
+                if use_preferred_ops:
+                    if rplan and not operator.name in rplan:
+                        # ignore this operator if we use the relaxed plan
+                        # criterion
+                        logging.debug(
+                            "removing operator %s << not a preferred "
+                            "operator" % operator.name
+                        )
+                        continue
+                    else:
+                        logging.debug("keeping operator %s" % operator.name)
 
-            # duplicate detection
-            if successor_state not in closed:
-                successor_node = searchspace.make_child_node(
-                    node, operator, successor_state
+                # duplicate detection
+                if visited.get_state_id(successor_state) not in closed:
+                    yield searchspace.make_child_node(node, operator, successor_state)
+
+        for successor_node, heuristic_value in searchspace.evaluate_nodes(
+            heuristic, successor_nodes()
+        ):
+            if heuristic_value == float("inf"):
+                continue
+            elif heuristic_value < best_heuristic_value:
+                # Just take the first successor node that has a lower
+                # heuristic value than the current best_heuristic_value
+                # and ignore the other successor nodes.
+                logging.debug(
+                    "Found new best h: %f after %d expansions"
+                    % (heuristic_value, iteration)
+                )
+                queue.clear()
+                closed.clear()
+                best_heuristic_value = heuristic_value
+                queue.append(successor_node)
+                break
+            else:
+                # queue.append(successor_node)
+                logging.debug(
+                    "Queue length: %d, h: %f" % (
+                        len(queue), heuristic_value)
                 )
-                heuristic_value = heuristic(successor_node)
-                if heuristic_value == float("inf"):
-                    continue
-                elif heuristic_value < best_heuristic_value:
-                    # Just take the first successor node that has a lower
-                    # heuristic value than the current best_heuristic_value
-                    # and ignore the other successor nodes.
-                    logging.debug(
-                        "Found new best h: %f after %d expansions"
-                        % (heuristic_value, iteration)
-                    )
-                    queue.clear()
-                    closed.clear()
-                    best_heuristic_value = heuristic_value
-                    queue.append(successor_node)
-                    break
-                else:
-                    # queue.append(successor_node)
-                    logging.debug(
-                        "Queue length: %d, h: %f" % (
-                            len(queue), heuristic_value)
-                    )
     logging.info("Enforced hill climbing failed")
     logging.info("%d Nodes expanded" % len(visited))
     logging.info("Starting BFS")
@@ -7,11 +7,23 @@ import logging
 
 from . import searchspace
 from .benchmarking import Benchmark
+from .state_registry import StateRegistry
 
 def episodic_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=False):
     # Initialize the benchmark logger
     logger = Benchmark(planning_task.name, heuristic.name, "episodic_ehc", "BFS", "None")
 
+    # Lazily generate the successor nodes of a node that are not dead ends
+    def successor_nodes(node):
+        for operator, successor in planning_task.iter_successor_states(node.state):
+            # If the successor is in the dead-end cache, skip it
+            if registry.get_state_id(successor) in dead_end_cache:
+                logging.debug("PRUNED: Successor in dead-end cache")
+                continue
+
+            # Create a new node for the successor
+            yield searchspace.make_child_node(node, operator, successor)
+
     # Define the breadth-first search (BFS) function
     def bfs(start_node):
         # Initialize the best heuristic value and the open list
@@ -33,26 +45,16 @@ def episodic_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=
             node = open_list.popleft()
 
             # If the node is in the dead-end cache, skip it
-            if node.state in dead_end_cache:
+            if registry.get_state_id(node.state) in dead_end_cache:
                 logging.debug("PRUNED: Node in dead-end cache")
                 continue
 
-            # Get the successors of the current node
-            successors = planning_task.get_successor_states(node.state)
-
-            # Loop through the successors
-            for operator, successor in successors:
-                # If the successor is in the dead-end cache, skip it
-                if successor in dead_end_cache:
-                    logging.debug("PRUNED: Successor in dead-end cache")
-                    continue
-
-                # Create a new node for the successor
-                successor_node = searchspace.make_child_node(node, operator, successor)
+            # Loop through the successors, evaluated in batches of the
+            # heuristic's batch size
+            for successor_node, successor_h_value in searchspace.evaluate_nodes(
+                heuristic, successor_nodes(node)
+            ):
                 expansion_count += 1
-
-                # Calculate the heuristic value of the successor node
-                successor_h_value = heuristic(successor_node)
                 heuristic_calls += 1
 
                 # If the heuristic value is infinity, skip the successor
@@ -74,14 +76,16 @@ def episodic_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=
     # Start the timer
     logger.start_timer()
 
-    # Initialize the dead-end cache and the initial node
+    # Initialize the dead-end cache of state ids and the initial node
+    registry = StateRegistry(planning_task)
+    initial_id, _ = registry.insert_state(planning_task.initial_state)
     dead_end_cache = set()
     initial_node = searchspace.make_root_node(planning_task.initial_state)
     current_node = initial_node
     restart_count = 0
 
     # Start the main loop
-    while initial_node.state not in dead_end_cache:
+    while initial_id not in dead_end_cache:
         # Perform BFS from the current node
         next_node = bfs(current_node)
 
@@ -93,7 +97,7 @@ def episodic_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=
         
         # If no next node was found, add the current node to the dead-end cache and restart the search
         if next_node is None:
-            dead_end_cache.add(current_node.state)
+            dead_end_cache.add(registry.insert_state(current_node.state)[0])
             logging.info("Dead end found, restarting search")
             logger.restart()
             restart_count += 1
@@ -17,8 +17,10 @@ def guided_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=Fa
 
     # Define the breadth-first search (BFS) function
     def bfs(start_node):
-        # Initialize the best heuristic value and the open list
-        best_h_val = heuristic(start_node)
+        # Initialize the best heuristic value and the open list. The
+        # heuristic values of the nodes are stored in the nodes, so the
+        # values of dequeued nodes are not computed again
+        best_h_val = start_node.h = heuristic(start_node)
         queue = deque([start_node])
 
         # Initialize counters for expansions, heuristic calls, and ordering calls
@@ -36,9 +38,8 @@ def guided_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=Fa
             # Get the next node from the open list
             node = queue.popleft()
 
-            # Calculate the heuristic value of the current node
-            node_h_value = heuristic(node)
-            heuristic_calls += 1
+            # Get the heuristic value of the current node
+            node_h_value = node.h
 
             # Loop through the successors of the current node
             for operator, successor in ordering.successor_generator(node.state):
@@ -49,7 +50,7 @@ def guided_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=Fa
                 successor_node = searchspace.make_child_node(node, operator, successor)
 
                 # Calculate the heuristic value of the successor node
-                successor_h_value = heuristic(successor_node)
+                successor_h_value = successor_node.h = heuristic(successor_node)
                 heuristic_calls += 1
 
                 # If the heuristic value is infinity, skip the successor
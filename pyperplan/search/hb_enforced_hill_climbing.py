@@ -26,7 +26,7 @@ def hb_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops=False)
     while queue:
         _, current_node = heapq.heappop(queue)
 
-        successors = planning_task.get_successor_states(current_node.state)
+        successors = planning_task.iter_successor_states(current_node.state)
 
         for operator, successor in successors:
             successor_node = searchspace.make_child_node(current_node, operator, successor)
@@ -91,8 +91,8 @@ def hbehc(planning_task, heuristic, use_preferred_ops=False):
                 logger.log_lookahead(True, expansion_count, heuristic_count, 0, "Goal found in lookahead")
                 return node
             
-            # Generate successors
-            successors = planning_task.get_successor_states(node.state)
+            # Lazily generate successors
+            successors = planning_task.iter_successor_states(node.state)
             for operator, successor in successors:
                 successor_node = searchspace.make_child_node(node, operator, successor)
                 expansion_count += 1
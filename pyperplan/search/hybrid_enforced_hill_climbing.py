@@ -7,8 +7,10 @@ import logging
 
 from pyperplan.ordering.least_failed_first import LeastFailedFirst
 
+from ..heuristics.heuristic_cache import CachingAdapter
 from . import searchspace
 from .benchmarking import Benchmark
+from .state_registry import StateRegistry
 
 def hybrid_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops = False):
     # Initialize the benchmark logger
@@ -21,14 +23,11 @@ def hybrid_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops =
         heuristic_calls = 0
         expansion_count = 0
         ordering_calls = 0
-        # Check if the start node's state is in the heuristic cache
-        if start_node.state in state_heuristic_cache:
-            base_h_val = state_heuristic_cache[start_node.state]
-        else:
-            # If not, compute the heuristic value and store it in the cache
-            base_h_val = heuristic(start_node)
-            heuristic_calls += 1
-            state_heuristic_cache[start_node.state] = base_h_val
+        # Look up the start node's heuristic value in the cache, only cache
+        # misses compute the heuristic
+        misses = cache.misses
+        base_h_val = cache(start_node)
+        heuristic_calls += cache.misses - misses
         pqueue = []
         visited_states = set()
 
@@ -38,25 +37,31 @@ def hybrid_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops =
         # Main loop for BBFS
         while pqueue:
             node_h_val, _, node = heapq.heappop(pqueue)
+            # Only expanded states are registered, the registry does not grow
+            # with every generated successor
+            node_id, _ = registry.insert_state(node.state)
 
             # Skip if node is in the dead-end cache
-            if node.state in dead_end_cache:
+            if node_id in dead_end_cache:
                 logging.debug("PRUNED: Node in dead-end cache")
                 continue
 
             # Skip if node is already visited
-            if node.state in visited_states:
+            if node_id in visited_states:
                 logging.debug("PRUNED: Node visited")
                 continue
-            visited_states.add(node.state)
+            visited_states.add(node_id)
 
             # Generate successors
             for operator, successor in ordering.successor_generator(node.state):
+                # An unregistered successor has the id None, it has neither
+                # been visited nor found to be a dead end
+                successor_id = registry.get_state_id(successor)
                 # Skip if successor is in the dead-end cache or already visited
-                if successor in dead_end_cache:
+                if successor_id in dead_end_cache:
                     logging.debug("PRUNED: Successor in dead-end cache")
                     continue
-                if successor in visited_states:
+                if successor_id in visited_states:
                     logging.debug("PRUNED: Successor visited")
                     continue
 
@@ -70,14 +75,10 @@ def hybrid_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops =
                     logger.log_lookahead(True, expansion_count, heuristic_calls, ordering_calls, "Goal found")
                     return successor_node
                 
-                # Check if the successor's state is in the heuristic cache
-                if successor in state_heuristic_cache:
-                    successor_h_value = state_heuristic_cache[successor]
-                else:
-                    # If not, compute the heuristic value and store it in the cache
-                    successor_h_value = heuristic(successor_node)
-                    heuristic_calls += 1
-                    state_heuristic_cache[successor] = successor_h_value
+                # Look up the successor's heuristic value in the cache
+                misses = cache.misses
+                successor_h_value = cache(successor_node)
+                heuristic_calls += cache.misses - misses
 
                 # Skip if the heuristic value is infinity
                 if successor_h_value == float('inf'):
@@ -115,17 +116,24 @@ def hybrid_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops =
 
     # Initialize parameters
     max_queue_size = 10000
+    # The caches hold state ids of the registry instead of states
+    registry = StateRegistry(planning_task)
     dead_end_cache = set()
     ordering = LeastFailedFirst(planning_task)
-    state_heuristic_cache = {}
+    # The cache of heuristic values, the one of the planner if it has one
+    if isinstance(heuristic, CachingAdapter):
+        cache = heuristic
+    else:
+        cache = CachingAdapter(heuristic)
     restart_count = 0
 
     # Create the initial node
     initial_node = searchspace.make_root_node(planning_task.initial_state)
+    initial_id, _ = registry.insert_state(initial_node.state)
     current_node = initial_node
 
     # Main loop for the Hybrid Enforced Hill Climbing (HEHC) algorithm
-    while initial_node.state not in dead_end_cache:
+    while initial_id not in dead_end_cache:
         # Perform BBFS
         next_node = bounded_best_first_search(current_node)
 
@@ -138,7 +146,7 @@ def hybrid_enforced_hill_climbing(planning_task, heuristic, use_preferred_ops =
         # Process the result of BBFS
         if next_node is None:
             # If BBFS failed, add the current state to the dead-end cache and restart the search
-            dead_end_cache.add(current_node.state)
+            dead_end_cache.add(registry.get_state_id(current_node.state))
             logging.info("Dead-end found search restarted")
             logger.restart()
             restart_count += 1
@@ -19,6 +19,11 @@
 Building the search node and associated methods
 """
 
+from array import array
+import itertools
+
+from .state_registry import StateRegistry
+
 
 class SearchNode:
     """
@@ -42,6 +47,9 @@ class SearchNode:
         self.parent = parent
         self.action = action
         self.g = g
+        # The heuristic value of the node, if a search or heuristic stored it.
+        self.h = None
+        self._hash = None
 
     def extract_solution(self):
         """
@@ -66,17 +74,32 @@ class SearchNode:
         Checks if two nodes are equal by comparing their states, actions, and 
         parents.
         """
+        if self is other:
+            return True
         # Check that the other object is a SearchNode
         if not isinstance(other, SearchNode):
             return False
-        return self.state == other.state and self.action == other.action and self.parent == other.parent
-    
+        # Comparing the cached hashes first avoids walking both parent chains
+        # for nodes that differ.
+        return (
+            hash(self) == hash(other)
+            and self.state == other.state
+            and self.action == other.action
+            and self.parent == other.parent
+        )
+
     def __hash__(self):
         """
         Hashes the state, action, and parent of the node.
+
+        The hash is computed once and cached, so hashing a node only hashes
+        its parent's cached value instead of the whole parent chain.
         """
-        return hash((self.state, self.action, self.parent))
-    
+        if self._hash is None:
+            self._hash = hash((self.state, self.action, self.parent))
+        return self._hash
+
+
 def make_root_node(initial_state):
     """
     Construct an initial search node. The root node of the search space
@@ -95,3 +118,145 @@ def make_child_node(parent_node, action, state):
     The g-value is set to the parents g-value + 1.
     """
     return SearchNode(state, parent_node, action, parent_node.g + 1)
+
+
+def evaluate_nodes(heuristic, nodes):
+    """
+    Evaluate the nodes of an iterable with a heuristic and yield (node, h)
+    pairs in their order.
+
+    The nodes are passed to heuristic.evaluate_batch in slices of
+    heuristic.batch_size nodes, so a search that stops at the first good
+    node only creates and evaluates the nodes of the slices it uses.
+    """
+    nodes = iter(nodes)
+    while True:
+        batch = list(itertools.islice(nodes, heuristic.batch_size))
+        if not batch:
+            return
+        yield from zip(batch, heuristic.evaluate_batch(batch))
+
+
+class SearchSpace:
+    """
+    A compact store for the nodes of a search space.
+
+    Instead of one SearchNode object per node, the parent index, operator id,
+    g-value and state id of every node are kept in parallel arrays, and the
+    states are interned in a StateRegistry. Nodes are referred to by their
+    index. make_root_node and make_child_node can be used like the module
+    functions of the same names, but return node indices.
+    """
+
+    def __init__(self, task):
+        """
+        @param task: The task whose search space is stored.
+        """
+        self.registry = StateRegistry(task)
+        self._parents = array("q")
+        self._operator_ids = array("l")
+        self._g_values = array("l")
+        self._state_ids = array("q")
+        # Operators are numbered in the order in which they are first used.
+        # The ids are assigned by identity, since hashing operators is costly.
+        self._operators = []
+        self._operator_index = {}
+
+    def __len__(self):
+        return len(self._parents)
+
+    def _add_node(self, state_id, parent, operator_id, g):
+        self._parents.append(parent)
+        self._operator_ids.append(operator_id)
+        self._g_values.append(g)
+        self._state_ids.append(state_id)
+        return len(self._parents) - 1
+
+    def make_root_node(self, initial_state):
+        """
+        Add a root node, which has no parent and no action and a g-value of
+        zero.
+
+        @param initial_state: The initial state of the search space.
+        @return: The index of the new node.
+        """
+        state_id, _ = self.registry.insert_state(initial_state)
+        return self._add_node(state_id, -1, -1, 0)
+
+    def make_child_node(self, parent, action, state):
+        """
+        Add a node for "state" reached from node "parent" with "action". The
+        g-value is set to the parent's g-value + 1.
+
+        @return: The index of the new node.
+        """
+        state_id, _ = self.registry.insert_state(state)
+        return self._add_child_node(parent, action, state_id)
+
+    def make_new_child_node(self, parent, action, state):
+        """
+        Like make_child_node, but only add a node if "state" has not been
+        registered before. Searches with duplicate detection use this to
+        register the state and test whether it is new at once.
+
+        @return: The index of the new node or None for a known state.
+        """
+        state_id, is_new = self.registry.insert_state(state)
+        if not is_new:
+            return None
+        return self._add_child_node(parent, action, state_id)
+
+    def _add_child_node(self, parent, action, state_id):
+        operator_id = self._operator_index.get(id(action))
+        if operator_id is None:
+            operator_id = len(self._operators)
+            self._operators.append(action)
+            self._operator_index[id(action)] = operator_id
+        return self._add_node(state_id, parent, operator_id, self._g_values[parent] + 1)
+
+    def get_state(self, node):
+        """
+        @return: The state stored in the node with index "node".
+        """
+        return self.registry.lookup_state(self._state_ids[node])
+
+    def get_state_id(self, node):
+        """
+        @return: The id of the node's state in the registry.
+        """
+        return self._state_ids[node]
+
+    def get_parent(self, node):
+        """
+        @return: The index of the parent node or None for a root node.
+        """
+        parent = self._parents[node]
+        return None if parent < 0 else parent
+
+    def get_action(self, node):
+        """
+        @return: The action that produced the node or None for a root node.
+        """
+        operator_id = self._operator_ids[node]
+        return None if operator_id < 0 else self._operators[operator_id]
+
+    def get_g(self, node):
+        """
+        @return: The path length of the node in the count of applied operators.
+        """
+        return self._g_values[node]
+
+    def extract_solution(self, node):
+        """
+        Returns the list of actions that were applied from the root node to
+        the node with index "node".
+        """
+        parents = self._parents
+        operator_ids = self._operator_ids
+        operators = self._operators
+        solution = []
+        while parents[node] >= 0:
+            solution.append(operators[operator_ids[node]])
+            node = parents[node]
+        solution.reverse()
+        return solution
@@ -0,0 +1,123 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A registry that stores every distinct state of a search exactly once and
+assigns it a dense integer id.
+
+Searches keep these ids in their closed lists and caches instead of
+references to full states. The states themselves are stored as packed bit
+vectors, which need a small fraction of the memory of a frozenset of fact
+names.
+"""
+
+import sys
+
+from ..task import HashedState
+
+
+class StateRegistry:
+    """
+    Interns the states of a task and maps them to consecutive ids 0, 1, ...
+
+    States of a task.Task (sets of fact names) are packed into bit vectors
+    using the order of the task's facts. States that are ints, like those of
+    task.BitsetTask, already are bit vectors and are stored as they are.
+    task.HashedState states are stored as they are, too: looking them up uses
+    their Zobrist hash, which the task maintains incrementally, instead of
+    packing every state, at the price of keeping the sets of facts.
+    """
+
+    def __init__(self, task):
+        """
+        @param task The task whose states will be registered.
+        """
+        if isinstance(task.initial_state, (set, frozenset)) and not isinstance(
+            task.initial_state, HashedState
+        ):
+            self._facts = tuple(sorted(task.facts))
+            self._fact_bits = {fact: 1 << i for i, fact in enumerate(self._facts)}
+        else:
+            self._facts = None
+        # The stored state with id i is _states[i]. The dictionary shares the
+        # stored states as keys, so every state is stored only once.
+        self._states = []
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, state):
+        return self._pack(state) in self._ids
+
+    def _pack(self, state):
+        if self._facts is None:
+            return state
+        fact_bits = self._fact_bits
+        bits = 0
+        for fact in state:
+            bits |= fact_bits[fact]
+        return bits
+
+    def _unpack(self, bits):
+        if self._facts is None:
+            return bits
+        facts = self._facts
+        state = []
+        while bits:
+            lowest = bits & -bits
+            state.append(facts[lowest.bit_length() - 1])
+            bits ^= lowest
+        return frozenset(state)
+
+    def insert_state(self, state):
+        """
+        Register "state" unless it is already known.
+
+        @return A pair (state_id, is_new), where is_new tells whether the
+                state has been registered by this call
+        """
+        packed = self._pack(state)
+        state_id = self._ids.get(packed)
+        if state_id is not None:
+            return state_id, False
+        state_id = len(self._states)
+        self._states.append(packed)
+        self._ids[packed] = state_id
+        return state_id, True
+
+    def get_state_id(self, state):
+        """
+        @return The id of "state" or None if it has not been registered
+        """
+        return self._ids.get(self._pack(state))
+
+    def lookup_state(self, state_id):
+        """
+        @return The state with the given id, in the representation of the task
+        """
+        return self._unpack(self._states[state_id])
+
+    def get_memory_usage(self):
+        """
+        @return The approximate number of bytes used for storing the states
+        """
+        return (
+            sys.getsizeof(self._states)
+            + sys.getsizeof(self._ids)
+            + sum(sys.getsizeof(packed) for packed in self._states)
+        )
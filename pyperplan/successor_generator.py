@@ -0,0 +1,272 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A successor generator that finds the applicable operators of a state without
+testing every operator.
+
+The generator is a decision tree over the precondition facts, similar to the
+one used in Fast Downward. All preconditions are sorted by a fixed fact
+order. Every inner node tests one fact: operators whose next precondition is
+this fact are stored in the "true" subtree, all other operators in the "don't
+care" subtree. Operators whose preconditions have all been tested are stored
+in the node itself. Looking up a state only visits the "true" subtrees of
+facts that hold in the state.
+
+Besides sets of fact names, the generator supports the int states of the
+compiled tasks: bitsets, where every condition is a fact id, and packed
+finite-domain states, where every condition is a (mask, value) pair that
+holds if the bits of the state under the mask equal the value.
+"""
+
+from collections import defaultdict
+
+
+class _Node:
+    """A node of the decision tree."""
+
+    __slots__ = ("operators", "fact", "true_child", "dont_care_child")
+
+    def __init__(self, operators, fact):
+        # Indices of the operators that are applicable if this node is reached.
+        self.operators = operators
+        # The fact (or its bitmask or (mask, value) pair) tested in this node,
+        # None for leaves.
+        self.fact = fact
+        self.true_child = None
+        self.dont_care_child = None
+
+
+class SuccessorGenerator:
+    """
+    Decision tree that returns the applicable operators of a state in the
+    order of the given operator list.
+    """
+
+    def __init__(self, operators, conditions, bitset=False, masked=False):
+        """
+        @param operators The operators in the order in which they should be
+                         returned.
+        @param conditions For each operator the sorted sequence of its
+                          precondition facts. For bitset tasks these are the
+                          fact ids, for masked states (mask, value) pairs.
+        @param bitset Whether states are bitmasks (True) or sets of facts.
+        @param masked Whether states are ints whose conditions are tested
+                      with (mask, value) pairs.
+        """
+        self.operators = operators
+        self.bitset = bitset
+        self.masked = masked
+        entries = [(index, tuple(conds), 0) for index, conds in enumerate(conditions)]
+        self.root = self._build(entries)
+
+    def _build(self, entries):
+        """
+        Build the subtree for "entries", a list of (operator index,
+        conditions, position of the next untested condition) triples.
+
+        The chain of "don't care" children is built iteratively, only the
+        "true" children are built recursively. Hence the recursion depth is
+        bounded by the maximal number of preconditions.
+        """
+        immediate = []
+        by_fact = defaultdict(list)
+        for index, conds, pos in entries:
+            if pos == len(conds):
+                immediate.append(index)
+            else:
+                by_fact[conds[pos]].append((index, conds, pos + 1))
+        if not by_fact:
+            return _Node(tuple(immediate), None)
+        # Operators are grouped by their next untested condition. Since
+        # conditions are sorted, an operator in one group does not require
+        # the facts of the groups before it, so the groups can be chained via
+        # their "don't care" children.
+        root = None
+        previous = None
+        for fact in sorted(by_fact):
+            test = 1 << fact if self.bitset else fact
+            node = _Node(tuple(immediate), test)
+            immediate = []
+            node.true_child = self._build(by_fact[fact])
+            if previous is None:
+                root = node
+            else:
+                previous.dont_care_child = node
+            previous = node
+        return root
+
+    def get_applicable_indices(self, state):
+        """
+        @return The sorted list of the indices of all operators that are
+                applicable in "state".
+        """
+        applicable = []
+        self.extend_applicable_indices(self.root, state, applicable)
+        # The indices follow the precomputed operator order, so sorting these
+        # small ints restores that order.
+        applicable.sort()
+        return applicable
+
+    def extend_applicable_indices(self, node, state, applicable):
+        """
+        Append the indices of the operators of the subtree "node" (including
+        the chain of its "don't care" children) that are applicable in
+        "state" to the list "applicable", in no particular order.
+        """
+        stack = [node]
+        if self.bitset:
+            while stack:
+                node = stack.pop()
+                while node is not None:
+                    applicable.extend(node.operators)
+                    if node.fact is not None and state & node.fact:
+                        stack.append(node.true_child)
+                    node = node.dont_care_child
+        elif self.masked:
+            while stack:
+                node = stack.pop()
+                while node is not None:
+                    applicable.extend(node.operators)
+                    fact = node.fact
+                    if fact is not None and state & fact[0] == fact[1]:
+                        stack.append(node.true_child)
+                    node = node.dont_care_child
+        else:
+            while stack:
+                node = stack.pop()
+                while node is not None:
+                    applicable.extend(node.operators)
+                    if node.fact is not None and node.fact in state:
+                        stack.append(node.true_child)
+                    node = node.dont_care_child
+
+    def get_applicable_operators(self, state):
+        """
+        @return The list of all operators applicable in "state", in the order
+                of the operator list the generator was built for.
+        """
+        operators = self.operators
+        return [operators[index] for index in self.get_applicable_indices(state)]
+
+
+class IncrementalSuccessorGenerator:
+    """
+    Derives the applicable operators of a state from those of its parent.
+
+    A child state differs from its parent only by the effects of the applied
+    operator. Operators that require a deleted fact become inapplicable, and
+    only operators that require an added fact can become applicable. The
+    latter are found with one small SuccessorGenerator per fact, built over
+    the operators that have the fact as a precondition. For states whose
+    parent is unknown, the applicable operators are computed with a
+    SuccessorGenerator for all operators.
+
+    The parent information of generated states is remembered until
+    "max_states" states are known, then it is dropped and collected anew.
+    """
+
+    def __init__(self, operators, max_states=100000):
+        """
+        @param operators The operators in the order in which they should be
+                         returned.
+        @param max_states The maximal number of states whose applicable
+                          operators or parent are remembered.
+        """
+        self.operators = operators
+        self.max_states = max_states
+        self.generator = SuccessorGenerator(
+            operators, [sorted(op.preconditions) for op in operators]
+        )
+        self.precondition_of = defaultdict(list)
+        for index, op in enumerate(operators):
+            for fact in op.preconditions:
+                self.precondition_of[fact].append(index)
+        # Both are computed on first use: for each operator the frozenset of
+        # the operators it makes inapplicable, and for each fact a pair of
+        # the indices of the operators requiring it and a generator for them.
+        self._disabled = [None] * len(operators)
+        self._fact_generators = {}
+        # Maps states to the frozenset of their applicable operator indices,
+        # or to a (parent's applicable indices, operator index) pair.
+        self._known = {}
+
+    def _get_disabled(self, index):
+        disabled = self._disabled[index]
+        if disabled is None:
+            op = self.operators[index]
+            disabled = frozenset(
+                other
+                for fact in op.del_effects - op.add_effects
+                for other in self.precondition_of.get(fact, ())
+            )
+            self._disabled[index] = disabled
+        return disabled
+
+    def _get_enabled(self, fact, state):
+        """
+        @return The indices of the operators that require "fact" and are
+                applicable in "state", in which "fact" is true
+        """
+        entry = self._fact_generators.get(fact)
+        if entry is None:
+            indices = self.precondition_of.get(fact, [])
+            operators = [self.operators[index] for index in indices]
+            conditions = [sorted(op.preconditions - {fact}) for op in operators]
+            entry = (indices, SuccessorGenerator(operators, conditions))
+            self._fact_generators[fact] = entry
+        indices, generator = entry
+        return [indices[local] for local in generator.get_applicable_indices(state)]
+
+    def _get_applicable_set(self, state):
+        known = self._known.get(state)
+        if known is None:
+            applicable = frozenset(self.generator.get_applicable_indices(state))
+        elif type(known) is frozenset:
+            return known
+        else:
+            parent_applicable, index = known
+            applicable = parent_applicable - self._get_disabled(index)
+            for fact in self.operators[index].add_effects:
+                applicable = applicable.union(self._get_enabled(fact, state))
+        if len(self._known) >= self.max_states:
+            self._known.clear()
+        self._known[state] = applicable
+        return applicable
+
+    def get_applicable_operators(self, state):
+        """
+        @return The list of all operators applicable in "state", in the order
+                of the operator list the generator was built for.
+        """
+        operators = self.operators
+        return [operators[index] for index in sorted(self._get_applicable_set(state))]
+
+    def iter_successor_states(self, state):
+        """
+        Yield the (op, new_state) pairs of "state" and remember for every
+        new state how it was generated.
+        """
+        applicable = self._get_applicable_set(state)
+        operators = self.operators
+        known = self._known
+        for index in sorted(applicable):
+            op = operators[index]
+            successor = op.apply(state)
+            if successor not in known:
+                known[successor] = (applicable, index)
+            yield op, successor
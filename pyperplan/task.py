@@ -19,6 +19,19 @@
 Classes for representing a STRIPS planning task
 """
 
+import random
+
+from .invariants import find_mutex_groups
+from .successor_generator import IncrementalSuccessorGenerator, SuccessorGenerator
+
+
+def _iter_bits(bits):
+    """Yield the positions of all set bits of "bits" in ascending order."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
 
 class Operator:
     """
@@ -106,6 +119,21 @@ class Task:
         self.initial_state = initial_state
         self.goals = goals
         self.operators = operators
+        # If False, get_successor_states tests every operator instead of
+        # using the successor generator (reference mode).
+        self.use_successor_generator = True
+        # If True, the applicable operators of generated states are derived
+        # from those of their parents.
+        self.use_incremental_successors = False
+        self._successor_generator = None
+        self._incremental_generator = None
+
+    def __getstate__(self):
+        # The successor generator is a cache that is cheap to rebuild.
+        state = self.__dict__.copy()
+        state["_successor_generator"] = None
+        state["_incremental_generator"] = None
+        return state
 
     def goal_reached(self, state):
         """
@@ -116,15 +144,76 @@ class Task:
         """
         return self.goals <= state
 
+    def get_successor_generator(self):
+        """
+        The successor generator is built on first use for the operators
+        sorted by name. Changes to the operators have to be made before.
+
+        @return The successor_generator.SuccessorGenerator of the task
+        """
+        if self._successor_generator is None:
+            operators = sorted(self.operators, key=lambda op: op.name)
+            self._successor_generator = self._make_successor_generator(operators)
+        return self._successor_generator
+
+    def _make_successor_generator(self, operators):
+        conditions = [sorted(op.preconditions) for op in operators]
+        return SuccessorGenerator(operators, conditions)
+
+    def get_incremental_generator(self):
+        """
+        Like get_successor_generator, for the incremental successor mode.
+
+        @return The successor_generator.IncrementalSuccessorGenerator of the
+        task
+        """
+        if self._incremental_generator is None:
+            operators = sorted(self.operators, key=lambda op: op.name)
+            self._incremental_generator = IncrementalSuccessorGenerator(operators)
+        return self._incremental_generator
+
+    def get_applicable_operators(self, state):
+        """
+        @return A list of the operators that are applicable in "state",
+        sorted by name.
+        """
+        if self.use_incremental_successors:
+            return self.get_incremental_generator().get_applicable_operators(state)
+        if self.use_successor_generator:
+            return self.get_successor_generator().get_applicable_operators(state)
+        applicable = [op for op in self.operators if op.applicable(state)]
+        return sorted(applicable, key=lambda op: op.name)
+
+    def apply(self, op, state):
+        """
+        @return The state that results when the applicable operator "op" is
+        applied in state "state"
+        """
+        return op.apply(state)
+
     def get_successor_states(self, state):
         """
         @return A list with (op, new_state) pairs where "op" is the applicable
         operator and "new_state" the state that results when "op" is applied
-        in state "state".
+        in state "state". The list is sorted by operator name.
         """
-        successors = [(op, op.apply(state)) for op in self.operators if op.applicable(state)]
-        # Sort successors by operator name
-        return sorted(successors, key=lambda x: x[0].name)
+        if self.use_incremental_successors:
+            return list(self.iter_successor_states(state))
+        return [(op, op.apply(state)) for op in self.get_applicable_operators(state)]
+
+    def iter_successor_states(self, state):
+        """
+        Like get_successor_states, but a successor state is only computed when
+        the caller asks for it. Searches that stop at the first good successor
+        thus never build the remaining ones.
+
+        @return An iterator over (op, new_state) pairs, sorted by operator name
+        """
+        if self.use_incremental_successors:
+            yield from self.get_incremental_generator().iter_successor_states(state)
+            return
+        for op in self.get_applicable_operators(state):
+            yield op, op.apply(state)
 
     def __str__(self):
         s = "Task {0}\n  Vars:  {1}\n  Init:  {2}\n  Goals: {3}\n  Ops:   {4}"
@@ -139,3 +228,505 @@ class Task:
     def __repr__(self):
         string = "<Task {0}, vars: {1}, operators: {2}>"
         return string.format(self.name, len(self.facts), len(self.operators))
+
+
+class BitsetOperator:
+    """
+    A STRIPS operator whose preconditions, add and delete effects are
+    bitmasks over the fact ids of a BitsetTask.
+
+    The original (fact name based) operator is kept in "operator". The name
+    is shared with it, so that plans consisting of bitset operators can be
+    written out as usual.
+    """
+
+    def __init__(self, operator, preconditions, add_effects, del_effects):
+        self.operator = operator
+        self.name = operator.name
+        self.preconditions = preconditions
+        self.add_effects = add_effects
+        self.del_effects = del_effects
+        # Precompute the mask of facts that survive the application.
+        self.keep_mask = ~del_effects
+
+    def applicable(self, state):
+        """
+        @return True if all precondition bits are set in "state".
+        """
+        return state & self.preconditions == self.preconditions
+
+    def apply(self, state):
+        """
+        Delete effects are removed before add effects are set, just like
+        in Operator.apply. Applicability is not checked.
+
+        @param state The state (an int) that the operator should be applied to
+        @return The bitmask of the successor state
+        """
+        return (state & self.keep_mask) | self.add_effects
+
+    def __repr__(self):
+        return "<BitsetOp %s>" % self.name
+
+
+class BitsetTask(Task):
+    """
+    A compiled version of a STRIPS task in which every fact has a dense
+    integer id and states are Python ints used as bitmasks. Fact i is true in
+    a state iff bit i is set.
+
+    The task offers the same interface as Task, so it can be passed to the
+    searches unchanged. Use decode_state to get the fact names of a state.
+    """
+
+    def __init__(self, task):
+        """
+        @param task The Task instance that should be compiled
+        """
+        facts = tuple(sorted(task.facts))
+        self.fact_ids = {fact: index for index, fact in enumerate(facts)}
+        operators = [
+            BitsetOperator(
+                op,
+                self.encode_state(op.preconditions),
+                self.encode_state(op.add_effects),
+                self.encode_state(op.del_effects),
+            )
+            for op in task.operators
+        ]
+        super().__init__(
+            task.name,
+            facts,
+            self.encode_state(task.initial_state),
+            self.encode_state(task.goals),
+            operators,
+        )
+        self.strips_task = task
+
+    def encode_state(self, facts):
+        """
+        @param facts An iterable of fact names
+        @return The bitmask that has the bits of all given facts set
+        """
+        bits = 0
+        for fact in facts:
+            bits |= 1 << self.fact_ids[fact]
+        return bits
+
+    def decode_state(self, state):
+        """
+        @param state A bitmask over the facts of the task
+        @return A frozenset with the names of the facts that are set
+        """
+        facts = self.facts
+        return frozenset(facts[index] for index in _iter_bits(state))
+
+    def goal_reached(self, state):
+        """
+        @return True if all goal bits are set in "state", False otherwise
+        """
+        return state & self.goals == self.goals
+
+    def _make_successor_generator(self, operators):
+        conditions = [list(_iter_bits(op.preconditions)) for op in operators]
+        return SuccessorGenerator(operators, conditions, bitset=True)
+
+    def get_successor_states(self, state):
+        """
+        @return A list with (op, new_state) pairs, see Task.get_successor_states
+        """
+        return [
+            (op, (state & op.keep_mask) | op.add_effects)
+            for op in self.get_applicable_operators(state)
+        ]
+
+    def iter_successor_states(self, state):
+        """
+        @return An iterator over (op, new_state) pairs, see
+        Task.iter_successor_states
+        """
+        for op in self.get_applicable_operators(state):
+            yield op, (state & op.keep_mask) | op.add_effects
+
+    def __str__(self):
+        s = "BitsetTask {0}\n  Vars:  {1}\n  Init:  {2}\n  Goals: {3}\n  Ops:   {4}"
+        return s.format(
+            self.name,
+            ", ".join(self.facts),
+            self.decode_state(self.initial_state),
+            self.decode_state(self.goals),
+            "\n".join(map(repr, self.operators)),
+        )
+
+    def __repr__(self):
+        string = "<BitsetTask {0}, vars: {1}, operators: {2}>"
+        return string.format(self.name, len(self.facts), len(self.operators))
+
+
+class SASOperator:
+    """
+    An operator of a SASTask. Preconditions and effects are assignments to
+    the finite-domain variables, given as masks over the packed state and
+    the values under these masks.
+
+    Deleting a fact that is not a precondition only changes the state if the
+    fact is true. Such deletes are kept as conditional effects.
+    """
+
+    def __init__(self, operator, pre_mask, pre_value, eff_mask, eff_value, conditional):
+        """
+        @param operator The original STRIPS operator
+        @param conditional A tuple of (mask, value, none_value) triples: if
+                           the variable under "mask" has "value" before the
+                           application, it is set to "none_value".
+        """
+        self.operator = operator
+        self.name = operator.name
+        self.pre_mask = pre_mask
+        self.pre_value = pre_value
+        self.keep_mask = ~eff_mask
+        self.eff_value = eff_value
+        self.conditional = conditional
+
+    def applicable(self, state):
+        """
+        @return True if all precondition variables have the required values
+        """
+        return state & self.pre_mask == self.pre_value
+
+    def apply(self, state):
+        """
+        Applicability is not checked.
+
+        @param state The packed state (an int)
+        @return The packed successor state
+        """
+        successor = (state & self.keep_mask) | self.eff_value
+        for mask, value, none_value in self.conditional:
+            if state & mask == value:
+                successor = (successor & ~mask) | none_value
+        return successor
+
+    def __repr__(self):
+        return "<SASOp %s>" % self.name
+
+
+class SASTask(Task):
+    """
+    A compiled version of a STRIPS task with finite-domain (SAS+) variables.
+
+    Every mutex group chosen by the translation becomes a variable whose
+    values are the facts of the group plus a "none of them" value if all
+    facts of the group can be false at the same time. The other facts become
+    binary variables. States are Python ints in which every variable takes
+    the minimal number of bits for its domain.
+
+    Like BitsetTask, the task offers the interface of Task and the states can
+    be translated back with decode_state.
+    """
+
+    def __init__(self, task, mutex_groups=None):
+        """
+        @param task The Task instance that should be compiled
+        @param mutex_groups The mutex groups to choose the variables from.
+                            By default they are computed with
+                            invariants.find_mutex_groups.
+        """
+        if mutex_groups is None:
+            mutex_groups = find_mutex_groups(task)
+        # Each variable is a tuple of facts. Like in Fast Downward, the
+        # largest remaining group is chosen first and its facts are removed
+        # from all other groups.
+        remaining = [set(group) for group in mutex_groups]
+        uncovered = set(task.facts)
+        self.variables = []
+        while remaining:
+            group = max(remaining, key=lambda group: (len(group), sorted(group)))
+            if len(group) < 2:
+                break
+            self.variables.append(tuple(sorted(group)))
+            uncovered -= group
+            remaining = [other - group for other in remaining if other is not group]
+        self.variables.extend((fact,) for fact in sorted(uncovered))
+
+        # For each variable the value meaning that none of its facts is true,
+        # or None if exactly one of its facts is always true.
+        self.none_values = []
+        self.fact_values = {}
+        self.masks = []
+        self.offsets = []
+        offset = 0
+        for variable in self.variables:
+            group = frozenset(variable)
+            if self._needs_none_value(task, group):
+                self.none_values.append(len(variable) << offset)
+                size = len(variable) + 1
+            else:
+                self.none_values.append(None)
+                size = len(variable)
+            width = (size - 1).bit_length()
+            mask = ((1 << width) - 1) << offset
+            for value, fact in enumerate(variable):
+                self.fact_values[fact] = (len(self.masks), value << offset)
+            self.masks.append(mask)
+            self.offsets.append(offset)
+            offset += width
+        self.num_bits = offset
+
+        # Operators that require two values of one variable can never be
+        # applied and are dropped.
+        operators = [
+            self._translate_operator(op)
+            for op in task.operators
+            if self.encode_partial_state(op.preconditions) is not None
+        ]
+        goals = self.encode_partial_state(task.goals)
+        if goals is None:
+            # The goal is contradictory, no state satisfies this condition.
+            goals = (0, 1)
+        super().__init__(
+            task.name,
+            tuple(task.facts),
+            self.encode_state(task.initial_state),
+            goals,
+            operators,
+        )
+        self.strips_task = task
+
+    @staticmethod
+    def _needs_none_value(task, group):
+        if not (task.initial_state & group):
+            return True
+        return any(
+            op.del_effects & group and not (op.add_effects & group)
+            for op in task.operators
+        )
+
+    def _translate_operator(self, op):
+        pre_mask, pre_value = self.encode_partial_state(op.preconditions)
+        eff_mask = 0
+        eff_value = 0
+        assigned = set()
+        for fact in op.add_effects:
+            var, value = self.fact_values[fact]
+            eff_mask |= self.masks[var]
+            eff_value |= value
+            assigned.add(var)
+        conditional = []
+        for fact in op.del_effects - op.add_effects:
+            var, value = self.fact_values[fact]
+            if var in assigned:
+                continue
+            if fact in op.preconditions:
+                eff_mask |= self.masks[var]
+                eff_value |= self.none_values[var]
+            else:
+                conditional.append((self.masks[var], value, self.none_values[var]))
+        return SASOperator(
+            op, pre_mask, pre_value, eff_mask, eff_value, tuple(conditional)
+        )
+
+    def encode_partial_state(self, facts):
+        """
+        @param facts An iterable of fact names that must all be true
+        @return A pair (mask, value): a packed state satisfies the facts iff
+                its bits under mask equal value. None if two of the facts
+                belong to the same variable.
+        """
+        mask = 0
+        value = 0
+        for fact in facts:
+            var, fact_value = self.fact_values[fact]
+            var_mask = self.masks[var]
+            if mask & var_mask and value & var_mask != fact_value:
+                return None
+            mask |= var_mask
+            value |= fact_value
+        return mask, value
+
+    def encode_state(self, facts):
+        """
+        @param facts The true facts of a state, at most one per variable
+        @return The packed state
+        """
+        state = 0
+        for var, none_value in enumerate(self.none_values):
+            if none_value is not None:
+                state |= none_value
+        for fact in facts:
+            var, value = self.fact_values[fact]
+            state = (state & ~self.masks[var]) | value
+        return state
+
+    def decode_state(self, state):
+        """
+        @param state A packed state
+        @return A frozenset with the names of the true facts
+        """
+        facts = []
+        for variable, mask, offset in zip(self.variables, self.masks, self.offsets):
+            # Variables that always have the same value have no bits.
+            value = (state & mask) >> offset
+            if value < len(variable):
+                facts.append(variable[value])
+        return frozenset(facts)
+
+    def goal_reached(self, state):
+        """
+        @return True if all goal variables have their goal values
+        """
+        mask, value = self.goals
+        return state & mask == value
+
+    def _make_successor_generator(self, operators):
+        conditions = [self._get_conditions(op) for op in operators]
+        return SuccessorGenerator(operators, conditions, masked=True)
+
+    def _get_conditions(self, op):
+        conditions = []
+        for mask in self.masks:
+            if op.pre_mask & mask:
+                conditions.append((mask, op.pre_value & mask))
+        return sorted(conditions)
+
+    def get_successor_states(self, state):
+        """
+        @return A list with (op, new_state) pairs, see Task.get_successor_states
+        """
+        return [(op, op.apply(state)) for op in self.get_applicable_operators(state)]
+
+    def iter_successor_states(self, state):
+        """
+        @return An iterator over (op, new_state) pairs, see
+        Task.iter_successor_states
+        """
+        for op in self.get_applicable_operators(state):
+            yield op, op.apply(state)
+
+    def __str__(self):
+        s = "SASTask {0}\n  Vars:  {1}\n  Init:  {2}\n  Goals: {3}\n  Ops:   {4}"
+        return s.format(
+            self.name,
+            "\n         ".join(map(str, self.variables)),
+            self.decode_state(self.initial_state),
+            self.strips_task.goals,
+            "\n".join(map(repr, self.operators)),
+        )
+
+    def __repr__(self):
+        string = "<SASTask {0}, vars: {1}, bits: {2}, operators: {3}>"
+        return string.format(
+            self.name, len(self.variables), self.num_bits, len(self.operators)
+        )
+
+
+class HashedState(frozenset):
+    """
+    A frozenset of fact names with a precomputed Zobrist hash.
+
+    The hash is the XOR of the random keys of all facts in the state. It is
+    derived incrementally from the parent state's hash by HashedTask, so the
+    facts of a successor state never have to be hashed. Hashed states must
+    not be mixed with plain frozensets in the same set or dict, since equal
+    states of the two types have different hashes.
+    """
+
+    __slots__ = ("_hash",)
+
+    def __new__(cls, facts, state_hash):
+        state = super().__new__(cls, facts)
+        state._hash = state_hash
+        return state
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (HashedState, (frozenset(self), self._hash))
+
+
+class HashedTask(Task):
+    """
+    A STRIPS task whose states are HashedState instances.
+
+    States, goals and operators are the same as in the original task, so
+    heuristics can evaluate the states directly.
+    """
+
+    def __init__(self, task):
+        """
+        @param task The Task instance whose states should be hashed
+        """
+        # A fixed seed makes the hashes, and thereby the iteration order of
+        # sets of states, reproducible.
+        rng = random.Random(0)
+        self.fact_keys = {fact: rng.getrandbits(63) for fact in sorted(task.facts)}
+        # For every operator, the (fact, key) pairs of its add effects and of
+        # the delete effects that are not added again.
+        self._effect_keys = {
+            op: (
+                tuple((fact, self.fact_keys[fact]) for fact in op.add_effects),
+                tuple(
+                    (fact, self.fact_keys[fact])
+                    for fact in op.del_effects - op.add_effects
+                ),
+            )
+            for op in task.operators
+        }
+        super().__init__(
+            task.name,
+            task.facts,
+            self.make_state(task.initial_state),
+            task.goals,
+            task.operators,
+        )
+
+    def make_state(self, facts):
+        """
+        @param facts An iterable of fact names
+        @return The HashedState with these facts
+        """
+        facts = frozenset(facts)
+        state_hash = 0
+        for fact in facts:
+            state_hash ^= self.fact_keys[fact]
+        return HashedState(facts, state_hash)
+
+    def apply(self, op, state):
+        """
+        Apply "op" in "state" and update the hash by the keys of the facts
+        that are actually added or deleted.
+
+        @return The successor state as a HashedState
+        """
+        if type(state) is not HashedState:
+            state = self.make_state(state)
+        add_keys, del_keys = self._effect_keys[op]
+        state_hash = state._hash
+        for fact, key in add_keys:
+            if fact not in state:
+                state_hash ^= key
+        for fact, key in del_keys:
+            if fact in state:
+                state_hash ^= key
+        return HashedState((state - op.del_effects) | op.add_effects, state_hash)
+
+    def get_successor_states(self, state):
+        """
+        @return A list with (op, new_state) pairs, see Task.get_successor_states
+        """
+        return [
+            (op, self.apply(op, state)) for op in self.get_applicable_operators(state)
+        ]
+
+    def iter_successor_states(self, state):
+        """
+        @return An iterator over (op, new_state) pairs, see
+        Task.iter_successor_states
+        """
+        for op in self.get_applicable_operators(state):
+            yield op, self.apply(op, state)
+
+    def __repr__(self):
+        string = "<HashedTask {0}, vars: {1}, operators: {2}>"
+        return string.format(self.name, len(self.facts), len(self.operators))
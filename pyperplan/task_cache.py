@@ -0,0 +1,239 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A persistent on-disk cache of grounded tasks.
+
+Grounded tasks are stored in a compact binary format: a header with the
+sizes of the sections, all names as one UTF-8 block and the fact sets of
+the initial state, the goal and the operators as arrays of 32-bit fact ids.
+Files are read through a memory map, so loading a task only touches the
+bytes it decodes. The files are named after a hash of the contents of the
+domain and problem files and of the grounding options, and the least
+recently used files are removed when the cache grows beyond its size limit.
+"""
+
+from array import array
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from .task import Operator, Task
+
+
+MAGIC = b"PYPTASK1"
+# Magic, number of facts, number of operators, length of the initial state,
+# of the goal and of the operator fact ids, and size of the name block.
+HEADER = struct.Struct("<8s6I")
+SUFFIX = ".task"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+# The id arrays are stored in little-endian byte order.
+_SWAP_BYTES = sys.byteorder == "big"
+
+
+def get_cache_key(domain_file, problem_file, **options):
+    """
+    @param options The options that influence the grounded task
+    @return A hex string that identifies the grounded task of the given
+            files and options
+    """
+    digest = hashlib.sha256(MAGIC)
+    for filename in (domain_file, problem_file):
+        with open(filename, "rb") as file:
+            content = file.read()
+        digest.update(struct.pack("<Q", len(content)))
+        digest.update(content)
+    digest.update(repr(sorted(options.items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _ids(values):
+    ids = array("I", values)
+    assert ids.itemsize == 4
+    return ids
+
+
+def write_task(task, file):
+    """
+    Write "task" to the binary file object "file".
+
+    All fact sets are written in their iteration order, so the loaded task
+    iterates over them in the same order as far as possible.
+    """
+    facts = list(task.facts)
+    fact_ids = {fact: i for i, fact in enumerate(facts)}
+    names = [task.name] + facts + [op.name for op in task.operators]
+    assert not any("\n" in name for name in names)
+    name_block = "\n".join(names).encode("utf-8")
+    init = _ids(fact_ids[fact] for fact in task.initial_state)
+    goals = _ids(fact_ids[fact] for fact in task.goals)
+    # The fact ids of the preconditions, add and delete effects of all
+    # operators, one after the other, and the start of each of these sets.
+    op_facts = _ids([])
+    op_offsets = _ids([0])
+    for op in task.operators:
+        for fact_set in (op.preconditions, op.add_effects, op.del_effects):
+            op_facts.extend(fact_ids[fact] for fact in fact_set)
+            op_offsets.append(len(op_facts))
+    if _SWAP_BYTES:
+        for ids in (init, goals, op_offsets, op_facts):
+            ids.byteswap()
+    file.write(
+        HEADER.pack(
+            MAGIC,
+            len(facts),
+            len(task.operators),
+            len(init),
+            len(goals),
+            len(op_facts),
+            len(name_block),
+        )
+    )
+    file.write(name_block)
+    # Align the id arrays to 4 bytes.
+    file.write(b"\0" * (-len(name_block) % 4))
+    for ids in (init, goals, op_offsets, op_facts):
+        file.write(ids.tobytes())
+
+
+def read_task(buffer):
+    """
+    @param buffer A bytes-like object, e.g. a memory map, with the contents
+                  written by write_task
+    @return The task.Task instance stored in "buffer"
+    @raise ValueError if "buffer" does not contain a stored task
+    """
+    try:
+        magic, *sizes = HEADER.unpack_from(buffer)
+    except struct.error as error:
+        raise ValueError("Truncated task file") from error
+    if magic != MAGIC:
+        raise ValueError("Not a task file")
+    num_facts, num_operators, num_init, num_goals, num_op_facts, name_size = sizes
+    num_ids = num_init + num_goals + 3 * num_operators + 1 + num_op_facts
+    offset = HEADER.size
+    with memoryview(buffer) as view:
+        names = str(view[offset : offset + name_size], "utf-8").split("\n")
+        offset += name_size + (-name_size % 4)
+        if len(names) != 1 + num_facts + num_operators:
+            raise ValueError("Truncated task file")
+        if len(view) < offset + 4 * num_ids:
+            raise ValueError("Truncated task file")
+        ids = _ids([])
+        ids.frombytes(view[offset : offset + 4 * num_ids])
+    if _SWAP_BYTES:
+        ids.byteswap()
+
+    name = names[0]
+    facts = names[1 : 1 + num_facts]
+    op_names = names[1 + num_facts :]
+    init = frozenset(facts[i] for i in ids[:num_init])
+    goals = frozenset(facts[i] for i in ids[num_init : num_init + num_goals])
+    start = num_init + num_goals
+    offsets = ids[start : start + 3 * num_operators + 1]
+    op_facts = ids[start + 3 * num_operators + 1 :]
+    operators = []
+    for index, op_name in enumerate(op_names):
+        pre_start, add_start, del_start, end = offsets[3 * index : 3 * index + 4]
+        operators.append(
+            Operator(
+                op_name,
+                [facts[i] for i in op_facts[pre_start:add_start]],
+                [facts[i] for i in op_facts[add_start:del_start]],
+                [facts[i] for i in op_facts[del_start:end]],
+            )
+        )
+    return Task(name, set(facts), init, goals, operators)
+
+
+class TaskCache:
+    """
+    A directory of grounded tasks, bounded in size.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """
+        @param directory The cache directory, it is created if necessary
+        @param max_size The maximal total size of the cached files in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key):
+        """
+        @return The cached task for "key" or None if it is not cached
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    task = read_task(buffer)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logging.warning(f"Ignoring invalid cached task {path}: {error}")
+            if isinstance(error, ValueError):
+                os.remove(path)
+            return None
+        # The modification time tells which files have been used last.
+        os.utime(path)
+        logging.info(f"Loaded grounded task from {path}")
+        return task
+
+    def store(self, key, task):
+        """
+        Store "task" under "key" and remove the least recently used files if
+        the cache has grown too large.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first, so concurrent processes never
+        # read a partially written task.
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                write_task(task, file)
+            os.replace(tmp_path, self._get_path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        logging.info(f"Stored grounded task in {self._get_path(key)}")
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Removed by another process.
+                pass
+            total_size -= size
+            logging.info(f"Evicted cached task {path}")
@@ -61,6 +61,12 @@ class Search_Space:
             successors.append(("add1", state + 1))
         return successors
 
+    def iter_successor_states(self, state):
+        """
+        Returns an iterator over the successors of get_successor_states.
+        """
+        return iter(self.get_successor_states(state))
+
 
 def get_simple_search_space():
     """
@@ -3,11 +3,14 @@ Tests for parsing and grounding all problems
 """
 
 from glob import glob
+import io
+import logging
 import os
 
 import pytest
 
 from pyperplan import planner
+from pyperplan.heuristics.landmarks import LandmarkHeuristic
 from pyperplan.search import breadth_first_search
 
 
@@ -58,3 +61,55 @@ def test_solve_smallest_problems(problem):
     Solves the first instance of each domain
     """
     run_planner(problem)
+
+
+def test_search_plans(caplog):
+    caplog.set_level(logging.INFO)
+    domain_file = os.path.join(benchmarks, "gripper", "domain.pddl")
+    problem_files = [
+        os.path.join(benchmarks, "gripper", f"task0{i}.pddl") for i in (1, 2, 1)
+    ]
+    solutions = planner.search_plans(
+        domain_file, problem_files, breadth_first_search, None
+    )
+    expected = [
+        planner.search_plan(domain_file, problem_file, breadth_first_search, None)
+        for problem_file in problem_files
+    ]
+    assert [[op.name for op in solution] for solution in solutions] == [
+        [op.name for op in solution] for solution in expected
+    ]
+    # The second task01 reuses the operators of the first one.
+    assert caplog.text.count("Reusing the grounded operators") == 1
+
+
+def test_ground_pddl():
+    domain_file = os.path.join(benchmarks, "gripper", "domain.pddl")
+    problem_file = os.path.join(benchmarks, "gripper", "task01.pddl")
+    expected = planner._ground(planner._parse(domain_file, problem_file))
+    with open(domain_file, "rb") as file:
+        domain_bytes = file.read()
+    with open(problem_file, "rb") as file:
+        problem_bytes = file.read()
+    inputs = [
+        (domain_bytes.decode("utf-8"), problem_bytes.decode("utf-8")),
+        (domain_bytes, problem_bytes),
+        (io.BytesIO(domain_bytes), io.StringIO(problem_bytes.decode("utf-8"))),
+    ]
+    for domain_input, problem_input in inputs:
+        task = planner.ground_pddl(domain_input, problem_input)
+        assert task.facts == expected.facts
+        assert task.initial_state == expected.initial_state
+        assert task.goals == expected.goals
+        assert task.operators == expected.operators
+    assert planner.solve_task(task, breadth_first_search, None) is not None
+
+
+@pytest.mark.parametrize(
+    "options", [{"heuristic_processes": 2}, {"heuristic_cache_size": 10}]
+)
+def test_solve_task_rejects_landmarks(options):
+    # The landmark heuristic depends on the path to a node.
+    task = ground_problem(os.path.join(benchmarks, "blocks", "task01.pddl"))
+    with pytest.raises(ValueError):
+        planner.solve_task(task, breadth_first_search, LandmarkHeuristic, **options)
@@ -0,0 +1,94 @@
+"""
+Tests for the codegen.py module
+"""
+
+import itertools
+import pickle
+
+import pytest
+
+from pyperplan.codegen import generate_source, GeneratedTask, MAX_NESTING
+from pyperplan.task import BitsetTask, HashedTask, Operator, SASTask, Task
+
+
+facts = ["a", "b", "c", "d"]
+operators = [
+    Operator("op-a", {"a"}, {"b"}, set()),
+    Operator("op-ab", {"a", "b"}, {"c"}, {"a"}),
+    Operator("op-bc", {"b", "c"}, {"d"}, set()),
+    Operator("op-d", {"d"}, {"a"}, {"d"}),
+    Operator("op-none", set(), {"a"}, set()),
+    Operator("op-abcd", {"a", "b", "c", "d"}, set(), {"b"}),
+]
+task = Task("task", set(facts), frozenset(["a"]), frozenset(["c", "d"]), operators)
+
+
+def all_states():
+    for length in range(len(facts) + 1):
+        for state in itertools.combinations(facts, length):
+            yield frozenset(state)
+
+
+def test_generated_strips_task():
+    generated = GeneratedTask(task)
+    for state in all_states():
+        successors = task.get_successor_states(state)
+        assert generated.get_successor_states(state) == successors
+        assert list(generated.iter_successor_states(state)) == successors
+        applicable = task.get_applicable_operators(state)
+        assert generated.get_applicable_operators(state) == applicable
+        assert generated.goal_reached(state) == task.goal_reached(state)
+
+
+@pytest.mark.parametrize("compiled_class", [BitsetTask, SASTask])
+def test_generated_compiled_task(compiled_class):
+    compiled = compiled_class(task)
+    generated = GeneratedTask(compiled)
+    assert generated.initial_state == compiled.initial_state
+    for state in all_states():
+        packed = compiled.encode_state(state)
+        successors = compiled.get_successor_states(packed)
+        assert generated.get_successor_states(packed) == successors
+        assert generated.goal_reached(packed) == compiled.goal_reached(packed)
+
+
+def test_generated_source_contains_facts():
+    source = generate_source(task)
+    assert "'a' in state" in source
+    assert "assert" not in source
+
+
+def test_generated_task_pickle():
+    generated = pickle.loads(pickle.dumps(GeneratedTask(task)))
+    successors = task.get_successor_states(task.initial_state)
+    assert generated.get_successor_states(task.initial_state) == successors
+
+
+@pytest.mark.parametrize("compile_task", [lambda task: task, BitsetTask])
+def test_generated_deep_task(compile_task):
+    # The i-th operator requires the first i + 1 facts, so the successor
+    # generator is deeper than Python allows to nest generated code.
+    chain = [f"f{i:03}" for i in range(MAX_NESTING + 10)]
+    deep_operators = [
+        Operator(f"op{i:03}", set(chain[: i + 1]), {"g"}, set())
+        for i in range(len(chain))
+    ]
+    deep_task = compile_task(
+        Task("deep", set(chain) | {"g"}, frozenset(), frozenset(["g"]), deep_operators)
+    )
+    generated = GeneratedTask(deep_task)
+    for length in [0, 1, MAX_NESTING - 1, MAX_NESTING, MAX_NESTING + 5, len(chain)]:
+        for state in [set(chain[:length]), set(chain[:length]) - {chain[3]}]:
+            if compile_task is BitsetTask:
+                state = deep_task.encode_state(state)
+            applicable = deep_task.get_successor_generator().get_applicable_indices(
+                state
+            )
+            assert generated.get_applicable_indices(state) == applicable
+            successors = deep_task.get_successor_states(state)
+            assert generated.get_successor_states(state) == successors
+
+
+def test_hashed_task_not_supported():
+    with pytest.raises(ValueError):
+        GeneratedTask(HashedTask(task))
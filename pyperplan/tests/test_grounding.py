@@ -1,4 +1,6 @@
 # from grounding import Grounder
+import pytest
+
 from pyperplan import grounding
 from pyperplan.pddl.parser import Parser
 from pyperplan.pddl.pddl import Action, Domain, Effect, Predicate, Problem, Type
@@ -334,6 +336,33 @@ def test_create_operator():
     assert operator.del_effects == {"(at ford berlin)"}
 
 
+def test_static_index():
+    init = {"(road freiburg basel)", "(road basel bern)", "(at ford freiburg)"}
+    index = grounding._StaticIndex(["road"], init)
+    assert index.facts == {("road", "freiburg", "basel"), ("road", "basel", "bern")}
+    assert index.get_objects("road", 0) == {"freiburg", "basel"}
+    assert index.get_objects("road", 1) == {"basel", "bern"}
+    # Only static predicates are indexed.
+    assert index.get_objects("at", 0) == set()
+    assert index.get_objects("road", 2) == set()
+
+
+def test_static_index_no_prefix_match():
+    # An object whose name is a prefix of an object in a static fact must not
+    # be considered to occur in that fact.
+    action = get_action(
+        "DRIVE-CAR",
+        [("car", [types["car"]]), ("orig", [types["city"]])],
+        [Predicate("in", [("car", types["car"]), ("orig", types["city"])])],
+        [Predicate("at", [("car", types["car"]), ("orig", types["city"])])],
+        [],
+    )
+    type_map = {types["car"]: {"car", "car1"}, types["city"]: {"basel"}}
+    init = {"(in car1 basel)"}
+    operators = list(grounding._ground_action(action, type_map, ["in"], init))
+    assert [op.name for op in operators] == ["(DRIVE-CAR car1 basel)"]
+
+
 def test_get_grounded_string():
     grounded_string = "(DRIVE-CAR ford freiburg berlin)"
     assert (
@@ -600,3 +629,288 @@ def test_add_del_effects():
         assert op.preconditions == pre_exp
         assert op.add_effects == add_exp
         assert op.del_effects == del_exp
+
+
+roads_domain_pddl = """
+(define (domain roads)
+  (:requirements :typing)
+  (:types location)
+  (:predicates (road ?from ?to - location) (at ?l - location))
+  (:action move
+   :parameters (?from ?to - location)
+   :precondition (and (road ?from ?to) (at ?from))
+   :effect (and (at ?to) (not (at ?from))))
+)
+"""
+
+roads_problem_pddl = """
+(define (problem roads-problem)
+  (:domain roads)
+  (:objects a b c d - location)
+  (:init {0} (road a b) (road b c) {1})
+  (:goal {2}))
+"""
+
+
+def parse_roads_domain():
+    parser = Parser("")
+    parser.domInput = roads_domain_pddl
+    return parser.parse_domain(False)
+
+
+def parse_roads_problem(
+    domain=None, init="(at a)", goal="(at c)", extra_road="(road d a)"
+):
+    parser = Parser("")
+    parser.probInput = roads_problem_pddl.format(init, extra_road, goal)
+    return parser.parse_problem(domain or parse_roads_domain(), False)
+
+
+def test_reachability_strategy():
+    product_task = grounding.ground(parse_roads_problem())
+    task = grounding.ground(parse_roads_problem(), strategy="reachability")
+
+    # (at d) is never reached, so (move d a) is not instantiated.
+    assert "(move d a)" in [op.name for op in product_task.operators]
+    assert [op.name for op in task.operators] == [
+        op.name for op in product_task.operators if op.name != "(move d a)"
+    ]
+    assert "(at d)" not in task.facts
+    assert task.initial_state == product_task.initial_state
+    assert task.goals == product_task.goals
+
+
+switch_domain_pddl = """
+(define (domain switch)
+  (:predicates (on) (done))
+  (:action turn-on
+   :parameters ()
+   :precondition (and)
+   :effect (on))
+  (:action finish
+   :parameters ()
+   :precondition (on)
+   :effect (done))
+)
+"""
+
+switch_problem_pddl = """
+(define (problem switch-problem)
+  (:domain switch)
+  (:init)
+  (:goal (done)))
+"""
+
+
+def parse_switch_problem():
+    parser = Parser("")
+    parser.domInput = switch_domain_pddl
+    parser.probInput = switch_problem_pddl
+    return parser.parse_problem(parser.parse_domain(False), False)
+
+
+def test_reachability_strategy_empty_initial_state():
+    product_task = grounding.ground(parse_switch_problem())
+    task = grounding.ground(parse_switch_problem(), strategy="reachability")
+
+    # Actions without preconditions are reachable from the empty state.
+    assert task.initial_state == frozenset()
+    assert sorted(op.name for op in task.operators) == ["(finish)", "(turn-on)"]
+    assert task.operators == product_task.operators
+
+
+def test_join_strategy():
+    for problem in [parse_roads_problem, lambda: standard_problem]:
+        product_task = grounding.ground(problem())
+        task = grounding.ground(problem(), strategy="join")
+        assert [op.name for op in task.operators] == [
+            op.name for op in product_task.operators
+        ]
+        assert task.operators == product_task.operators
+        assert task.facts == product_task.facts
+        assert task.initial_state == product_task.initial_state
+
+
+def test_parallel_grounding(monkeypatch):
+    # Split the actions into several chunks.
+    monkeypatch.setattr(grounding, "PARALLEL_CHUNK_SIZE", 2)
+    for problem in [parse_roads_problem, lambda: standard_problem]:
+        task = grounding.ground(problem())
+        parallel_task = grounding.ground(problem(), processes=2)
+        assert [op.name for op in parallel_task.operators] == [
+            op.name for op in task.operators
+        ]
+        assert parallel_task.operators == task.operators
+        assert parallel_task.facts == task.facts
+
+    with pytest.raises(ValueError):
+        grounding.ground(parse_roads_problem(), strategy="join", processes=2)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        grounding.ground(standard_problem, strategy="unknown")
+
+
+def test_relevance_analysis_chain():
+    # Every operator makes the precondition of the previous one relevant.
+    operators = [Operator(f"op{i}", {f"f{i}"}, {f"f{i + 1}"}, set()) for i in range(50)]
+    operators.append(Operator("other", {"f0"}, {"g"}, set()))
+    relevant = grounding._relevance_analysis(operators, frozenset(["f50"]))
+    assert relevant == operators[:50]
+
+
+def test_remove_unreachable_operators():
+    operators = [
+        Operator("op1", {"a"}, {"b"}, set()),
+        Operator("op2", {"b", "c"}, {"d"}, set()),
+        Operator("op3", {"b"}, {"c"}, {"a"}),
+        Operator("op4", {"e"}, {"a"}, set()),
+        Operator("op5", set(), {"f"}, set()),
+    ]
+    reachable = grounding._remove_unreachable_operators(operators, frozenset(["a"]))
+    assert [op.name for op in reachable] == ["op1", "op2", "op3", "op5"]
+
+
+def test_remove_duplicate_operators():
+    operators = [
+        Operator("op1", {"a"}, {"b"}, set()),
+        Operator("op2", {"a"}, {"b"}, set()),
+        Operator("op3", {"a"}, {"b"}, {"a"}),
+    ]
+    unique = grounding._remove_duplicate_operators(operators)
+    assert [op.name for op in unique] == ["op1", "op3"]
+
+
+def test_simplify():
+    task = grounding.ground(parse_roads_problem())
+    simplified_task = grounding.ground(parse_roads_problem(), simplify=True)
+    assert [op.name for op in simplified_task.operators] == [
+        op.name for op in task.operators if op.name != "(move d a)"
+    ]
+    assert simplified_task.facts == task.facts - {"(at d)"}
+
+
+def test_grounding_session(monkeypatch):
+    domain = parse_roads_domain()
+    session = grounding.GroundingSession()
+    calls = []
+    ground_operators = grounding._ground_operators
+    monkeypatch.setattr(
+        grounding,
+        "_ground_operators",
+        lambda *args: calls.append(args) or ground_operators(*args),
+    )
+    problems = [
+        ("(at a)", "(at c)", "(road d a)"),
+        ("(at b)", "(at c)", "(road d a)"),
+        ("(at a)", "(at b)", "(road d a)"),
+        ("(at a)", "(at c)", "(road c d)"),
+    ]
+    for init, goal, extra_road in problems:
+        task = session.ground(parse_roads_problem(domain, init, goal, extra_road))
+        expected = grounding.ground(parse_roads_problem(domain, init, goal, extra_road))
+        assert task.operators == expected.operators
+        assert [op.name for op in task.operators] == [
+            op.name for op in expected.operators
+        ]
+        assert task.facts == expected.facts
+        assert task.initial_state == expected.initial_state
+        assert task.goals == expected.goals
+    # Only the last problem has other static facts than the first one, its
+    # operators are derived from those of the first one. The session
+    # grounded once, ground() four times.
+    assert len(calls) == 5
+
+    calls.clear()
+    session = grounding.GroundingSession(max_entries=0)
+    for init, goal, extra_road in problems:
+        session.ground(parse_roads_problem(domain, init, goal, extra_road))
+    assert len(calls) == 4
+
+    with pytest.raises(ValueError):
+        grounding.GroundingSession(strategy="unknown")
+
+
+vehicles_domain_pddl = """
+(define (domain vehicles)
+  (:requirements :typing)
+  (:types location vehicle)
+  (:predicates (road ?from ?to - location) (allowed ?v - vehicle ?l - location)
+               (at ?v - vehicle ?l - location) (honked ?v - vehicle))
+  (:action move
+   :parameters (?v - vehicle ?from ?to - location)
+   :precondition (and (road ?from ?to) (allowed ?v ?to) (at ?v ?from))
+   :effect (and (at ?v ?to) (not (at ?v ?from))))
+  (:action honk
+   :parameters (?v - vehicle ?from ?to - location)
+   :precondition (and (road ?from ?to))
+   :effect (honked ?v))
+)
+"""
+
+vehicles_problem_pddl = """
+(define (problem vehicles-problem)
+  (:domain vehicles)
+  (:objects a b c - location v w - vehicle)
+  (:init (at v a) (at w b) {0})
+  (:goal (and (at v c) (honked w))))
+"""
+
+
+def parse_vehicles_problem(domain, static_facts):
+    parser = Parser("")
+    parser.probInput = vehicles_problem_pddl.format(static_facts)
+    return parser.parse_problem(domain, False)
+
+
+@pytest.mark.parametrize("strategy", ["product", "join"])
+def test_grounding_session_static_delta(monkeypatch, strategy):
+    parser = Parser("")
+    parser.domInput = vehicles_domain_pddl
+    domain = parser.parse_domain(False)
+    session = grounding.GroundingSession(strategy=strategy)
+    calls = []
+    ground_operators = grounding._ground_operators
+    monkeypatch.setattr(
+        grounding,
+        "_ground_operators",
+        lambda *args: calls.append(args) or ground_operators(*args),
+    )
+    static_facts = [
+        "(road a b) (road b c) (allowed v b) (allowed v c) (allowed w c)",
+        # Removed static facts
+        "(road a b) (road b c) (allowed v c)",
+        # Added static facts, some operators use two of them
+        "(road a b) (road b c) (road c a) (road a c) (allowed v a) (allowed v c)",
+        # Both
+        "(road b a) (allowed w a) (allowed v c)",
+        "",
+    ]
+    for facts in static_facts:
+        task = session.ground(parse_vehicles_problem(domain, facts))
+        expected = grounding.ground(
+            parse_vehicles_problem(domain, facts), strategy=strategy
+        )
+        assert [op.name for op in task.operators] == [
+            op.name for op in expected.operators
+        ]
+        assert task.operators == expected.operators
+        assert task.facts == expected.facts
+        assert task.initial_state == expected.initial_state
+    # Only the first problem is grounded completely by the session.
+    assert len(calls) == len(static_facts) + 1
+
+
+def test_grounding_session_reachability():
+    domain = parse_roads_domain()
+    session = grounding.GroundingSession(strategy="reachability")
+    for init in ["(at a)", "(at b)", "(at a)"]:
+        task = session.ground(parse_roads_problem(domain, init))
+        expected = grounding.ground(
+            parse_roads_problem(domain, init), strategy="reachability"
+        )
+        assert [op.name for op in task.operators] == [
+            op.name for op in expected.operators
+        ]
+        assert task.initial_state == expected.initial_state
@@ -0,0 +1,92 @@
+"""
+Tests for the heuristic_cache.py module
+"""
+
+import pytest
+
+from pyperplan.heuristics.heuristic_base import Heuristic
+from pyperplan.heuristics.heuristic_cache import CachingAdapter, ClockCache, LRUCache
+from pyperplan.search.searchspace import make_child_node, make_root_node
+
+
+class CountingHeuristic(Heuristic):
+    def __init__(self):
+        self.states = []
+
+    def __call__(self, node):
+        self.states.append(node.state)
+        return len(node.state)
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    # "b" is the least recently used entry now.
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_clock_cache():
+    cache = ClockCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    # The hand skips "a", whose reference bit is set, and replaces "b".
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    # All bits are set, so the hand clears them and replaces "a".
+    cache.put("d", 4)
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert cache.get("d") == 4
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize("Cache", [LRUCache, ClockCache])
+def test_cache_without_entries(Cache):
+    with pytest.raises(ValueError):
+        Cache(0)
+
+
+@pytest.mark.parametrize("policy", ["lru", "clock"])
+def test_caching_adapter(policy):
+    heuristic = CountingHeuristic()
+    cached = CachingAdapter(heuristic, 10, policy)
+    root = make_root_node("ab")
+    child = make_child_node(root, "op", "abc")
+    assert cached(root) == 2
+    assert root.h == 2
+    assert cached(child) == 3
+    # The value of the node itself and of another node with the same state.
+    assert cached(root) == 2
+    assert cached(make_child_node(child, "op", "ab")) == 2
+    assert heuristic.states == ["ab", "abc"]
+    assert (cached.hits, cached.misses, cached.stored) == (1, 2, 1)
+
+
+def test_caching_adapter_uses_stored_values():
+    heuristic = CountingHeuristic()
+    cached = CachingAdapter(heuristic)
+    node = make_root_node("abc")
+    node.h = 7
+    assert cached(node) == 7
+    assert heuristic.states == []
+    assert (cached.hits, cached.misses, cached.stored) == (0, 0, 1)
+
+
+def test_caching_adapter_batch():
+    heuristic = CountingHeuristic()
+    cached = CachingAdapter(heuristic)
+    cached(make_root_node("a"))
+    nodes = [make_root_node(state) for state in ["a", "bb", "a", "bb", "ccc"]]
+    assert cached.evaluate_batch(nodes) == [1, 2, 1, 2, 3]
+    assert [node.h for node in nodes] == [1, 2, 1, 2, 3]
+    assert heuristic.states == ["a", "bb", "ccc"]
+    assert (cached.hits, cached.misses) == (3, 3)
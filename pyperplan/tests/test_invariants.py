@@ -0,0 +1,128 @@
+"""
+Tests for the invariants.py module
+"""
+
+from pyperplan.invariants import find_mutex_groups
+from pyperplan.task import Operator, SASTask, Task
+
+
+# A package that is moved between two locations and a truck. The truck
+# itself moves between the two locations.
+facts = {
+    "(at pkg l1)",
+    "(at pkg l2)",
+    "(in pkg truck)",
+    "(at truck l1)",
+    "(at truck l2)",
+}
+
+
+def load(loc):
+    return Operator(
+        f"(load {loc})",
+        {f"(at pkg {loc})", f"(at truck {loc})"},
+        {"(in pkg truck)"},
+        {f"(at pkg {loc})"},
+    )
+
+
+def unload(loc):
+    return Operator(
+        f"(unload {loc})",
+        {"(in pkg truck)", f"(at truck {loc})"},
+        {f"(at pkg {loc})"},
+        {"(in pkg truck)"},
+    )
+
+
+def drive(start, end):
+    return Operator(
+        f"(drive {start} {end})",
+        {f"(at truck {start})"},
+        {f"(at truck {end})"},
+        {f"(at truck {start})"},
+    )
+
+
+operators = [
+    load("l1"),
+    load("l2"),
+    unload("l1"),
+    unload("l2"),
+    drive("l1", "l2"),
+    drive("l2", "l1"),
+]
+task = Task(
+    "logistics",
+    facts,
+    frozenset(["(at pkg l1)", "(at truck l2)"]),
+    frozenset(["(at pkg l2)"]),
+    operators,
+)
+
+
+def test_mutex_groups():
+    groups = find_mutex_groups(task)
+    assert frozenset(["(at truck l1)", "(at truck l2)"]) in groups
+    assert frozenset(["(at pkg l1)", "(at pkg l2)", "(in pkg truck)"]) in groups
+    # Only at most one package fact is true, but not so without (in pkg truck).
+    assert frozenset(["(at pkg l1)", "(at pkg l2)"]) not in groups
+
+
+def test_no_group_for_violated_invariant():
+    # This operator makes two truck locations true at the same time.
+    teleport = Operator("teleport", set(), {"(at truck l1)"}, set())
+    broken = Task(
+        "broken",
+        facts,
+        task.initial_state,
+        task.goals,
+        operators + [teleport],
+    )
+    groups = find_mutex_groups(broken)
+    assert all("(at truck l1)" not in group for group in groups)
+
+
+def test_initial_state_violates_group():
+    broken = Task(
+        "broken",
+        facts,
+        frozenset(["(at pkg l1)", "(at truck l1)", "(at truck l2)"]),
+        task.goals,
+        operators,
+    )
+    groups = find_mutex_groups(broken)
+    assert all("(at truck l1)" not in group for group in groups)
+
+
+def test_sas_task_matches_task():
+    sas_task = SASTask(task)
+    # The package variable has three values, the truck variable two.
+    assert sas_task.num_bits == 3
+    states = [
+        frozenset([pkg, truck])
+        for pkg in ["(at pkg l1)", "(at pkg l2)", "(in pkg truck)"]
+        for truck in ["(at truck l1)", "(at truck l2)"]
+    ]
+    for state in states:
+        packed = sas_task.encode_state(state)
+        assert sas_task.decode_state(packed) == state
+        assert [
+            (op.name, sas_task.decode_state(succ))
+            for op, succ in sas_task.get_successor_states(packed)
+        ] == [(op.name, succ) for op, succ in task.get_successor_states(state)]
+        assert sas_task.goal_reached(packed) == task.goal_reached(state)
+
+
+def test_sas_conditional_delete():
+    # Deleting a fact that is not a precondition only has an effect if the
+    # fact is true. A contradictory operator is dropped.
+    lose = Operator("lose", set(), set(), {"(in pkg truck)"})
+    impossible = Operator("impossible", {"(at pkg l1)", "(at pkg l2)"}, set(), set())
+    lossy = Task("lossy", facts, task.initial_state, task.goals, [lose, impossible])
+    sas_task = SASTask(lossy, find_mutex_groups(task))
+    assert [op.name for op in sas_task.operators] == ["lose"]
+    for pkg in ["(at pkg l1)", "(in pkg truck)"]:
+        state = frozenset([pkg, "(at truck l1)"])
+        succ = sas_task.operators[0].apply(sas_task.encode_state(state))
+        assert sas_task.decode_state(succ) == lose.apply(state)
@@ -0,0 +1,64 @@
+"""
+Tests for the command line interface
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+from pyperplan.__main__ import main
+
+
+benchmarks = os.path.abspath(
+    os.path.join(os.path.abspath(__file__), "../../../benchmarks")
+)
+
+
+@pytest.fixture
+def blocks_dir(tmp_path):
+    for name in ["domain.pddl", "task01.pddl", "task02.pddl"]:
+        shutil.copy(os.path.join(benchmarks, "blocks", name), tmp_path)
+    return tmp_path
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["pyperplan", "-l", "warning", *args])
+    main()
+
+
+def solved(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".soln"))
+
+
+@pytest.mark.parametrize("with_domain", [False, True])
+def test_several_problems(monkeypatch, blocks_dir, with_domain):
+    problems = [str(blocks_dir / "task01.pddl"), str(blocks_dir / "task02.pddl")]
+    domain = [str(blocks_dir / "domain.pddl")] if with_domain else []
+    run_main(monkeypatch, *domain, *problems)
+    assert solved(blocks_dir) == ["task01.pddl.soln", "task02.pddl.soln"]
+
+
+def test_problem_directories(monkeypatch, blocks_dir, tmp_path_factory):
+    other_dir = tmp_path_factory.mktemp("other")
+    for name in ["domain.pddl", "task03.pddl"]:
+        shutil.copy(os.path.join(benchmarks, "blocks", name), other_dir)
+    run_main(monkeypatch, str(blocks_dir), str(other_dir))
+    assert solved(blocks_dir) == ["task01.pddl.soln", "task02.pddl.soln"]
+    assert solved(other_dir) == ["task03.pddl.soln"]
+
+
+def test_single_problem(monkeypatch, blocks_dir):
+    run_main(monkeypatch, str(blocks_dir / "task01.pddl"))
+    assert solved(blocks_dir) == ["task01.pddl.soln"]
+
+
+@pytest.mark.parametrize(
+    "option", [["--heuristic-processes", "0"], ["--heuristic-cache", "-1"]]
+)
+def test_invalid_heuristic_options(monkeypatch, blocks_dir, option):
+    with pytest.raises(SystemExit) as excinfo:
+        run_main(monkeypatch, *option, str(blocks_dir / "task01.pddl"))
+    assert excinfo.value.code == 2
+    assert solved(blocks_dir) == []
@@ -1,7 +1,11 @@
 from pytest import raises
 
 from pyperplan.pddl.errors import ParseError
-from pyperplan.pddl.lisp_parser import parse_lisp_iterator
+from pyperplan.pddl.lisp_parser import (
+    parse_lisp_file,
+    parse_lisp_iterator,
+    parse_nested_list,
+)
 from pyperplan.pddl.parser import *
 
 
@@ -291,3 +295,38 @@ def test_parse_goal_stmt_fail():
     iter = parse_lisp_iterator(test)
     with raises(ValueError):
         parse_goal_stmt(iter)
+
+
+def test_nested_list_inputs():
+    lines = ["(Define (at ?X?y) ; a (comment)", "  (not(on ?x))) ; )"]
+    expected = ["define", ["at", "?x", "?y"], ["not", ["on", "?x"]]]
+    assert parse_nested_list(lines) == expected
+    assert parse_nested_list("\n".join(lines)) == expected
+    assert parse_nested_list("\r\n".join(lines).encode("utf-8")) == expected
+    assert parse_nested_list("(Äpfel ?X)") == ["äpfel", "?x"]
+
+
+def test_nested_list_deep():
+    depth = 10000
+    result = parse_nested_list(["(" * depth + "a" + ")" * depth])
+    for _ in range(depth - 1):
+        result = result[0]
+    assert result == ["a"]
+
+
+def test_lisp_parser_unbalanced():
+    with raises(ParseError):
+        parse_nested_list(["(a (b)"])
+    with raises(ParseError):
+        parse_nested_list(["(a) b"])
+    with raises(ParseError):
+        parse_nested_list([""])
+
+
+def test_parse_lisp_file(tmp_path):
+    path = tmp_path / "test.pddl"
+    path.write_bytes(b"(define ; comment\r(domain Test))\r\n")
+    assert parse_lisp_file(str(path)).contents == ["define", ["domain", "test"]]
+    path.write_bytes(b"")
+    with raises(ParseError):
+        parse_lisp_file(str(path))
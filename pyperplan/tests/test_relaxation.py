@@ -1,6 +1,7 @@
 import pytest
 
 from pyperplan import grounding
+from pyperplan.heuristics.heuristic_base import ProcessPoolAdapter
 from pyperplan.heuristics.relaxation import *
 from pyperplan.pddl.parser import Parser
 from pyperplan.search import a_star, enforced_hillclimbing_search, make_root_node
@@ -217,6 +218,19 @@ def compare_h_values(Heuristic, task, expected):
     assert h_value == expected
 
 
+@pytest.mark.parametrize(
+    "Heuristic", [hAddHeuristic, hMaxHeuristic, hSAHeuristic, hFFHeuristic]
+)
+def test_repeated_evaluations(Heuristic):
+    # Values of earlier evaluations must not leak into later ones.
+    heuristic = Heuristic(task1)
+    states = [["A"], ["B"], [], ["A"], ["A", "B", "C"], ["C"]]
+    for state in states:
+        expected = Heuristic(task1)(make_root_node(frozenset(state)))
+        assert heuristic(make_root_node(frozenset(state))) == expected
+    assert heuristic.get_call_counter() == len(states)
+
+
 def test_hAdd_blocksworld_initial_state():
     parser = Parser("")
     parser.domInput = blocks_dom
@@ -265,3 +279,31 @@ def test_hMax_blocksworld_complete_enforced_hillclimbing():
     true_h_values = [2, 3, 2.0, 3, 2, 1, 0]
     plan_length = 6
     gen_blocks_test_astar(hMaxHeuristic, true_h_values, plan_length)
+
+
+@pytest.mark.parametrize("Heuristic", [hAddHeuristic, hMaxHeuristic])
+@pytest.mark.parametrize("task", [task1, task6, task7, task9, task10, task12, task14])
+def test_evaluate_batch(Heuristic, task):
+    # Batches must give the values of the single evaluations, in order.
+    states = [task.initial_state, [], sorted(task.facts)]
+    states += [[fact] for fact in sorted(task.facts)]
+    nodes = [make_root_node(frozenset(state)) for state in states]
+    expected = [Heuristic(task)(node) for node in nodes]
+    assert Heuristic(task).evaluate_batch(nodes) == expected
+    # Large enough for the packed evaluation of hAdd.
+    assert Heuristic(task).evaluate_batch(nodes * 4) == expected * 4
+    assert Heuristic(task).evaluate_batch([]) == []
+
+
+def test_process_pool_adapter():
+    # Batches evaluated in worker processes must give the local values.
+    states = [task10.initial_state, [], ["v2"], ["v3", "v6"], ["g"], ["v5"]]
+    nodes = [make_root_node(frozenset(state)) for state in states]
+    expected = [hFFHeuristic(task10)(node) for node in nodes]
+    heuristic = ProcessPoolAdapter(hFFHeuristic(task10), task10, 2)
+    try:
+        assert heuristic.evaluate_batch(nodes) == expected
+        assert heuristic.evaluate_batch(nodes[:1]) == expected[:1]
+        assert heuristic(nodes[0]) == expected[0]
+    finally:
+        heuristic.close()
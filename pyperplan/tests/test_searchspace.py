@@ -2,7 +2,14 @@
 Unit Testing for the search space module
 """
 
-from pyperplan.search.searchspace import make_child_node, make_root_node
+from pyperplan.heuristics.heuristic_base import Heuristic
+from pyperplan.search.searchspace import (
+    evaluate_nodes,
+    make_child_node,
+    make_root_node,
+    SearchSpace,
+)
+from pyperplan.task import Task
 
 
 # Construct a small tree in order to perform some needed test methods
@@ -44,3 +51,65 @@ def test_states():
 # right action since this is done implicitly by the test_extract_solution
 # method, i.e., if this test passes, it will imply that each node contains the
 # right action
+
+
+def test_search_space():
+    """Tests the compact search space against the tree built above."""
+    task = Task("test", {"s1", "s2", "s3", "s4"}, frozenset(["s1"]), set(), [])
+    space = SearchSpace(task)
+    root = space.make_root_node(frozenset(["s1"]))
+    child = space.make_child_node(root, "action1", frozenset(["s2"]))
+    grandchild = space.make_child_node(child, "action2", frozenset(["s3", "s4"]))
+    other = space.make_child_node(root, "action1", frozenset(["s1", "s2"]))
+    assert len(space) == 4
+    assert space.extract_solution(root) == []
+    assert space.extract_solution(grandchild) == ["action1", "action2"]
+    assert space.extract_solution(other) == ["action1"]
+    assert [space.get_g(node) for node in (root, child, grandchild)] == [0, 1, 2]
+    assert space.get_state(grandchild) == frozenset(["s3", "s4"])
+    assert space.get_parent(root) is None
+    assert space.get_parent(grandchild) == child
+    assert space.get_action(root) is None
+    assert space.get_action(other) == "action1"
+    # Only states that have not been registered yet get a new node.
+    assert space.make_new_child_node(child, "action2", frozenset(["s1"])) is None
+    new = space.make_new_child_node(child, "action3", frozenset(["s1", "s3"]))
+    assert len(space) == 5
+    assert space.extract_solution(new) == ["action1", "action3"]
+
+
+def test_node_hash_and_equality():
+    other_child1 = make_child_node(root, "action1", "state2")
+    assert other_child1 == child1
+    assert hash(other_child1) == hash(child1)
+    assert make_child_node(other_child1, "action3", "state4") == grandchild1
+    assert child1 != child2
+    assert grandchild1 != grandchild2
+
+
+class BatchCountingHeuristic(Heuristic):
+    batch_size = 2
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, node):
+        return len(node.state)
+
+    def evaluate_batch(self, nodes):
+        self.batches.append([node.state for node in nodes])
+        return super().evaluate_batch(nodes)
+
+
+def test_evaluate_nodes():
+    """
+    Tests that evaluate_nodes yields the nodes in order with their values and
+    only evaluates the slices that are used
+    """
+    heuristic = BatchCountingHeuristic()
+    nodes = [make_root_node("s" * length) for length in range(1, 6)]
+    pairs = evaluate_nodes(heuristic, nodes)
+    assert next(pairs) == (nodes[0], 1)
+    assert heuristic.batches == [["s", "ss"]]
+    assert list(pairs) == [(node, len(node.state)) for node in nodes[1:]]
+    assert heuristic.batches == [["s", "ss"], ["sss", "ssss"], ["sssss"]]
@@ -0,0 +1,60 @@
+"""
+Tests for the state_registry.py module
+"""
+
+from pyperplan.search.state_registry import StateRegistry
+from pyperplan.task import BitsetTask, HashedState, HashedTask, Operator, Task
+
+
+op = Operator("op", {"a"}, {"b"}, {"a"})
+task = Task("task", {"a", "b", "c"}, frozenset(["a"]), frozenset(["b"]), [op])
+
+
+def test_insert_state():
+    registry = StateRegistry(task)
+    assert registry.insert_state(frozenset(["a"])) == (0, True)
+    assert registry.insert_state(frozenset(["b", "c"])) == (1, True)
+    assert registry.insert_state(frozenset(["a"])) == (0, False)
+    assert registry.insert_state(frozenset()) == (2, True)
+    assert len(registry) == 3
+
+
+def test_lookup_state():
+    registry = StateRegistry(task)
+    states = [frozenset(), frozenset(["c"]), frozenset(["a", "b", "c"])]
+    ids = [registry.insert_state(state)[0] for state in states]
+    assert [registry.lookup_state(state_id) for state_id in ids] == states
+
+
+def test_get_state_id():
+    registry = StateRegistry(task)
+    registry.insert_state(frozenset(["a"]))
+    assert registry.get_state_id(frozenset(["a"])) == 0
+    assert registry.get_state_id(frozenset(["b"])) is None
+    assert frozenset(["a"]) in registry
+    assert frozenset(["a", "b"]) not in registry
+
+
+def test_many_states():
+    """Registers many int states, like those of a BitsetTask."""
+    registry = StateRegistry(BitsetTask(task))
+    for state in range(5000):
+        assert registry.insert_state(state * 7919) == (state, True)
+    for state in range(5000):
+        assert registry.get_state_id(state * 7919) == state
+        assert registry.lookup_state(state) == state * 7919
+
+
+def test_hashed_states():
+    hashed_task = HashedTask(task)
+    registry = StateRegistry(hashed_task)
+    state = hashed_task.make_state({"b", "c"})
+    state_id, _ = registry.insert_state(state)
+    stored = registry.lookup_state(state_id)
+    assert isinstance(stored, HashedState)
+    assert stored == state
+    assert hash(stored) == hash(state)
+    # Hashed states are interned as they are and looked up by their hash.
+    assert stored is state
+    assert registry.get_state_id(hashed_task.make_state({"c", "b"})) == state_id
+    assert hashed_task.make_state({"a"}) not in registry
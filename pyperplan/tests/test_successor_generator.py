@@ -0,0 +1,93 @@
+"""
+Tests for the successor_generator.py module
+"""
+
+import itertools
+
+from pyperplan.successor_generator import (
+    IncrementalSuccessorGenerator,
+    SuccessorGenerator,
+)
+from pyperplan.task import BitsetTask, Operator, Task
+
+
+facts = ["a", "b", "c", "d"]
+operators = [
+    Operator("op-a", {"a"}, {"b"}, set()),
+    Operator("op-ab", {"a", "b"}, {"c"}, {"a"}),
+    Operator("op-bc", {"b", "c"}, {"d"}, set()),
+    Operator("op-d", {"d"}, {"a"}, {"d"}),
+    Operator("op-none", set(), {"a"}, set()),
+    Operator("op-abcd", {"a", "b", "c", "d"}, set(), {"b"}),
+]
+task = Task("task", set(facts), frozenset(["a"]), frozenset(["d"]), operators)
+
+
+def all_states():
+    for length in range(len(facts) + 1):
+        for state in itertools.combinations(facts, length):
+            yield frozenset(state)
+
+
+def test_generator_matches_scan():
+    generator = SuccessorGenerator(
+        operators, [sorted(op.preconditions) for op in operators]
+    )
+    for state in all_states():
+        expected = [op for op in operators if op.applicable(state)]
+        assert generator.get_applicable_operators(state) == expected
+
+
+def test_generator_empty():
+    generator = SuccessorGenerator([], [])
+    assert generator.get_applicable_operators(frozenset(["a"])) == []
+
+
+def test_task_reference_mode():
+    for state in all_states():
+        task.use_successor_generator = True
+        successors = task.get_successor_states(state)
+        task.use_successor_generator = False
+        assert successors == task.get_successor_states(state)
+    task.use_successor_generator = True
+
+
+def test_bitset_task_matches_task():
+    bitset_task = BitsetTask(task)
+    for state in all_states():
+        bitset_successors = bitset_task.get_successor_states(
+            bitset_task.encode_state(state)
+        )
+        assert [
+            (op.name, bitset_task.decode_state(succ)) for op, succ in bitset_successors
+        ] == [(op.name, succ) for op, succ in task.get_successor_states(state)]
+
+
+def test_incremental_generator_matches_scan():
+    for state in all_states():
+        # A new generator only knows "state", so the applicable operators of
+        # every new successor are derived from those of "state".
+        generator = IncrementalSuccessorGenerator(operators)
+        assert generator.get_applicable_operators(state) == [
+            op for op in operators if op.applicable(state)
+        ]
+        seen = {state}
+        for op, successor in generator.iter_successor_states(state):
+            assert op.applicable(state)
+            assert successor == op.apply(state)
+            if successor not in seen:
+                assert type(generator._known[successor]) is tuple
+                seen.add(successor)
+            expected = [other for other in operators if other.applicable(successor)]
+            assert generator.get_applicable_operators(successor) == expected
+
+
+def test_task_incremental_mode():
+    for state in all_states():
+        successors = task.get_successor_states(state)
+        task.use_incremental_successors = True
+        try:
+            assert successors == task.get_successor_states(state)
+            assert successors == list(task.iter_successor_states(state))
+        finally:
+            task.use_incremental_successors = False
@@ -1,9 +1,11 @@
 """
 Tests for the task.py module
 """
+import pickle
+
 import pytest
 
-from pyperplan.task import Operator, Task
+from pyperplan.task import BitsetTask, HashedState, HashedTask, Operator, Task
 
 
 s1 = frozenset(["var1"])
@@ -67,3 +69,72 @@ def test_task_goal_reached1():
 
 def test_task_goal_reached2():
     assert task1.goal_reached({"var1", "var2"})
+
+
+bitset_task1 = BitsetTask(task1)
+
+
+def test_bitset_encode_decode():
+    state = bitset_task1.encode_state({"var1", "var3"})
+    assert bitset_task1.decode_state(state) == {"var1", "var3"}
+    assert bitset_task1.decode_state(bitset_task1.initial_state) == init
+
+
+def test_bitset_op_application():
+    op = bitset_task1.operators[0]
+    state = op.apply(bitset_task1.initial_state)
+    assert bitset_task1.decode_state(state) == op1.apply(init)
+
+
+def test_bitset_op_application_add_and_delete():
+    """Test that delete-effects are applied before add-effects"""
+    task4 = BitsetTask(Task("task4", {"var1", "var2"}, s1, s3, [op4]))
+    state = task4.operators[0].apply(task4.initial_state)
+    assert task4.decode_state(state) == {"var1", "var2"}
+
+
+def test_bitset_task_successors():
+    successors = bitset_task1.get_successor_states(bitset_task1.initial_state)
+    assert [op.operator for op, _ in successors] == [op1, op2]
+    assert [bitset_task1.decode_state(state) for _, state in successors] == [
+        {"var1", "var2"},
+        {"var1"},
+    ]
+
+
+def test_bitset_task_goal_reached():
+    assert not bitset_task1.goal_reached(bitset_task1.initial_state)
+    assert bitset_task1.goal_reached(bitset_task1.encode_state({"var1", "var2"}))
+
+
+hashed_task1 = HashedTask(task1)
+
+
+def test_hashed_initial_state():
+    assert isinstance(hashed_task1.initial_state, HashedState)
+    assert hashed_task1.initial_state == init
+
+
+def test_hashed_task_successors():
+    successors = hashed_task1.get_successor_states(hashed_task1.initial_state)
+    assert successors == task1.get_successor_states(init)
+    for _, state in successors:
+        assert isinstance(state, HashedState)
+        assert hash(state) == hash(hashed_task1.make_state(state))
+
+
+def test_hashed_state_add_and_delete():
+    # op4 adds and deletes var2, so var2 is true afterwards.
+    task4 = HashedTask(Task("task4", {"var1", "var2"}, s1, s3, [op4]))
+    state = task4.apply(op4, task4.initial_state)
+    assert state == s3
+    assert hash(state) == hash(task4.make_state(s3))
+    assert hash(task4.apply(op4, state)) == hash(state)
+
+
+def test_hashed_state_pickle():
+    state = hashed_task1.make_state({"var1", "var3"})
+    copy = pickle.loads(pickle.dumps(state))
+    assert isinstance(copy, HashedState)
+    assert copy == state
+    assert hash(copy) == hash(state)
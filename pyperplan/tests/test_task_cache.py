@@ -0,0 +1,105 @@
+"""
+Tests for the task_cache.py module
+"""
+
+import io
+import os
+
+import pytest
+
+from pyperplan import planner, search, task_cache
+from pyperplan.task import Operator, Task
+
+
+benchmarks = os.path.abspath(
+    os.path.join(os.path.abspath(__file__), "../../../benchmarks")
+)
+domain_file = os.path.join(benchmarks, "gripper", "domain.pddl")
+problem_file = os.path.join(benchmarks, "gripper", "task01.pddl")
+
+op1 = Operator("op1", {"a"}, {"b", "c"}, {"a"})
+op2 = Operator("op2", set(), {"a"}, set())
+task = Task(
+    "task", {"a", "b", "c"}, frozenset(["a"]), frozenset(["b", "c"]), [op1, op2]
+)
+
+
+def assert_equal_tasks(task1, task2):
+    assert task1.name == task2.name
+    assert task1.facts == task2.facts
+    assert task1.initial_state == task2.initial_state
+    assert task1.goals == task2.goals
+    assert task1.operators == task2.operators
+    assert [op.name for op in task1.operators] == [op.name for op in task2.operators]
+
+
+def test_write_read_task():
+    file = io.BytesIO()
+    task_cache.write_task(task, file)
+    assert_equal_tasks(task_cache.read_task(file.getvalue()), task)
+
+
+def test_read_invalid_task():
+    file = io.BytesIO()
+    task_cache.write_task(task, file)
+    with pytest.raises(ValueError):
+        task_cache.read_task(file.getvalue()[:-4])
+    with pytest.raises(ValueError):
+        task_cache.read_task(b"no task")
+
+
+def test_cache_key():
+    key = task_cache.get_cache_key(domain_file, problem_file, strategy="product")
+    assert key == task_cache.get_cache_key(
+        domain_file, problem_file, strategy="product"
+    )
+    assert key != task_cache.get_cache_key(domain_file, problem_file, strategy="join")
+    other_problem = os.path.join(benchmarks, "gripper", "task02.pddl")
+    assert key != task_cache.get_cache_key(
+        domain_file, other_problem, strategy="product"
+    )
+
+
+def test_load_store(tmp_path):
+    cache = task_cache.TaskCache(str(tmp_path / "cache"))
+    assert cache.load("key") is None
+    cache.store("key", task)
+    assert_equal_tasks(cache.load("key"), task)
+
+
+def test_load_invalid_file(tmp_path):
+    cache = task_cache.TaskCache(str(tmp_path))
+    path = tmp_path / ("key" + task_cache.SUFFIX)
+    path.write_bytes(b"")
+    assert cache.load("key") is None
+    assert not path.exists()
+
+
+def test_eviction(tmp_path):
+    cache = task_cache.TaskCache(str(tmp_path))
+    cache.store("first", task)
+    size = os.path.getsize(tmp_path / ("first" + task_cache.SUFFIX))
+    cache.max_size = 2 * size
+    cache.store("second", task)
+    os.utime(tmp_path / ("first" + task_cache.SUFFIX), (0, 0))
+    cache.store("third", task)
+    # The least recently used task has been removed.
+    assert cache.load("first") is None
+    assert cache.load("second") is not None
+    assert cache.load("third") is not None
+
+
+def test_search_plan_with_cache(tmp_path):
+    cache_dir = str(tmp_path)
+    plans = [
+        planner.search_plan(
+            domain_file,
+            problem_file,
+            search.breadth_first_search,
+            None,
+            cache_dir=cache_dir,
+        )
+        for _ in range(2)
+    ]
+    assert len(os.listdir(cache_dir)) == 1
+    assert [op.name for op in plans[0]] == [op.name for op in plans[1]]
@@ -2,6 +2,7 @@ import itertools
 
 from pytest import raises
 
+from pyperplan.pddl.errors import ParseError
 from pyperplan.pddl.lisp_parser import parse_lisp_iterator
 from pyperplan.pddl.parser import parse_domain_def, parse_problem_def, Parser
 import pyperplan.pddl.tree_visitor as pddl_tree_visitor
@@ -590,3 +591,43 @@ def test_problem_goal_single_predicate():
     """
     _parser.probInput = _problem_input_2
     _problem = _parser.parse_problem(_domain, False)
+
+
+def test_problem_init_goal_facts():
+    assert _problem.initial_state == [
+        "(clear d)",
+        "(clear c)",
+        "(ontable d)",
+        "(ontable a)",
+        "(on c e)",
+        "(on e b)",
+        "(on b a)",
+        "(handempty)",
+    ]
+    assert _problem.goal == ["(on a e)", "(on e b)", "(on b d)", "(on d c)"]
+
+
+def test_problem_init_unknown_object():
+    _problem_input_2 = """(define (problem BLOCKS-5-0)
+    (:domain BLOCKS)
+    (:objects B E A C D)
+    (:INIT (CLEAR D) (CLEAR F) (HANDEMPTY))
+    (:goal (ON A E))
+    )
+    """
+    with raises(SemanticError):
+        _parser.probInput = _problem_input_2
+        _problem = _parser.parse_problem(_domain, False)
+
+
+def test_problem_init_no_atom():
+    _problem_input_2 = """(define (problem BLOCKS-5-0)
+    (:domain BLOCKS)
+    (:objects B E A C D)
+    (:INIT (CLEAR D) HANDEMPTY)
+    (:goal (ON A E))
+    )
+    """
+    with raises(ParseError):
+        _parser.probInput = _problem_input_2
+        _problem = _parser.parse_problem(_domain, False)